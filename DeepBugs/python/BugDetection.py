@@ -9,20 +9,12 @@ import json
 from os.path import join
 from os import getcwd
 from collections import Counter, namedtuple
+from importlib import import_module
 import math
-from keras.models import Sequential, load_model
-from keras.layers.core import Dense, Dropout
 import random
 import time
 import numpy as np
 import Util
-import LearningDataSwappedArgs
-import LearningDataBinOperator
-import LearningDataSwappedBinOperands
-import LearningDataIncorrectBinaryOperand
-import LearningDataIncorrectAssignment
-import LearningDataIncorrectAssignment_with_parents
-import LearningDataMissingArg
 from tqdm import tqdm
 
 name_embedding_size = 200
@@ -31,6 +23,41 @@ type_embedding_size = 5
 
 Anomaly = namedtuple("Anomaly", ["message", "score"])
 
+# The module providing the LearningData of each kind of bug ('what'). Only the selected module is imported
+learning_data_modules = {
+    "SwappedArgs": "LearningDataSwappedArgs",
+    "BinOperator": "LearningDataBinOperator",
+    "SwappedBinOperands": "LearningDataSwappedBinOperands",
+    "IncorrectBinaryOperand": "LearningDataIncorrectBinaryOperand",
+    # "IncorrectAssignment": "LearningDataIncorrectAssignment",
+    "IncorrectAssignment": "LearningDataIncorrectAssignment_with_parents",
+    "MissingArg": "LearningDataMissingArg"
+}
+
+
+def create_learning_data(what):
+    '''
+    Import the module of the given kind of bug and create its LearningData. None if the kind of bug is not known
+    '''
+    if what not in learning_data_modules:
+        return None
+    return import_module(learning_data_modules[what]).LearningData()
+
+
+def create_model(x_length):
+    '''
+    A simple feedforward network. Keras (and TensorFlow) are only imported once a model is needed
+    '''
+    from keras.models import Sequential
+    from keras.layers.core import Dense, Dropout
+    model = Sequential()
+    model.add(Dropout(0.2, input_shape=(x_length,)))
+    model.add(Dense(200, input_dim=x_length, activation="relu", kernel_initializer='normal'))
+    model.add(Dropout(0.2))
+    # model.add(Dense(200, activation="relu"))
+    model.add(Dense(1, activation="sigmoid", kernel_initializer='normal'))
+    return model
+
 
 def parse_data_paths(args):
     training_data_paths = []
@@ -174,6 +201,11 @@ if __name__ == '__main__':
         print("Incorrect arguments")
         sys.exit(1)
 
+    learning_data = create_learning_data(what)
+    if learning_data is None:
+        print("Incorrect argument for 'what'")
+        sys.exit(1)
+
     with open(name_to_vector_file) as f:
         name_to_vector = json.load(f)
     with open(type_to_vector_file) as f:
@@ -181,23 +213,6 @@ if __name__ == '__main__':
     with open(node_type_to_vector_file) as f:
         node_type_to_vector = json.load(f)
 
-    if what == "SwappedArgs":
-        learning_data = LearningDataSwappedArgs.LearningData()
-    elif what == "BinOperator":
-        learning_data = LearningDataBinOperator.LearningData()
-    elif what == "SwappedBinOperands":
-        learning_data = LearningDataSwappedBinOperands.LearningData()
-    elif what == "IncorrectBinaryOperand":
-        learning_data = LearningDataIncorrectBinaryOperand.LearningData()
-    elif what == "IncorrectAssignment":
-        # learning_data = LearningDataIncorrectAssignment.LearningData()
-        learning_data = LearningDataIncorrectAssignment_with_parents.LearningData()
-    elif what == "MissingArg":
-        learning_data = LearningDataMissingArg.LearningData()
-    else:
-        print("Incorrect argument for 'what'")
-        sys.exit(1)
-
     print("Statistics on training data:")
     learning_data.pre_scan(training_data_paths, validation_data_paths)
 
@@ -212,16 +227,12 @@ if __name__ == '__main__':
 
     # manual validation of stored model (for debugging)
     if option == "--load":
+        from keras.models import load_model
         model = load_model(model_file)
         print("Loaded model.")
     elif option == "--learn":
         # simple feedforward network
-        model = Sequential()
-        model.add(Dropout(0.2, input_shape=(x_length,)))
-        model.add(Dense(200, input_dim=x_length, activation="relu", kernel_initializer='normal'))
-        model.add(Dropout(0.2))
-        # model.add(Dense(200, activation="relu"))
-        model.add(Dense(1, activation="sigmoid", kernel_initializer='normal'))
+        model = create_model(x_length)
 
         # train
         model.compile(loss='binary_crossentropy', optimizer='rmsprop', metrics=['accuracy'])
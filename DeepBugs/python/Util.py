@@ -4,11 +4,12 @@ Created on Oct 26, 2017
 @author: Michael Pradel
 '''
 
-from scipy.spatial.distance import cosine
 import random
 import json
 
 def in_group_similarity(vector_group):
+    # scipy is only imported by the embedding evaluation, not by every user of the DataReader
+    from scipy.spatial.distance import cosine
     vector_group = list(vector_group)
     in_group_simil = 0.0
     in_group_ctr = 0
@@ -22,6 +23,7 @@ def in_group_similarity(vector_group):
     return in_group_simil
 
 def out_group_similarity(vector_group, other_vectors):
+    from scipy.spatial.distance import cosine
     other_vectors = list(other_vectors)
     out_vectors = []
     for _ in range(20):
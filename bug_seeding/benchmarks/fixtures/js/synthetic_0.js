@@ -0,0 +1,40 @@
+function func0 ( ) {
+if ( j / end ) { value = value + 1 ; }
+if ( elapsed + 'a' ) { index = index + 1 ; }
+if ( min >= j ) { max = max + 1 ; }
+var elapsed = tax % true ;
+if ( offset % width ) { i = i + 1 ; }
+var y = index < 1 ;
+var end = n - timeout ;
+if ( total === limit ) { limit = limit + 1 ; }
+}
+function func1 ( ) {
+var count = n - data ;
+if ( limit < false ) { index = index + 1 ; }
+var width = max === count ;
+var elapsed = start % 'a' ;
+var timeout = min / len ;
+var x = price === 10 ;
+var x = max !== tax ;
+if ( result >= '' ) { end = end + 1 ; }
+}
+function func2 ( ) {
+var items = price >= result ;
+var len = value || 2 ;
+if ( limit >= left ) { count = count + 1 ; }
+var timeout = i !== result ;
+var key = y * 'a' ;
+var end = step - delta ;
+var data = step < size ;
+if ( delta <= x ) { elapsed = elapsed + 1 ; }
+}
+function func3 ( ) {
+var height = data === 10 ;
+if ( right || timeout ) { total = total + 1 ; }
+var left = timeout === '' ;
+var max = elapsed && sum ;
+if ( node - list ) { height = height + 1 ; }
+var count = y / '' ;
+if ( count / len ) { i = i + 1 ; }
+var n = y % 10 ;
+}
@@ -0,0 +1,40 @@
+function func0 ( ) {
+var max = elapsed === true ;
+var left = tax !== 1 ;
+var items = tax !== len ;
+var index = len || width ;
+var start = sum * "id" ;
+var key = list <= 1 ;
+var timeout = index + '' ;
+var start = offset / right ;
+}
+function func1 ( ) {
+var len = offset % price ;
+if ( item * step ) { list = list + 1 ; }
+var max = len + timeout ;
+if ( left * elapsed ) { len = len + 1 ; }
+if ( total === count ) { step = step + 1 ; }
+var start = price / true ;
+var n = total < elapsed ;
+var max = x * 'a' ;
+}
+function func2 ( ) {
+var data = list + count ;
+if ( count % delta ) { index = index + 1 ; }
+if ( count % limit ) { width = width + 1 ; }
+var elapsed = data + elapsed ;
+if ( data * index ) { timeout = timeout + 1 ; }
+if ( timeout === 100 ) { index = index + 1 ; }
+var y = max >= key ;
+if ( total + item ) { len = len + 1 ; }
+}
+function func3 ( ) {
+var result = end >= "id" ;
+var timeout = i * null ;
+var height = timeout + 2 ;
+if ( width !== 10 ) { n = n + 1 ; }
+var timeout = tax / size ;
+var length = tax < null ;
+var tax = start - null ;
+var n = left < "id" ;
+}
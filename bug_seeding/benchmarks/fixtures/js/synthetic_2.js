@@ -0,0 +1,40 @@
+function func0 ( ) {
+if ( j < tax ) { min = min + 1 ; }
+var count = key > delta ;
+if ( y % value ) { elapsed = elapsed + 1 ; }
+var end = n < 'a' ;
+var x = items - delta ;
+var sum = end + 'a' ;
+var elapsed = sum !== count ;
+var x = value >= x ;
+}
+function func1 ( ) {
+if ( x >= item ) { tax = tax + 1 ; }
+var tax = limit === length ;
+if ( timeout % data ) { price = price + 1 ; }
+var x = list >= max ;
+var offset = total !== false ;
+if ( start || min ) { total = total + 1 ; }
+var j = n === "id" ;
+var count = list && sum ;
+}
+function func2 ( ) {
+if ( price && false ) { right = right + 1 ; }
+var index = items >= null ;
+if ( start <= value ) { timeout = timeout + 1 ; }
+var list = delta || x ;
+var step = items * list ;
+if ( node !== 10 ) { left = left + 1 ; }
+if ( right <= key ) { delta = delta + 1 ; }
+if ( start >= 0.5 ) { item = item + 1 ; }
+}
+function func3 ( ) {
+if ( min && size ) { size = size + 1 ; }
+if ( y + items ) { tax = tax + 1 ; }
+var tax = limit || j ;
+var left = i || x ;
+var tax = elapsed || timeout ;
+if ( right <= 'a' ) { min = min + 1 ; }
+var y = price * left ;
+var elapsed = j - n ;
+}
@@ -0,0 +1,341 @@
+"""
+
+Created on 18-October-2026
+
+Benchmark the hot path of bug seeding. Each stage records its wall time, the peak RSS of the process once the
+stage has finished and, where it makes sense, the items processed per second. The stages run one after the
+other in the same process, hence the peak RSS of a stage includes everything loaded by the earlier stages.
+
+    index_patterns      Filter and index the bug seeding patterns
+    load_json           Read the static analysis results (JSON) of the target files
+    load_store          Or read them from a store if the corpus has been analysed by 'run_bug_seeding.py'
+    pack_store          Add the static analysis results to an analysed-file store
+    read_store          Read the static analysis results back from the store
+    match               SemSeedBugs.is_matching_token_sequence for every (location, pattern) pair
+    apply_pattern       SemSeedBugs.apply_pattern for every matching (location, pattern) pair
+    seed                seed_bugs_to_a_file for every target file, including writing the seeded files
+    prepare             Static analysis of the JS files (only if --js_dir is given and Node.js is available)
+
+By default, the checked-in fixtures are used. Use --synthetic_files to benchmark a large synthetic corpus or
+give the paths of a recorded corpus. The results are written as JSON to the temporary directory of the system
+(or --out), use --compare_with to compare them with the results of an earlier run (eg. of another commit):
+
+    python bug_seeding/benchmarks/run_benchmarks.py
+    python bug_seeding/benchmarks/run_benchmarks.py --synthetic_files 2000
+    python bug_seeding/benchmarks/run_benchmarks.py --analysed_dir benchmarks/js_benchmark_working_dir/__TEMP__target_js_file_nodes \
+        --bug_seeding_patterns benchmarks/bug_seeding_patterns_for_semantic_seeding.json ...
+"""
+import argparse
+import datetime
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from multiprocessing import cpu_count
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import utils.fileutils as fs
+from utils.analysed_file_store import AnalysedFileStore, AnalysedFileStoreWriter
+from utils.bug_seeding_pattern_utils import get_only_idf_lit_containing_patterns, create_pattern_index
+import utils.static_analysis_utils as static_analysis_utils
+from bug_seeding_approaches.SemSeed.BugSeedingUtils import token_embedding, token_similarity_cache
+from bug_seeding_approaches.SemSeed.CandidateContext import CandidateContext
+from bug_seeding_approaches.SemSeed.SemSeedBugs import SemSeedBugs
+from utils.seeded_bug_writer import get_seeded_bug_writer, close_seeded_bug_writers, OUTPUT_FORMATS
+import seed_bugs_to_a_file
+from synthetic_corpus import create_synthetic_corpus, get_corpus_paths
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+# Outside of the source tree, use --out to keep the results elsewhere
+RESULTS_DIR = os.path.join(tempfile.gettempdir(), 'bug_seeding_benchmarks')
+
+
+def get_peak_rss_mb() -> float:
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    if sys.platform == 'darwin':
+        peak_rss /= 1024
+    return round(peak_rss / 1024, 2)
+
+
+def get_git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class BenchmarkResults:
+    def __init__(self):
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Record the wall time and the peak RSS of a stage. The stage may add more details to the yielded
+        dictionary, eg. the number of 'items' it processed.
+        """
+        result = {}
+        start = time.perf_counter()
+        yield result
+        self.add(name, wall_time=time.perf_counter() - start, **result)
+
+    def add(self, name: str, wall_time: float, **details) -> None:
+        result = {'wall_time_s': round(wall_time, 4), 'peak_rss_mb': get_peak_rss_mb()}
+        result.update(details)
+        if 'items' in result:
+            result['items_per_s'] = round(result['items'] / wall_time, 2) if wall_time > 0 else None
+        self.stages[name] = result
+        print(f"{name:>16}: {result}")
+
+
+def load_analysed_files(analysed_dir: str, max_files: int, results: BenchmarkResults) -> List[Tuple[str, Dict]]:
+    """
+    The analysed files may be JSON files or the shards of an analysed-file store
+    :return: (name, analysed file) of every file
+    """
+    json_files = sorted(fs.go_through_dir(directory=analysed_dir, filter_file_extension='.json'))
+    if len(json_files) > 0:
+        if max_files > 0:
+            json_files = json_files[:max_files]
+        with results.stage('load_json') as stage:
+            analysed_files = [(Path(file).name, fs.read_json_file(file)) for file in json_files]
+            stage['items'] = len(analysed_files)
+            stage['bytes'] = sum(os.path.getsize(file) for file in json_files)
+        return [(name, analysed_file) for name, analysed_file in analysed_files if len(analysed_file) > 0]
+
+    store = AnalysedFileStore(store_dir=analysed_dir)
+    keys = sorted(store.records.keys())
+    if max_files > 0:
+        keys = keys[:max_files]
+    with results.stage('load_store') as stage:
+        analysed_files = [(Path(key).stem + '.json', store.read_analysed_file(key, content_hash))
+                          for key, content_hash in keys]
+        stage['items'] = len(analysed_files)
+    return analysed_files
+
+
+def benchmark_store(analysed_files: List[Tuple[str, Dict]], working_dir: str, results: BenchmarkResults) -> None:
+    store_dir = os.path.join(working_dir, 'store')
+    fs.create_dir_list_if_not_present([store_dir])
+    with results.stage('pack_store') as stage:
+        writer = AnalysedFileStoreWriter(store_dir=store_dir)
+        for name, analysed_file in analysed_files:
+            writer.append(key=name, content_hash='', analysed_file=analysed_file)
+        stage['items'] = len(analysed_files)
+        stage['bytes'] = sum(os.path.getsize(file) for file in Path(store_dir).iterdir())
+
+    with results.stage('read_store') as stage:
+        store = AnalysedFileStore(store_dir=store_dir)
+        for name, _ in analysed_files:
+            store.read_analysed_file(key=name, content_hash='')
+        stage['items'] = len(analysed_files)
+    store.close()
+
+
+def benchmark_matching(analysed_files: List[Tuple[str, Dict]], bug_seeding_pattern_index: Dict,
+                       K_most_frequent_identifiers: List, K_most_frequent_literals: List,
+                       results: BenchmarkResults) -> None:
+    """
+    Time matching and applying the patterns without writing any seeded files
+    """
+    match_time, apply_time = 0.0, 0.0
+    num_of_pairs, num_of_matches, num_of_sequences = 0, 0, 0
+    for _, analysed_file in analysed_files:
+        identifiers_in_different_scopes = static_analysis_utils.get_tokens_from_different_scopes(
+            analysed_file=analysed_file, kind='identifier', k_most_frequent=K_most_frequent_identifiers)
+        literals_in_different_scopes = static_analysis_utils.get_tokens_from_different_scopes(
+            analysed_file=analysed_file, kind='literal', k_most_frequent=K_most_frequent_literals)
+        candidate_context = CandidateContext(available_identifiers=identifiers_in_different_scopes,
+                                             available_literals=literals_in_different_scopes,
+                                             scope_of_selection='top_K')
+        for target_location in analysed_file['nodes']:
+            for seeding_pattern in bug_seeding_pattern_index.get(tuple(target_location['abstractedTokens']), []):
+                bug_seeding = SemSeedBugs(bug_seeding_pattern=seeding_pattern, target_location=target_location,
+                                          file_path=analysed_file['file_path'], similarity_threshold=0.3, K=1,
+                                          available_identifiers=identifiers_in_different_scopes,
+                                          available_literals=literals_in_different_scopes,
+                                          scope_of_selection='top_K', candidate_context=candidate_context)
+                num_of_pairs += 1
+                start = time.perf_counter()
+                is_matching = bug_seeding.is_matching_token_sequence()
+                match_time += time.perf_counter() - start
+                if not is_matching:
+                    continue
+                num_of_matches += 1
+                start = time.perf_counter()
+                num_of_sequences += len(bug_seeding.apply_pattern())
+                apply_time += time.perf_counter() - start
+    results.add('match', wall_time=match_time, items=num_of_pairs, matches=num_of_matches)
+    results.add('apply_pattern', wall_time=apply_time, items=num_of_matches, mutated_sequences=num_of_sequences)
+
+
+def benchmark_seeding(analysed_files: List[Tuple[str, Dict]], bug_seeding_pattern_index: Dict,
+                      K_most_frequent_identifiers: List, K_most_frequent_literals: List, working_dir: str,
+                      results: BenchmarkResults, output_format: str = 'files', js_dir: str = '',
+                      beautify: bool = False) -> None:
+    """
+    :param js_dir: The analysed JS files. Without them, the code of the seeded files is created from the tokens
+    """
+    out_dir = os.path.join(working_dir, 'seeded')
+    fs.create_dir_list_if_not_present([out_dir])
+    seed_bugs_to_a_file.random.seed(42)
+    with results.stage('seed') as stage:
+        bugs_seeded = 0
+        for name, analysed_file in analysed_files:
+            js_file = os.path.join(js_dir, Path(analysed_file['file_path']).name) if js_dir else None
+            bugs_seeded += seed_bugs_to_a_file.seed_bugs_to_a_file(analysed_file, name, bug_seeding_pattern_index,
+                                                                   K_most_frequent_identifiers,
+                                                                   K_most_frequent_literals, -1, out_dir,
+                                                                   output_format=output_format, beautify=beautify,
+                                                                   js_file=js_file)
+        stage['items'] = len(analysed_files)
+        stage['bugs_seeded'] = bugs_seeded
+    seeding = results.stages['seed']
+    seeding['bugs_per_s'] = round(bugs_seeded / seeding['wall_time_s'], 2) if seeding['wall_time_s'] > 0 else None
+    seeding['files_written'] = get_seeded_bug_writer(out_dir=out_dir, output_format=output_format).num_of_files_written
+    close_seeded_bug_writers()
+
+
+def benchmark_preparation(js_dir: str, max_files: int, working_dir: str, results: BenchmarkResults) -> None:
+    if shutil.which('node') is None:
+        print("Node.js is not available, the 'prepare' stage is skipped")
+        return
+    from utils.prepare_for_seeding_bug import prepare_a_js_file_for_seeding_bug
+
+    # The static analysis formats the JS files in place, hence it works on copies
+    js_copies_dir = os.path.join(working_dir, 'js')
+    analysed_dir = os.path.join(working_dir, 'prepared')
+    fs.create_dir_list_if_not_present([js_copies_dir, analysed_dir])
+    js_files = sorted(Path(js_dir).rglob('*.js'))
+    if max_files > 0:
+        js_files = js_files[:max_files]
+    js_copies = []
+    for i, js_file in enumerate(js_files):
+        js_copies.append(os.path.join(js_copies_dir, f'{i}_{js_file.name}'))
+        shutil.copyfile(js_file, js_copies[-1])
+
+    with results.stage('prepare') as stage:
+        errors = 0
+        for js_file in js_copies:
+            if prepare_a_js_file_for_seeding_bug(target_js_file_path=js_file,
+                                                 out_json_file_path=os.path.join(analysed_dir,
+                                                                                 Path(js_file).stem + '.json')):
+                errors += 1
+        stage['items'] = len(js_copies)
+        stage['errors'] = errors
+
+
+def compare_results(results: Dict, earlier_results: Dict) -> None:
+    print(f"\nCompared with {earlier_results.get('commit')} ({earlier_results.get('created')})")
+    for name, stage in results['stages'].items():
+        earlier_stage = earlier_results['stages'].get(name)
+        if earlier_stage is None or not earlier_stage['wall_time_s']:
+            continue
+        ratio = stage['wall_time_s'] / earlier_stage['wall_time_s']
+        print(f"{name:>16}: {earlier_stage['wall_time_s']:>10.4f}s -> {stage['wall_time_s']:>10.4f}s  "
+              f"({ratio:.2f}x)  peak RSS {earlier_stage['peak_rss_mb']} -> {stage['peak_rss_mb']} MB")
+
+
+if __name__ == '__main__':
+    fixture_paths = get_corpus_paths(FIXTURES_DIR)
+    parser = argparse.ArgumentParser(
+        prog='python run_benchmarks.py',
+        description="Benchmark the stages of bug seeding on the fixtures, a synthetic or a recorded corpus"
+    )
+    parser.add_argument('--synthetic_files', type=int, default=0,
+                        help='Benchmark a synthetic corpus of these many files instead of the fixtures')
+    parser.add_argument('--analysed_dir', type=str, default=fixture_paths['analysed_dir'],
+                        help='JSON files or the store created by the static analysis of the target files')
+    parser.add_argument('--bug_seeding_patterns', type=str, default=fixture_paths['bug_seeding_patterns'],
+                        help='The bug seeding patterns')
+    parser.add_argument('--K_freq_idf', type=str, default=fixture_paths['K_freq_idf'],
+                        help='K most frequent Identifier')
+    parser.add_argument('--K_freq_lit', type=str, default=fixture_paths['K_freq_lit'],
+                        help='K most frequent Literal')
+    parser.add_argument('--matrix', type=str, default=fixture_paths['matrix'],
+                        help='The exported token embedding matrix')
+    parser.add_argument('--vocabulary', type=str, default=fixture_paths['vocabulary'],
+                        help='The tokens of the exported token embedding matrix')
+    parser.add_argument('--js_dir', type=str, default='',
+                        help='Also benchmark the static analysis of the JS files in this directory')
+    parser.add_argument('--output_format', type=str, default='files', choices=OUTPUT_FORMATS,
+                        help='How the seeded files are written')
+    parser.add_argument('--beautify', action='store_true',
+                        help='Beautify the complete code of every seeded file')
+    parser.add_argument('--max_files', type=int, default=-1, help='Use only these many files, -1 for all')
+    parser.add_argument('--name', type=str, default='fixtures', help='The name of the corpus in the results')
+    parser.add_argument('--out', type=str, default='', help='Where the results will be written (JSON)')
+    parser.add_argument('--compare_with', type=str, default='', help='The results of an earlier run')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='bug_seeding_benchmark_') as working_dir:
+        corpus = vars(args).copy()
+        if args.synthetic_files > 0:
+            synthetic_paths = create_synthetic_corpus(out_dir=os.path.join(working_dir, 'corpus'),
+                                                      num_of_files=args.synthetic_files)
+            corpus.update(synthetic_paths)
+            corpus['name'] = f'synthetic_{args.synthetic_files}'
+        elif not corpus['js_dir'] and corpus['analysed_dir'] == fixture_paths['analysed_dir']:
+            # The code of the seeded files is created from the JS files of the fixtures
+            corpus['js_dir'] = fixture_paths['js_dir']
+
+        results = BenchmarkResults()
+        if not token_embedding.load_matrix(matrix_path=corpus['matrix'], vocabulary_path=corpus['vocabulary']):
+            print(f"*** Can't find the token embedding matrix '{corpus['matrix']}', tokens are looked up in the "
+                  f"fastText model")
+
+        with results.stage('index_patterns') as stage:
+            bug_seeding_patterns = get_only_idf_lit_containing_patterns(
+                fs.read_json_file(corpus['bug_seeding_patterns']))
+            bug_seeding_pattern_index = create_pattern_index(bug_seeding_patterns=bug_seeding_patterns)
+            stage['items'] = len(bug_seeding_patterns)
+        K_most_frequent_identifiers = fs.read_json_file(corpus['K_freq_idf'])
+        K_most_frequent_literals = fs.read_json_file(corpus['K_freq_lit'])
+
+        analysed_files = load_analysed_files(analysed_dir=corpus['analysed_dir'], max_files=args.max_files,
+                                             results=results)
+        benchmark_store(analysed_files=analysed_files, working_dir=working_dir, results=results)
+        benchmark_matching(analysed_files=analysed_files, bug_seeding_pattern_index=bug_seeding_pattern_index,
+                           K_most_frequent_identifiers=K_most_frequent_identifiers,
+                           K_most_frequent_literals=K_most_frequent_literals, results=results)
+        # Seeding should not profit from the similarities computed while benchmarking the matching
+        token_similarity_cache.clear()
+        benchmark_seeding(analysed_files=analysed_files, bug_seeding_pattern_index=bug_seeding_pattern_index,
+                          K_most_frequent_identifiers=K_most_frequent_identifiers,
+                          K_most_frequent_literals=K_most_frequent_literals, working_dir=working_dir,
+                          results=results, output_format=args.output_format,
+                          js_dir=args.js_dir or corpus['js_dir'], beautify=args.beautify)
+        if args.js_dir or args.synthetic_files > 0:
+            benchmark_preparation(js_dir=args.js_dir or corpus['js_dir'], max_files=args.max_files,
+                                  working_dir=working_dir, results=results)
+
+    commit = get_git_commit()
+    all_results = {
+        'commit': commit,
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': cpu_count(),
+        'corpus': {'name': corpus['name'], 'num_of_files': len(analysed_files),
+                   'num_of_patterns': len(bug_seeding_patterns),
+                   'num_of_locations': sum(len(analysed_file['nodes']) for _, analysed_file in analysed_files)},
+        'similarity_cache': token_similarity_cache.stats(),
+        'stages': results.stages
+    }
+    out = args.out or os.path.join(RESULTS_DIR, '{}_{}_{}.json'.format(
+        corpus['name'], (commit or 'unknown')[:10], datetime.datetime.now().strftime('%Y%m%d-%H%M%S')))
+    fs.create_dir_list_if_not_present([str(Path(out).parent)])
+    fs.writeJSONFile(data=all_results, file_path=out)
+    print(f"\nResults written to '{out}'")
+
+    if args.compare_with:
+        compare_results(results=all_results, earlier_results=fs.read_json_file(args.compare_with))
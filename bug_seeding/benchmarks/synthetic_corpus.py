@@ -0,0 +1,266 @@
+"""
+
+Created on 18-October-2026
+
+Create a synthetic corpus for benchmarking bug seeding: JS files, the corresponding static analysis results in
+the same format as 'extractNodeData.js' writes them, bug seeding patterns, the top-K most frequent
+Identifiers/Literals and a token embedding matrix of random vectors (no fastText model needed).
+
+The checked-in fixtures (bug_seeding/benchmarks/fixtures) have been created by
+    python bug_seeding/benchmarks/synthetic_corpus.py --out_dir bug_seeding/benchmarks/fixtures
+"""
+import argparse
+import os
+import random
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import utils.fileutils as fs
+
+IDENTIFIERS = ['i', 'j', 'n', 'len', 'count', 'total', 'index', 'value', 'result', 'size', 'offset', 'length', 'sum',
+               'max', 'min', 'start', 'end', 'key', 'item', 'data', 'x', 'y', 'width', 'height', 'limit', 'price',
+               'tax', 'items', 'node', 'list', 'left', 'right', 'step', 'delta', 'elapsed', 'timeout']
+LITERALS = ['0', '1', '2', '10', '100', '0.5', "'a'", '"id"', "''", 'true', 'false', 'null']
+OPERATORS = ['+', '-', '*', '/', '%', '<', '>', '<=', '>=', '===', '!==', '&&', '||']
+
+
+class _JSFileBuilder:
+    """
+    Emit the tokens of a JS file one after the other while keeping track of their ranges, the same way the
+    static analysis does
+    """
+
+    def __init__(self):
+        self.code = ''
+        self.tokens = []
+        self.ranges = []
+        self.range_to_identifier = {}
+        self.range_to_literal = {}
+
+    def emit(self, token: str, kind: str = None) -> Tuple[int, int]:
+        if len(self.code) > 0 and not self.code.endswith('\n'):
+            self.code += ' '
+        start = len(self.code)
+        self.code += token
+        end = len(self.code)
+        self.tokens.append(token)
+        self.ranges.append(f'{start}-{end}')
+        if kind == 'identifier':
+            self.range_to_identifier[f'{start}-{end}'] = token
+        elif kind == 'literal':
+            self.range_to_literal[f'{start}-{end}'] = token
+        return start, end
+
+    def newline(self) -> None:
+        self.code += '\n'
+
+    @property
+    def line(self) -> int:
+        return self.code.count('\n') + 1
+
+
+def _abstract(tokens: List[str], kinds: List[str]) -> List[str]:
+    """
+    Eg. ['a', '+', '1'] -> ['Idf_1', '+', 'Lit_1']
+    """
+    mapping, counts, abstracted_tokens = {}, {'identifier': 0, 'literal': 0}, []
+    for token, kind in zip(tokens, kinds):
+        if kind is None:
+            abstracted_tokens.append(token)
+            continue
+        if (kind, token) not in mapping:
+            counts[kind] += 1
+            mapping[(kind, token)] = '{}_{}'.format('Idf' if kind == 'identifier' else 'Lit', counts[kind])
+        abstracted_tokens.append(mapping[(kind, token)])
+    return abstracted_tokens
+
+
+def create_synthetic_js_file(file_name: str, num_of_functions: int, statements_per_function: int,
+                             rng: random.Random) -> Tuple[str, Dict]:
+    """
+    Create a JS file consisting of functions whose bodies are statements like 'var a = b + c ;' or
+    'if ( a < 1 ) { b = b + 1 ; }'
+    :return: The code and its static analysis results
+    """
+    js = _JSFileBuilder()
+    nodes = []
+    functions = []  # (name, start, end, identifiers, literals)
+
+    for f in range(num_of_functions):
+        function_name = f'func{f}'
+        function_start, _ = js.emit('function')
+        identifiers, literals, function_nodes = [function_name], [], []
+        js.emit(function_name, 'identifier')
+        for token in ['(', ')', '{']:
+            js.emit(token)
+        js.newline()
+
+        for _ in range(statements_per_function):
+            left, right = rng.sample(IDENTIFIERS, 2)
+            operand_kind = 'literal' if rng.random() < 0.3 else 'identifier'
+            operand = rng.choice(LITERALS) if operand_kind == 'literal' else rng.choice(
+                [idf for idf in IDENTIFIERS if idf != right])
+            operator = rng.choice(OPERATORS)
+            is_condition = rng.random() < 0.3
+
+            js.emit('if' if is_condition else 'var')
+            if is_condition:
+                js.emit('(')
+            else:
+                js.emit(left, 'identifier')
+                js.emit('=')
+                identifiers.append(left)
+            start, _ = js.emit(right, 'identifier')
+            js.emit(operator)
+            _, end = js.emit(operand, operand_kind)
+            identifiers.append(right)
+            (identifiers if operand_kind == 'identifier' else literals).append(operand)
+            function_nodes.append({
+                'tokens': [right, operator, operand],
+                'abstractedTokens': _abstract([right, operator, operand], ['identifier', None, operand_kind]),
+                'range': [start, end],
+                'type': 'BinaryExpression',
+                'line': f'{js.line}-{js.line}'
+            })
+            if is_condition:
+                for token, kind in [(')', None), ('{', None), (left, 'identifier'), ('=', None),
+                                    (left, 'identifier'), ('+', None), ('1', 'literal'), (';', None), ('}', None)]:
+                    js.emit(token, kind)
+                identifiers.extend([left, left])
+                literals.append('1')
+            else:
+                js.emit(';')
+            js.newline()
+
+        _, function_end = js.emit('}')
+        js.newline()
+        for node in function_nodes:
+            node['belongs_to_function'] = f'{function_name}_{function_start}-{function_end}'
+            node['belonging_function_range'] = f'{function_start}-{function_end}'
+        nodes.extend(function_nodes)
+        functions.append((f'{function_start}-{function_end}', identifiers, literals))
+
+    analysed_file = {
+        'nodes': nodes,
+        'functions_to_identifiers': {function_range: identifiers for function_range, identifiers, _ in functions},
+        'functions_to_literals': {function_range: literals for function_range, _, literals in functions},
+        'tokenList': js.tokens,
+        'tokenRangesList': js.ranges,
+        'range_to_identifier': js.range_to_identifier,
+        'range_to_literal': js.range_to_literal,
+        'file_path': file_name
+    }
+    return js.code, analysed_file
+
+
+def create_synthetic_patterns(num_of_patterns: int, rng: random.Random) -> List[Dict]:
+    """
+    Create patterns that swap the operator, replace an operand by a new Identifier or change a Literal
+    """
+    patterns = []
+    for p in range(num_of_patterns):
+        operator, other_operator = rng.sample(OPERATORS, 2)
+        left, right, unbound = rng.sample(IDENTIFIERS, 3)
+        literal, other_literal = rng.sample(LITERALS, 2)
+        kind_of_change = p % 3
+        if kind_of_change == 0:
+            fix, buggy = ['Idf_1', operator, 'Idf_2'], ['Idf_1', other_operator, 'Idf_2']
+            fix_actual, buggy_actual = [left, operator, right], [left, other_operator, right]
+        elif kind_of_change == 1:
+            fix, buggy = ['Idf_1', operator, 'Idf_2'], ['Idf_1', operator, 'Idf_3']
+            fix_actual, buggy_actual = [left, operator, right], [left, operator, unbound]
+        else:
+            fix, buggy = ['Idf_1', operator, 'Lit_1'], ['Idf_1', operator, 'Lit_2']
+            fix_actual, buggy_actual = [left, operator, literal], [left, operator, other_literal]
+        patterns.append({
+            'fix': fix,
+            'buggy': buggy,
+            'fix_actual': fix_actual,
+            'buggy_actual': buggy_actual,
+            'url': f'https://example.com/synthetic/commit/{p}',
+            'fix_tokenType': 'BinaryExpression',
+            'buggy_tokenType': 'BinaryExpression'
+        })
+    return patterns
+
+
+def create_random_token_embedding(tokens: List[str], dimension: int, matrix_path: str, vocabulary_path: str,
+                                  seed: int = 42) -> None:
+    """
+    Write a matrix of random vectors in the same format as 'export_token_embedding.py'
+    """
+    vocabulary = sorted(set(tokens))
+    matrix = np.random.default_rng(seed).standard_normal((len(vocabulary), dimension)).astype(np.float32)
+    np.save(matrix_path, matrix)
+    fs.writeJSONFile(data=vocabulary, file_path=vocabulary_path)
+
+
+def create_synthetic_corpus(out_dir: str, num_of_files: int, num_of_functions: int = 4,
+                            statements_per_function: int = 8, num_of_patterns: int = 60, dimension: int = 16,
+                            seed: int = 42) -> Dict:
+    """
+    Write a synthetic corpus to out_dir
+        out_dir/js/*.js                 The JS files
+        out_dir/analysed/*.json         Their static analysis results
+        out_dir/bug_seeding_patterns.json
+        out_dir/topK_identifiers.json, out_dir/topK_literals.json
+        out_dir/token_embedding_matrix.npy, out_dir/token_embedding_vocabulary.json
+    :return: The paths of the corpus (see the command line arguments of 'run_benchmarks.py')
+    """
+    rng = random.Random(seed)
+    paths = get_corpus_paths(out_dir)
+    fs.create_dir_list_if_not_present([out_dir, paths['js_dir'], paths['analysed_dir']])
+
+    tokens = set(IDENTIFIERS) | set(LITERALS)
+    for i in range(num_of_files):
+        file_name = f'synthetic_{i}.js'
+        code, analysed_file = create_synthetic_js_file(file_name=file_name, num_of_functions=num_of_functions,
+                                                       statements_per_function=statements_per_function, rng=rng)
+        fs.writeFile(data=code, file_path=os.path.join(paths['js_dir'], file_name))
+        fs.writeJSONFile(data=analysed_file, file_path=os.path.join(paths['analysed_dir'], f'synthetic_{i}.json'))
+        tokens.update(analysed_file['range_to_identifier'].values())
+
+    fs.writeJSONFile(data=create_synthetic_patterns(num_of_patterns=num_of_patterns, rng=rng),
+                     file_path=paths['bug_seeding_patterns'])
+    fs.writeJSONFile(data=IDENTIFIERS[:20], file_path=paths['K_freq_idf'])
+    fs.writeJSONFile(data=LITERALS[:6], file_path=paths['K_freq_lit'])
+    create_random_token_embedding(tokens=list(tokens), dimension=dimension, matrix_path=paths['matrix'],
+                                  vocabulary_path=paths['vocabulary'], seed=seed)
+    return paths
+
+
+def get_corpus_paths(corpus_dir: str) -> Dict:
+    return {
+        'js_dir': os.path.join(corpus_dir, 'js'),
+        'analysed_dir': os.path.join(corpus_dir, 'analysed'),
+        'bug_seeding_patterns': os.path.join(corpus_dir, 'bug_seeding_patterns.json'),
+        'K_freq_idf': os.path.join(corpus_dir, 'topK_identifiers.json'),
+        'K_freq_lit': os.path.join(corpus_dir, 'topK_literals.json'),
+        'matrix': os.path.join(corpus_dir, 'token_embedding_matrix.npy'),
+        'vocabulary': os.path.join(corpus_dir, 'token_embedding_vocabulary.json')
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        prog='python synthetic_corpus.py',
+        description="Create a synthetic corpus for benchmarking bug seeding"
+    )
+    parser.add_argument('--out_dir', type=str, required=True, help='Where the corpus will be written')
+    parser.add_argument('--num_of_files', type=int, default=3, help='The number of JS files')
+    parser.add_argument('--num_of_functions', type=int, default=4, help='The number of functions per file')
+    parser.add_argument('--statements_per_function', type=int, default=8,
+                        help='The number of statements per function')
+    parser.add_argument('--num_of_patterns', type=int, default=60, help='The number of bug seeding patterns')
+    parser.add_argument('--dimension', type=int, default=16, help='The dimension of the token embeddings')
+    parser.add_argument('--seed', type=int, default=42, help='The seed of the random generator')
+    args = parser.parse_args()
+
+    create_synthetic_corpus(out_dir=args.out_dir, num_of_files=args.num_of_files,
+                            num_of_functions=args.num_of_functions,
+                            statements_per_function=args.statements_per_function,
+                            num_of_patterns=args.num_of_patterns, dimension=args.dimension, seed=args.seed)
+    print(f"Wrote a synthetic corpus of {args.num_of_files} files to '{args.out_dir}'")
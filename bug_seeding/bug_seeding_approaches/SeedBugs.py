@@ -6,6 +6,8 @@ Created on 24-March-2020
 """
 from abc import ABC, abstractmethod
 from typing import List, Tuple
+import numpy as np
+import utils.static_analysis_utils as static_analysis_utils
 
 
 class SeedBugs(ABC):
@@ -25,6 +27,8 @@ class SeedBugs(ABC):
         }
         self.bug_seeding_pattern = bug_seeding_pattern
         self.target_location = target_location
+        # The indices of the target tokens in the token list of the file, found once for all mutated sequences
+        self._target_token_indices = None
 
     @abstractmethod
     def is_matching_token_sequence(self) -> bool:
@@ -69,32 +73,57 @@ class SeedBugs(ABC):
                 lit_tokens.append(concrete_token)
         return tokens, idf_tokens, lit_tokens
 
-    def replace_target_with_mutated_token_sequence(self, token_list: List, token_range_list: List,
-                                                   mutated_token_sequence: List) -> List:
+    def get_indices_of_target_tokens(self, token_starts: np.ndarray, token_ends: np.ndarray) -> Tuple[int, int]:
+        """
+        Find the tokens of the file that belong to the target location. The tokens are sorted by their ranges,
+        hence the target tokens are contiguous and found by a binary search.
+        :param token_starts: The start of the range of each token in the file
+        :param token_ends: The end of the range of each token in the file
+        :return: The index of the first target token and the index after the last target token
+        """
+        if self._target_token_indices is None:
+            start_range = self.target_location["range"][0]
+            end_range = self.target_location["range"][1]
+            first = int(np.searchsorted(token_starts, start_range, side='left'))
+            after_last = int(np.searchsorted(token_ends, end_range, side='right'))
+            self._target_token_indices = first, after_last
+        return self._target_token_indices
+
+    def replace_target_with_mutated_token_sequence(self, token_list: List, token_starts: np.ndarray,
+                                                   token_ends: np.ndarray, mutated_token_sequence: List) -> List:
         """
         Once the mutated token sequence has been found replace the target token sequence with this new
         :param token_list: The complete list of the token in the file
-        :param token_range_list: The ranges of each token contained in the token list
+        :param token_starts: The start of the range of each token contained in the token list
+        :param token_ends: The end of the range of each token contained in the token list
         :param mutated_token_sequence: The token sequence that will be inserted to seed bugs
         :return: Token sequence after seeding the bug
         """
 
-        assert len(token_list) == len(token_range_list)
-
-        start_range = self.target_location["range"][0]
-        end_range = self.target_location["range"][1]
-
-        indices_to_remove = [i for i, rng in enumerate(token_range_list) if int(rng.split(
-            '-')[0]) >= start_range and int(rng.split('-')[1]) <= end_range]
+        assert len(token_list) == len(token_starts) == len(token_ends)
 
-        part1 = token_list[:indices_to_remove[0]]
-        part2 = token_list[indices_to_remove[-1] + 1:]
+        first, after_last = self.get_indices_of_target_tokens(token_starts=token_starts, token_ends=token_ends)
 
-        token_list_after_seeding = part1 + mutated_token_sequence + part2
+        token_list_after_seeding = token_list[:first]
+        token_list_after_seeding.extend(mutated_token_sequence)
+        token_list_after_seeding.extend(token_list[after_last:])
         assert len(token_list_after_seeding) == len(token_list) - len(self.target_location['tokens']) + len(
             mutated_token_sequence)
         return token_list_after_seeding
 
+    def replace_target_in_source_code(self, source_code: str, mutated_token_sequence: List) -> str:
+        """
+        Replace the code of the target location with the mutated token sequence. Apart from the target location,
+        the code keeps its original formatting
+        :param source_code: The code of the analysed JS file
+        :param mutated_token_sequence: The token sequence that will be inserted to seed bugs
+        :return: Code after seeding the bug
+        """
+        start_range, end_range = self.target_location['range']
+        return static_analysis_utils.splice_source_code(source_code=source_code, start=int(start_range),
+                                                        end=int(end_range),
+                                                        replacement=' '.join(mutated_token_sequence))
+
     def get_abstract_token_to_concrete_mapping(self) -> dict:
         """
         This creates a mapping of the abstract token to its actual value
@@ -1,25 +1,49 @@
+import math
 import os
 from threading import Timer
 import numpy as np
 import subprocess
-from scipy.spatial.distance import cosine as cosine_distance
-import scipy
 from typing import List
-import fasttext
+from bug_seeding_approaches.SemSeed.TokenEmbedding import TokenEmbedding, normalize_rows
+from bug_seeding_approaches.SemSeed.TokenSimilarityCache import TokenSimilarityCache
 
-token_embedding = fasttext.load_model(path='benchmarks/all_token_embedding_FAST_TEXT.bin')
+TOKEN_EMBEDDING_MATRIX = 'benchmarks/token_embedding_matrix.npy'
+TOKEN_EMBEDDING_VOCABULARY = 'benchmarks/token_embedding_vocabulary.json'
 
+# The exported matrix (see 'export_token_embedding.py') is memory-mapped on first use, tokens not present in it fall
+# back to the fastText model
+token_embedding = TokenEmbedding(fasttext_model_path='benchmarks/all_token_embedding_FAST_TEXT.bin',
+                                 matrix_path=TOKEN_EMBEDDING_MATRIX,
+                                 vocabulary_path=TOKEN_EMBEDDING_VOCABULARY)
 
-def get_cosine_distance_between_tokens(label1, label2):
+
+# The cosine distances of token pairs already compared in this process
+token_similarity_cache = TokenSimilarityCache(max_size=1000000)
+
+
+def cosine_distance(u: np.ndarray, v: np.ndarray) -> float:
+    # Same as scipy.spatial.distance.cosine, importing scipy would take longer than seeding a small file
+    uv = np.dot(u, v)
+    uu = np.dot(u, u)
+    vv = np.dot(v, v)
+    return np.clip(1.0 - uv / math.sqrt(uu * vv), 0.0, 2.0)
+
+
+def _compute_cosine_distance_between_tokens(label1, label2):
     v1 = token_embedding[label1]
     v2 = token_embedding[label2]
-    return round(scipy.spatial.distance.cosine(v1, v2), 3)
+    return round(float(cosine_distance(v1, v2)), 3)
+
+
+def get_cosine_distance_between_tokens(label1, label2):
+    return token_similarity_cache.get_or_compute(label1, label2, _compute_cosine_distance_between_tokens)
 
 
 def perform_analogy_queries_to_get_unbound_token(tokens_in_pattern: List, unbound_token_in_pattern: str,
                                                  tokens_in_target: List,
                                                  candidate_tokens: List,
-                                                 best_k_matching_unbound_token: int
+                                                 best_k_matching_unbound_token: int,
+                                                 normalized_candidate_embeddings: np.ndarray = None
                                                  ) -> List[str]:
     """
     - Find the difference between all tokens in tokens_in_pattern with unbound_token_in_pattern
@@ -46,6 +70,7 @@ def perform_analogy_queries_to_get_unbound_token(tokens_in_pattern: List, unboun
     :param tokens_in_target: Token sequence where we want to seed bug
     :param candidate_tokens: We select one token from the candidate tokens using analogy queries
     :param best_k_matching_unbound_token:
+    :param normalized_candidate_embeddings: The normalized embeddings of the candidate tokens if already known
     :return:
     """
     try:
@@ -58,6 +83,12 @@ def perform_analogy_queries_to_get_unbound_token(tokens_in_pattern: List, unboun
     except AssertionError:
         print("There must be at least one token to select from ")
 
+    if len(candidate_tokens) == 0:
+        return []
+
+    if normalized_candidate_embeddings is None:
+        normalized_candidate_embeddings = token_embedding.get_normalized_vectors(candidate_tokens)
+
     ref_label_vec = token_embedding[unbound_token_in_pattern]
     analogous_token_embeddings = []
 
@@ -66,29 +97,51 @@ def perform_analogy_queries_to_get_unbound_token(tokens_in_pattern: List, unboun
                                           token_embedding[src_label] + token_embedding[tokens_in_target[i]])
 
     if len(analogous_token_embeddings) > 0:
-        sum_analogous_vectors = np.sum(analogous_token_embeddings, axis=0)
-    else:
-        sum_analogous_vectors = 0
-
-    candidate_token_embeddings = [token_embedding[label] for label in candidate_tokens]
-
-    selected_tokens = []
-    avg_analogous_embedding = sum_analogous_vectors / len(analogous_token_embeddings)
-
-    if isinstance(sum_analogous_vectors, np.ndarray):
-        # Now we need to find the 'token' from 'candidate_tokens' that is most similar to the sum of analogous
+        # Now we need to find the 'token' from 'candidate_tokens' that is most similar to the average of analogous
         # embeddings
-        similarities = [1 - cosine_distance(avg_analogous_embedding, candidate_token_embedding)
-                        for candidate_token_embedding in candidate_token_embeddings]
-        most_similar_indices = np.argsort(similarities)[::-1][:best_k_matching_unbound_token]
-        selected_tokens = [candidate_tokens[i] for i in most_similar_indices]
-        # selected_token = candidate_tokens[int(np.argmax(similarities))]
+        avg_analogous_embedding = np.mean(analogous_token_embeddings, axis=0)
+        selected_tokens = select_most_similar_tokens(query_vector=avg_analogous_embedding,
+                                                     candidate_tokens=candidate_tokens,
+                                                     normalized_candidate_embeddings=normalized_candidate_embeddings,
+                                                     k=best_k_matching_unbound_token)
     else:  # For cases where there does not exist any label that may be compared to find an analogous label Eg.
         # return a;
-        selected_tokens.append(get_closest_matching_label(unbound_token_in_pattern, candidate_tokens))
+        selected_tokens = select_most_similar_tokens(query_vector=ref_label_vec,
+                                                     candidate_tokens=candidate_tokens,
+                                                     normalized_candidate_embeddings=normalized_candidate_embeddings,
+                                                     k=1)
     return selected_tokens
 
 
+def select_most_similar_tokens(query_vector: np.ndarray, candidate_tokens: List,
+                               normalized_candidate_embeddings: np.ndarray, k: int) -> List[str]:
+    """
+    Select the 'k' candidate tokens whose embeddings have the highest cosine similarity with the query vector.
+    The similarities of all candidates are computed using one matrix-vector product and only the top-k are sorted.
+    Candidates having the same similarity are ordered by the token itself, so that the selection does not depend
+    on the order of the candidates.
+    :param query_vector:
+    :param candidate_tokens:
+    :param normalized_candidate_embeddings: The row 'i' is the normalized embedding of candidate_tokens[i]
+    :param k:
+    :return: At most 'k' tokens, the most similar first
+    """
+    num_of_candidates = len(candidate_tokens)
+    if num_of_candidates == 0 or k <= 0:
+        return []
+    similarities = normalized_candidate_embeddings @ normalize_rows(query_vector)
+
+    if k < num_of_candidates:
+        # Every candidate that is at least as similar as the k-th most similar one, including ties
+        top_k_indices = np.argpartition(-similarities, k - 1)[:k]
+        kth_similarity = similarities[top_k_indices].min()
+        selected_indices = np.flatnonzero(similarities >= kth_similarity)
+    else:
+        selected_indices = np.arange(num_of_candidates)
+    most_similar_indices = sorted(selected_indices, key=lambda i: (-similarities[i], candidate_tokens[i]))[:k]
+    return [candidate_tokens[i] for i in most_similar_indices]
+
+
 def get_closest_matching_label(unbound_token_in_pattern: str, candidate_tokens: List) -> str:
     """
     Given a unbound_token_in_pattern and a list of candidate_tokens, find the closest
@@ -97,13 +150,11 @@ def get_closest_matching_label(unbound_token_in_pattern: str, candidate_tokens:
     :param candidate_tokens:
     :return:
     """
-    distances = []
-    for cur_label in candidate_tokens:
-        distance = get_cosine_distance_between_tokens(
-            label1=unbound_token_in_pattern, label2=cur_label)
-        distances.append(distance)
-    min_idx = int(np.argmin(distances))
-    return candidate_tokens[min_idx]
+    return select_most_similar_tokens(query_vector=token_embedding[unbound_token_in_pattern],
+                                      candidate_tokens=candidate_tokens,
+                                      normalized_candidate_embeddings=token_embedding.get_normalized_vectors(
+                                          candidate_tokens),
+                                      k=1)[0]
 
 
 def remove_subsumed_nodes(all_mutable_nodes):
@@ -0,0 +1,80 @@
+"""
+
+Created on 18-October-2026
+
+The Identifiers and Literals that may be selected as unbound tokens are the same for every pattern applied to
+a file (and to a function if the scope of selection is 'function'). The candidate context creates the
+candidate tokens and their normalized embeddings once per file and shares them across all patterns.
+"""
+from typing import Dict, List, Tuple, Iterable
+import numpy as np
+from bug_seeding_approaches.SemSeed.BugSeedingUtils import token_embedding, \
+    get_identifiers_given_scope_of_selection, get_literals_given_scope_of_selection
+
+
+class CandidateContext:
+    def __init__(self, available_identifiers: Dict, available_literals: Dict, scope_of_selection: str):
+        """
+        :param available_identifiers: Identifiers in different scopes of the file
+        :param available_literals: Literals in different scopes of the file
+        :param scope_of_selection: One of 'function', 'file' or 'top_K'
+        """
+        self.available_identifiers = available_identifiers
+        self.available_literals = available_literals
+        self.scope_of_selection = scope_of_selection
+
+        # (kind, function range) -> (candidate tokens, normalized embeddings, token to row)
+        self._candidates = {}
+        # (kind, function range, tokens to remove) -> mask of the candidates that remain
+        self._removal_masks = {}
+
+    def _key(self, kind: str, target_function_range: str) -> Tuple:
+        # Only the 'function' scope depends on where the target is present
+        if self.scope_of_selection == 'function':
+            return kind, target_function_range
+        return kind, None
+
+    def _get(self, kind: str, target_function_range: str) -> Tuple[List[str], np.ndarray, Dict]:
+        key = self._key(kind, target_function_range)
+        if key not in self._candidates:
+            if kind == 'identifier':
+                candidates = get_identifiers_given_scope_of_selection(
+                    available_idfs_in_scopes=self.available_identifiers,
+                    scope_of_selection=self.scope_of_selection,
+                    target_function_range=target_function_range)
+            else:
+                candidates = get_literals_given_scope_of_selection(
+                    available_lits_in_scopes=self.available_literals,
+                    scope_of_selection=self.scope_of_selection,
+                    target_function_range=target_function_range)
+            tokens = sorted(candidates)
+            self._candidates[key] = (tokens, token_embedding.get_normalized_vectors(tokens),
+                                     {token: row for row, token in enumerate(tokens)})
+        return self._candidates[key]
+
+    def get_candidate_tokens(self, kind: str, target_function_range: str) -> List[str]:
+        """
+        :param kind: 'identifier' or 'literal'
+        :param target_function_range: The range of the function where the target is present
+        :return: All candidate tokens of the given kind
+        """
+        return self._get(kind, target_function_range)[0]
+
+    def get_candidates_excluding(self, kind: str, target_function_range: str,
+                                 tokens_to_remove: Iterable[str]) -> Tuple[List[str], np.ndarray]:
+        """
+        Get the candidates of the given kind except the tokens already present in the target.
+        :return: The candidate tokens and the matrix of their normalized embeddings
+        """
+        tokens, embeddings, token_to_row = self._get(kind, target_function_range)
+        mask_key = self._key(kind, target_function_range) + (frozenset(tokens_to_remove),)
+        mask = self._removal_masks.get(mask_key)
+        if mask is None:
+            mask = np.ones(len(tokens), dtype=bool)
+            for token in mask_key[-1]:
+                if token in token_to_row:
+                    mask[token_to_row[token]] = False
+            self._removal_masks[mask_key] = mask
+        if mask.all():
+            return tokens, embeddings
+        return [token for token, keep in zip(tokens, mask) if keep], embeddings[mask]
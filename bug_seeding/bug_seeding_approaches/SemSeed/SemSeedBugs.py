@@ -5,39 +5,43 @@ Created on 24-March-2020
 
 """
 
-from typing import List, Dict
+import itertools
+from typing import List, Dict, Tuple, Iterator
 
 import numpy as np
 
 from bug_seeding_approaches.SeedBugs import SeedBugs
 from bug_seeding_approaches.SemSeed.BugSeedingUtils import get_cosine_distance_between_tokens, \
-    perform_analogy_queries_to_get_unbound_token, get_identifiers_given_scope_of_selection, \
-    get_literals_given_scope_of_selection
+    perform_analogy_queries_to_get_unbound_token
+from bug_seeding_approaches.SemSeed.CandidateContext import CandidateContext
 
 
 class SemSeedBugs(SeedBugs):
 
     def __init__(self, bug_seeding_pattern: Dict, target_location: Dict, file_path: str,
                  available_identifiers: Dict, available_literals: Dict,
-                 similarity_threshold: float = 0.2, K: int = 1, scope_of_selection='function'):
+                 similarity_threshold: float = 0.2, K: int = 1, scope_of_selection='function',
+                 candidate_context: CandidateContext = None):
         """
         Seed a bug using SemSeed
         :param similarity_threshold: The similarity threshold that will be used to check if bug may be seeded Ranges
                                      between 0.0 - 1.0 (1.0 means only seed if exactly similar)
         :param K: If K=1, use the best unbound token to seed the bug. If K=10, choose the top 10
+        :param candidate_context: The candidate tokens of the file shared across patterns. Created from
+                                  available_identifiers and available_literals if not given
         """
         super().__init__(bug_seeding_pattern=bug_seeding_pattern, target_location=target_location, file_path=file_path)
         self.similarity_threshold = similarity_threshold
-        self.identifiers_available_for_selecting_unbound_token = get_identifiers_given_scope_of_selection(
-            available_idfs_in_scopes=available_identifiers,
-            scope_of_selection=scope_of_selection,
-            target_function_range=target_location['belonging_function_range']
-        )
-        self.literals_available_for_selecting_unbound_token = get_literals_given_scope_of_selection(
-            available_lits_in_scopes=available_literals,
-            scope_of_selection=scope_of_selection,
-            target_function_range=target_location['belonging_function_range']
-        )
+        if candidate_context is None:
+            candidate_context = CandidateContext(available_identifiers=available_identifiers,
+                                                 available_literals=available_literals,
+                                                 scope_of_selection=scope_of_selection)
+        self.candidate_context = candidate_context
+        self.target_function_range = target_location['belonging_function_range']
+        self.identifiers_available_for_selecting_unbound_token = candidate_context.get_candidate_tokens(
+            kind='identifier', target_function_range=self.target_function_range)
+        self.literals_available_for_selecting_unbound_token = candidate_context.get_candidate_tokens(
+            kind='literal', target_function_range=self.target_function_range)
         self.K = K
         self.SPECIAL_TOKEN = '__UNBOUND__TOKEN__'
 
@@ -52,12 +56,15 @@ class SemSeedBugs(SeedBugs):
         seeding_pattern_correct_tok_seq = seeding_pattern['fix_actual']
         target_token_sequence = target['tokens']
 
-        cosine_similarities = []
-        for i, abs_tok in enumerate(target['abstractedTokens']):
-            # Do not care about tokens that are not Identifiers or Literals
-            if not abs_tok.startswith('Idf_') and not abs_tok.startswith('Lit_'):
-                continue
+        # Do not care about tokens that are not Identifiers or Literals. The abstracted tokens of the target are the
+        # same as the 'fix' of the pattern, hence the positions of the pattern may be used if it has them
+        idf_lit_positions = seeding_pattern.get('fix_idf_lit_positions')
+        if idf_lit_positions is None:
+            idf_lit_positions = [i for i, abs_tok in enumerate(target['abstractedTokens'])
+                                 if abs_tok.startswith('Idf_') or abs_tok.startswith('Lit_')]
 
+        cosine_similarities = []
+        for i in idf_lit_positions:
             # Find cosine similarity
             if seeding_pattern_correct_tok_seq[i] == target_token_sequence[i]:
                 # If the tokens are exactly same, no point in doing anything else
@@ -78,10 +85,40 @@ class SemSeedBugs(SeedBugs):
         else:
             return False
 
-    def apply_pattern(self) -> List[List]:
-        # The mutated token sequences we are generating
-        mutated_token_sequences = []
+    def apply_pattern(self, max_variants: int = None) -> List[List]:
+        return list(self.generate_variants(max_variants=max_variants))
 
+    def generate_variants(self, max_variants: int = None) -> Iterator[List]:
+        """
+        Lazily generate the mutated token sequences. If the pattern needs unbound tokens, there is one variant for
+        every combination of the selected unbound tokens. The variants are generated in a stable order, the unbound
+        token of the first placeholder changes the slowest (same as itertools.product).
+        :param max_variants: Generate at most these many variants. All if None
+        :return:
+        """
+        mutated_token_sequence, idx_to_unbound_tokens = self._create_mutated_token_sequence_with_placeholders()
+
+        # If for some index, an unbound token could not be selected then it is not possible to seed a bug
+        if any(len(selected_unbound_tokens) == 0 for selected_unbound_tokens in idx_to_unbound_tokens.values()):
+            return
+
+        # If seeding the bug did not need any unbound token, there is exactly one variant
+        variants = itertools.product(*idx_to_unbound_tokens.values())
+        if max_variants is not None:
+            variants = itertools.islice(variants, max_variants)
+        for selected_unbound_tokens in variants:
+            variant = list(mutated_token_sequence)
+            for idx, unbound_token in zip(idx_to_unbound_tokens.keys(), selected_unbound_tokens):
+                variant[idx] = unbound_token
+            yield variant
+
+    def _create_mutated_token_sequence_with_placeholders(self) -> Tuple[List, Dict[int, List[str]]]:
+        """
+        Apply the 'buggy' part of the pattern to the target. The unbound tokens are selected but not yet
+        placed in the sequence.
+        :return: The mutated token sequence having placeholders for the unbound tokens and the
+                 selected unbound tokens for the index of each placeholder
+        """
         # Create a mapping between abstract token to concrete
         idf_lit_mapping_of_target = self.get_abstract_token_to_concrete_mapping()
 
@@ -93,36 +130,33 @@ class SemSeedBugs(SeedBugs):
             given_token_seq=self.bug_seeding_pattern['fix_actual'])
 
         # Filter Identifiers and Literals already present in the target from the scope of selection
-        available_identifiers_for_unbound_token = list(self.identifiers_available_for_selecting_unbound_token - set(
-            identifiers_in_target))
-        available_literals_for_unbound_token = list(self.literals_available_for_selecting_unbound_token - set(
-            literals_in_target))
-
-        mutated_token_sequence = []
+        available_identifiers_for_unbound_token = self.candidate_context.get_candidates_excluding(
+            kind='identifier', target_function_range=self.target_function_range, tokens_to_remove=identifiers_in_target)
+        available_literals_for_unbound_token = self.candidate_context.get_candidates_excluding(
+            kind='literal', target_function_range=self.target_function_range, tokens_to_remove=literals_in_target)
+
+        # *** If not Identifier/Literal, simply copy the token ***
+        mutated_token_sequence = list(self.bug_seeding_pattern['buggy'])
+        idf_lit_positions = self.bug_seeding_pattern.get('buggy_idf_lit_positions')
+        if idf_lit_positions is None:
+            idf_lit_positions = [i for i, abstract_token in enumerate(mutated_token_sequence)
+                                 if abstract_token.startswith('Idf_') or abstract_token.startswith('Lit_')]
         idx_to_unbound_tokens = {}
-        # Go over the abstract tokens of the 'buggy' part of the bug seeding pattern
-        for i, abstract_token_in_seeding_pattern in enumerate(self.bug_seeding_pattern['buggy']):
-
-            # *** If not Identifier/Literal, simply copy the token and go to the next token ***
-            if not abstract_token_in_seeding_pattern.startswith(
-                    'Idf_') and not abstract_token_in_seeding_pattern.startswith('Lit_'):
-                mutated_token_sequence.append(abstract_token_in_seeding_pattern)
-                continue
-
-            # *** If the abstracted token is of type Identifier/Literal ***
+        # Go over the Identifiers/Literals of the 'buggy' part of the bug seeding pattern
+        for i in idf_lit_positions:
+            abstract_token_in_seeding_pattern = mutated_token_sequence[i]
 
             # If the abstract token matches that of target then simply use that Identifier/Literal
             if abstract_token_in_seeding_pattern in idf_lit_mapping_of_target:
-                mutated_token_sequence.append(
-                    idf_lit_mapping_of_target[abstract_token_in_seeding_pattern])
+                mutated_token_sequence[i] = idf_lit_mapping_of_target[abstract_token_in_seeding_pattern]
             else:  # The seeding needs an unbound token
                 # The selected_unbound_token whose analogous token has to be found
                 unbound_token_in_pattern = self.bug_seeding_pattern['buggy_actual'][i]
 
                 if abstract_token_in_seeding_pattern.startswith('Idf_'):
-                    candidates = available_identifiers_for_unbound_token
+                    candidates, candidate_embeddings = available_identifiers_for_unbound_token
                 else:
-                    candidates = available_literals_for_unbound_token
+                    candidates, candidate_embeddings = available_literals_for_unbound_token
 
                 selected_unbound_tokens = perform_analogy_queries_to_get_unbound_token(
                     tokens_in_pattern=idfs_lits_in_pattern,
@@ -130,37 +164,10 @@ class SemSeedBugs(SeedBugs):
                     tokens_in_target=idfs_lits_in_target,
                     candidate_tokens=candidates,
                     best_k_matching_unbound_token=self.K,
+                    normalized_candidate_embeddings=candidate_embeddings
                 )
-                # We do not immediately append it, rather collect all possible and append later
+                # We do not immediately place it, rather collect all possible and place them later
                 idx_to_unbound_tokens[i] = selected_unbound_tokens
-                mutated_token_sequence.append('__PLACEHOLDER__')
+                mutated_token_sequence[i] = '__PLACEHOLDER__'
 
-        # Calculate the number of possible variants
-        possible_variants = 1
-        for idx, selected_unbound_tokens in idx_to_unbound_tokens.items():
-            possible_variants *= len(selected_unbound_tokens)
-
-        mutated_token_sequences = [mutated_token_sequence] * possible_variants
-        # Seeding bug did not need any unbound token
-        if len(idx_to_unbound_tokens) == 0:
-            return mutated_token_sequences
-        else:
-            for idx, selected_unbound_tokens in idx_to_unbound_tokens.items():
-                j = 0
-                # If for some index, an unbound token could not be selected then it is not possible to seed a bug
-                if len(selected_unbound_tokens) == 0:
-                    mutated_token_sequences = []
-                    return mutated_token_sequences
-                else:
-                    possible_variants /= len(selected_unbound_tokens)
-                    while j < len(mutated_token_sequences):
-                        s = 0
-                        while s < len(selected_unbound_tokens):
-                            t = list(mutated_token_sequences[j])
-                            t[idx] = selected_unbound_tokens[s]
-                            if (j + 1) % possible_variants == 0:
-                                s += 1
-                            mutated_token_sequences[j] = t
-                            j += 1
-                            # mutated_token_sequences.append(t)
-            return mutated_token_sequences
+        return mutated_token_sequence, idx_to_unbound_tokens
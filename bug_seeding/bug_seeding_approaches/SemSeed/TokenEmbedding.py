@@ -0,0 +1,183 @@
+"""
+
+Created on 18-October-2026
+
+The token embeddings used by SemSeed. Instead of querying the complete fastText model for every token, the
+vectors of the tokens we actually need (tokens in the patterns, the top-K most frequent Identifiers/Literals
+and the tokens in the target files) are exported once to a float32 matrix. The matrix is memory-mapped
+read-only and hence the pages are shared by all processes of a Pool.
+
+Nothing is loaded when the module is imported. The matrix is loaded on first use and the fastText model (and the
+fasttext package) only once a token is not present in the matrix, hence importing the seeding code is cheap.
+"""
+import os
+from pathlib import Path
+from typing import List, Iterable, Dict
+import numpy as np
+import utils.fileutils as fs
+
+
+class TokenEmbedding:
+    def __init__(self, fasttext_model_path: str, matrix_path: str = None, vocabulary_path: str = None):
+        """
+        :param fasttext_model_path: The fastText model. Only loaded if a token is not present in the matrix
+        :param matrix_path: The '.npy' file containing the exported vectors. One row per token. Loaded on first use
+        :param vocabulary_path: A JSON file containing the tokens. The i-th token corresponds to the i-th row
+        """
+        self.fasttext_model_path = fasttext_model_path
+        self._fasttext_model = None
+        self._matrix = None
+        self._token_to_row = {}
+        # Out of vocabulary tokens get their vectors from the fastText subword information
+        self._out_of_vocabulary_vectors = {}
+        # The matrix still to be loaded on first use
+        self._matrix_paths = (matrix_path, vocabulary_path) if matrix_path and vocabulary_path else None
+
+    def load_matrix(self, matrix_path: str, vocabulary_path: str) -> bool:
+        """
+        Memory-map an exported matrix. Does nothing if the matrix has not been exported yet.
+        :return: True if the matrix could be loaded
+        """
+        self._matrix_paths = None
+        if not Path(matrix_path).is_file() or not Path(vocabulary_path).is_file():
+            return False
+        self._matrix = np.load(matrix_path, mmap_mode='r')
+        self._token_to_row = {token: row for row, token in enumerate(fs.read_json_file(vocabulary_path))}
+        return True
+
+    def _load_matrix_on_first_use(self) -> None:
+        if self._matrix_paths is not None:
+            matrix_path, vocabulary_path = self._matrix_paths
+            self.load_matrix(matrix_path=matrix_path, vocabulary_path=vocabulary_path)
+
+    @property
+    def matrix(self):
+        self._load_matrix_on_first_use()
+        return self._matrix
+
+    @property
+    def token_to_row(self) -> Dict[str, int]:
+        self._load_matrix_on_first_use()
+        return self._token_to_row
+
+    @property
+    def fasttext_model(self):
+        return self.load_fasttext_model()
+
+    def load_fasttext_model(self):
+        if self._fasttext_model is None:
+            import fasttext
+            self._fasttext_model = fasttext.load_model(path=self.fasttext_model_path)
+        return self._fasttext_model
+
+    def __getitem__(self, token: str) -> np.ndarray:
+        row = self.token_to_row.get(token)
+        if row is not None:
+            return self.matrix[row]
+        vector = self._out_of_vocabulary_vectors.get(token)
+        if vector is None:
+            vector = np.asarray(self.fasttext_model.get_word_vector(token), dtype=np.float32)
+            self._out_of_vocabulary_vectors[token] = vector
+        return vector
+
+    def __contains__(self, token: str) -> bool:
+        return token in self.token_to_row
+
+    def get_missing_tokens(self, tokens: Iterable[str]) -> set:
+        """
+        :return: The tokens that are not present in the matrix, their vectors come from the (slow) fastText model
+        """
+        return {token for token in tokens if token not in self.token_to_row}
+
+    @property
+    def dimension(self) -> int:
+        if self.matrix is not None:
+            return self.matrix.shape[1]
+        return self.fasttext_model.get_dimension()
+
+    def get_vectors(self, tokens: List[str]) -> np.ndarray:
+        """
+        Get the vectors of many tokens at once. Tokens present in the matrix are copied using a single
+        fancy-indexing operation.
+        :return: A (len(tokens) x dimension) matrix
+        """
+        vectors = np.empty((len(tokens), self.dimension), dtype=np.float32)
+        positions, rows = [], []
+        for i, token in enumerate(tokens):
+            row = self.token_to_row.get(token)
+            if row is None:
+                vectors[i] = self[token]
+            else:
+                positions.append(i)
+                rows.append(row)
+        if len(rows) > 0:
+            vectors[positions] = self.matrix[rows]
+        return vectors
+
+    def get_normalized_vectors(self, tokens: List[str]) -> np.ndarray:
+        return normalize_rows(self.get_vectors(tokens))
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """
+    Scale each row to unit length, the dot product of two normalized rows is their cosine similarity.
+    Rows with zero length are kept as they are.
+    """
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+
+def collect_tokens_for_embedding(bug_seeding_patterns: List, K_most_frequent_identifiers: List,
+                                 K_most_frequent_literals: List, analysed_files: Iterable[str] = (),
+                                 analysed_file_store=None) -> set:
+    """
+    Collect the tokens whose vectors are needed while seeding bugs.
+    :param bug_seeding_patterns: The concrete tokens of both the 'fix' and the 'buggy' part are used
+    :param K_most_frequent_identifiers:
+    :param K_most_frequent_literals:
+    :param analysed_files: The JSON files created by the static analysis of the target JS files
+    :param analysed_file_store: The store (utils.analysed_file_store.AnalysedFileStore) containing the static
+                                analysis results of the target JS files
+    :return:
+    """
+    tokens = set(K_most_frequent_identifiers) | set(K_most_frequent_literals)
+    for pattern in bug_seeding_patterns:
+        tokens.update(pattern['fix_actual'])
+        tokens.update(pattern['buggy_actual'])
+    for analysed_file in analysed_files:
+        analysed = fs.read_json_file(analysed_file)
+        if len(analysed) == 0:
+            continue
+        tokens.update(analysed['range_to_identifier'].values())
+        tokens.update(analysed['range_to_literal'].values())
+    if analysed_file_store is not None:
+        tokens.update(analysed_file_store.get_identifiers_and_literals())
+    return tokens
+
+
+def export_token_embedding_matrix(tokens: Iterable[str], fasttext_model_path: str, matrix_path: str,
+                                  vocabulary_path: str) -> Dict:
+    """
+    Write the fastText vectors of the given tokens to a float32 matrix and the tokens to a vocabulary file.
+    :param tokens: The tokens to export
+    :param fasttext_model_path:
+    :param matrix_path: Where the '.npy' matrix will be written
+    :param vocabulary_path: Where the JSON list of tokens will be written
+    :return: Some statistics about the export
+    """
+    import fasttext
+    model = fasttext.load_model(path=fasttext_model_path)
+    vocabulary = sorted(set(tokens))
+
+    # A matrix exported earlier may still be memory-mapped, hence it is replaced rather than overwritten
+    matrix = np.lib.format.open_memmap(matrix_path + '.tmp', mode='w+', dtype=np.float32,
+                                       shape=(len(vocabulary), model.get_dimension()))
+    for row, token in enumerate(vocabulary):
+        matrix[row] = model.get_word_vector(token)
+    matrix.flush()
+    del matrix
+    os.replace(matrix_path + '.tmp', matrix_path)
+
+    fs.writeJSONFile(data=vocabulary, file_path=vocabulary_path)
+    return {'num_of_tokens': len(vocabulary), 'dimension': model.get_dimension()}
@@ -0,0 +1,143 @@
+"""
+
+Created on 18-October-2026
+
+The same (pattern token, target token) pairs are compared again and again across files. This bounded cache
+remembers the cosine distances of token pairs and evicts the least recently used pair once it is full.
+"""
+import os
+import sys
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+import utils.fileutils as fs
+
+
+class TokenSimilarityCache:
+    def __init__(self, max_size: int = 1000000):
+        """
+        :param max_size: The maximum number of token pairs that are kept
+        """
+        self.max_size = max_size
+        self._cache = OrderedDict()
+        # The pairs computed since track_added_pairs was called, None if they are not tracked
+        self._added = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(label1: str, label2: str) -> Tuple[str, str]:
+        # The cosine distance is symmetric, hence (a, b) and (b, a) share the same entry
+        if isinstance(label1, str):
+            label1 = sys.intern(label1)
+        if isinstance(label2, str):
+            label2 = sys.intern(label2)
+        return (label1, label2) if label1 <= label2 else (label2, label1)
+
+    def get_or_compute(self, label1: str, label2: str, compute: Callable[[str, str], float]) -> float:
+        key = self._key(label1, label2)
+        value = self._cache.get(key)
+        if value is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return value
+        self.misses += 1
+        value = compute(label1, label2)
+        self._put(key, value)
+        if self._added is not None:
+            self._added.add(key)
+        return value
+
+    def track_added_pairs(self) -> None:
+        """
+        Remember which pairs get computed from now on, eg. in a process of a Pool that has inherited the cache of its
+        parent. Its shard (see save) then only holds these pairs rather than another copy of the whole cache. The
+        statistics start from zero as well
+        """
+        self._added = set()
+        self.hits = 0
+        self.misses = 0
+
+    def _put(self, key: Tuple[str, str], value: float) -> None:
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_size:
+            evicted_key, _ = self._cache.popitem(last=False)
+            # Otherwise the tracked pairs would grow without a bound
+            if self._added is not None:
+                self._added.discard(evicted_key)
+
+    def clear(self) -> None:
+        self._cache.clear()
+        if self._added is not None:
+            self._added.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._cache),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups > 0 else 0.0
+        }
+
+    def save(self, file_path: str, only_added: bool = False) -> None:
+        """
+        Write the cached pairs (least recently used first) along with the statistics to a JSON file
+        :param only_added: Write only the pairs computed since track_added_pairs was called (and not evicted since)
+        """
+        if only_added and self._added is not None:
+            pairs = [(key, value) for key, value in self._cache.items() if key in self._added]
+        else:
+            pairs = self._cache.items()
+        fs.writeJSONFile(data={'stats': self.stats(),
+                               'similarities': [[label1, label2, value] for (label1, label2), value in pairs]},
+                         file_path=file_path)
+
+    def load(self, file_path: str) -> Dict:
+        """
+        Add the pairs saved in a file to the cache
+        :return: The statistics saved along with the pairs
+        """
+        if not fs.pathExists(file_path):
+            return {}
+        saved = fs.read_json_file(file_path)
+        if len(saved) == 0:
+            return {}
+        for label1, label2, value in saved['similarities']:
+            self._put(self._key(label1, label2), value)
+        return saved['stats']
+
+
+def get_shard_path(file_path: str) -> str:
+    """
+    Every process of a Pool saves the pairs it has computed to its own shard, the shards are merged once all processes
+    have finished
+    """
+    return f'{file_path}.{os.getpid()}'
+
+
+def merge_shards(cache: TokenSimilarityCache, file_path: str) -> Dict:
+    """
+    Merge the shards saved by the processes into the cache, save the cache to file_path and remove the shards. Only
+    the files named like the shards ie. '<file_path>.<pid>' are merged, other files (eg. a backup of the cache) are
+    left alone.
+    :return: The total hits and misses of all shards
+    """
+    total = {'hits': 0, 'misses': 0}
+    shards = [shard for shard in Path(file_path).parent.glob(Path(file_path).name + '.*') if shard.suffix[1:].isdigit()]
+    for shard in sorted(shards):
+        stats = cache.load(str(shard))
+        total['hits'] += stats.get('hits', 0)
+        total['misses'] += stats.get('misses', 0)
+        os.remove(shard)
+    cache.save(file_path)
+    lookups = total['hits'] + total['misses']
+    total['hit_rate'] = round(total['hits'] / lookups, 4) if lookups > 0 else 0.0
+    return total
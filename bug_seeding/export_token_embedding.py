@@ -0,0 +1,50 @@
+"""
+
+Created on 18-October-2026
+
+Export the token embeddings needed for seeding bugs to a memory-mapped matrix. Run this once before
+'run_bug_seeding.py'. Tokens that are not exported are still looked up in the fastText model.
+"""
+import argparse
+import utils.fileutils as fs
+from utils.analysed_file_store import AnalysedFileStore
+from bug_seeding_approaches.SemSeed.TokenEmbedding import collect_tokens_for_embedding, \
+    export_token_embedding_matrix
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        prog='python export_token_embedding.py',
+        description="Export the embeddings of the tokens needed for seeding bugs to a matrix"
+    )
+    parser.add_argument('--bug_seeding_patterns', type=str,
+                        default='benchmarks/bug_seeding_patterns_for_semantic_seeding.json',
+                        help='The path to a file that contains the change patterns')
+    parser.add_argument('--K_freq_idf', type=str, default='benchmarks/topK_identifiers_in_training_commits.json',
+                        help='K most frequent Identifier')
+    parser.add_argument('--K_freq_lit', type=str, default='benchmarks/topK_literals_in_training_commits.json',
+                        help='K most frequent Literal')
+    parser.add_argument('--analysed_dir', type=str,
+                        default='benchmarks/js_benchmark_working_dir/__TEMP__target_js_file_nodes',
+                        help='The directory containing the analysed target files. Skipped if it does not exist')
+    parser.add_argument('--fasttext_model', type=str, default='benchmarks/all_token_embedding_FAST_TEXT.bin',
+                        help='The fastText model of the token embeddings')
+    parser.add_argument('--matrix', type=str, default='benchmarks/token_embedding_matrix.npy',
+                        help='The path where the matrix will be written')
+    parser.add_argument('--vocabulary', type=str, default='benchmarks/token_embedding_vocabulary.json',
+                        help='The path where the tokens (rows of the matrix) will be written')
+    args = parser.parse_args()
+
+    analysed_files, analysed_file_store = [], None
+    if fs.pathExists(args.analysed_dir):
+        analysed_files = fs.go_through_dir(directory=args.analysed_dir, filter_file_extension='.json')
+        analysed_file_store = AnalysedFileStore(store_dir=args.analysed_dir)
+
+    tokens = collect_tokens_for_embedding(bug_seeding_patterns=fs.read_json_file(args.bug_seeding_patterns),
+                                          K_most_frequent_identifiers=fs.read_json_file(args.K_freq_idf),
+                                          K_most_frequent_literals=fs.read_json_file(args.K_freq_lit),
+                                          analysed_files=analysed_files, analysed_file_store=analysed_file_store)
+    num_of_analysed_files = len(analysed_files) + (len(analysed_file_store) if analysed_file_store else 0)
+    print(f"Exporting the embeddings of {len(tokens)} tokens ({num_of_analysed_files} analysed files)")
+    stats = export_token_embedding_matrix(tokens=tokens, fasttext_model_path=args.fasttext_model,
+                                          matrix_path=args.matrix, vocabulary_path=args.vocabulary)
+    print(f"Wrote a {stats['num_of_tokens']}x{stats['dimension']} matrix to '{args.matrix}'")
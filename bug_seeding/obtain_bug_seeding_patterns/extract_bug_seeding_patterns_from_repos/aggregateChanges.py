@@ -8,8 +8,10 @@ from utils import fileutils as fs
 
 
 def write_bug_seeding_patterns_to_file(agg_data_out_file):
-    from database import GitHubCommits as db
-    abstract_changes = list(db.Commits.objects.get_abstracted_changes())
+    from database.commit_store import get_commit_store
+    commit_store = get_commit_store()
+    commit_store.connect()
+    abstract_changes = commit_store.get_abstracted_changes()
     changes_across_all_repos = []
 
     for change_summary in abstract_changes:
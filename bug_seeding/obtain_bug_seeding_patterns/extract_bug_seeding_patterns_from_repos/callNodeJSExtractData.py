@@ -2,82 +2,79 @@
 @author Jibesh Patra
 """
 
-import subprocess
-from threading import Timer
-import os
-import json
+from utils.node_worker import get_node_worker
 import multiprocessing
 from multiprocessing import Pool
 from tqdm import tqdm
 
+# The storage of the commits used by the current process
+_commit_store = None
+
+
+def get_analysis_commit_store():
+    global _commit_store
+    from database.commit_store import get_commit_store
+    if _commit_store is None:
+        _commit_store = get_commit_store()
+    _commit_store.connect()
+    return _commit_store
+
 
 def callNodeJS(argument):
     '''
-    Call Node.js for each commit and create patterns.
+    Call Node.js for each commit and create patterns. The Node.js worker kept by the current process
+    extracts the patterns. Node.js gets the commit and answers the analysed single line changes, which
+    are saved by the calling process
     @param argument: Each argument is a commit id
-    @return:
+    @return: The commit id, the analysed single line changes and the error of Node.js
     '''
-    path_to_process = os.path.join(os.path.normpath(
-        os.getcwd() + os.sep), 'bug_seeding', 'obtain_bug_seeding_patterns', 'extract_bug_seeding_patterns_from_repos',
-        'python_calls_me_to_extract_patterns.js')
     time_out_before_killing = 180  # seconds 180 -> 3 minutes
-    try:
-        def kill_process(p):
-            return p.kill()
+    commit = get_analysis_commit_store().get_commit(argument)
+    if commit is None:
+        return argument, None, f'Could not find the commit {argument}'
+    commit = {key: commit[key] for key in ('commit_hash', 'parent_hash', 'local_repo_path', 'single_line_changes')}
+    response = get_node_worker().run(task='analyseCommit', args={'commit': commit},
+                                     timeout=time_out_before_killing)
+    return argument, response.get('result'), response['error']
 
-        p = subprocess.Popen(['node', path_to_process, '-commitId', argument],
-                             stdout=subprocess.PIPE)
-        time_out = Timer(time_out_before_killing, kill_process, [p])
-        try:
-            time_out.start()
-            stdout, stderr = p.communicate()
-            # print(stdout, stderr)
-        finally:
-            time_out.cancel()
-    except subprocess.TimeoutExpired:
-        # p.kill()
-        pass
 
-
-def create_patterns_from_commits(select_num_of_commits=-1):
+def create_patterns_from_commits(select_num_of_commits=-1, only_new_commits=False):
     '''
-    Query the MongoDB database and select only those commits (commit_ids) where the number of files
+    Query the database and select only those commits (commit_ids) where the number of files
     changed is one and the changes are single line changes.
 
     Next, the CallNodeJS for only those commits and create patterns.
 
     @param select_num_of_commits: -1 means select all commits.
+    @param only_new_commits: Select only the commits that have not been analysed yet. Node.js writes an
+                             'analysis_report' to every single line change of a commit it has analysed
     @return:
     '''
-    from database import GitHubCommits as db
+    commit_store = get_analysis_commit_store()
 
     # query filters
     num_of_files_changed = 1
     num_single_line_changes = 1
-    query_obj = db.Commits.objects(
-        num_files_changed=num_of_files_changed, num_single_line_changes=num_single_line_changes)
-    print('Found %d records that has only %d file change and only %d single line change' %
-          (query_obj.count(), num_of_files_changed, num_single_line_changes))
-    pks = json.loads(query_obj.only('pk').to_json())  # get only the primary keys
-
-    # Now put all primary keys in a list.
-    # The primary keys are nothing but commit hashes concatenated with the repository
-    commit_ids = []
-
-    for pk in pks:
-        commit_ids.append(pk['_id'])
+    # The ids of the commits are nothing but commit hashes concatenated with the repository
+    commit_ids = commit_store.get_commit_ids(num_files_changed=num_of_files_changed,
+                                             num_single_line_changes=num_single_line_changes,
+                                             only_new_commits=only_new_commits)
+    print('Found %d %srecords that has only %d file change and only %d single line change' %
+          (len(commit_ids), 'new ' if only_new_commits else '', num_of_files_changed, num_single_line_changes))
 
     if select_num_of_commits > 0:
         print("Selecting only %d commits of %d available commits" %
               (select_num_of_commits, len(commit_ids)))
         commit_ids = commit_ids[:select_num_of_commits]
 
-    # Parallel execution
+    # Parallel execution. The results are saved by this process, hence only one process writes to the database
     with Pool(processes=multiprocessing.cpu_count()) as p:
         with tqdm(total=len(commit_ids)) as pbar:
             pbar.set_description_str(
                 desc="Extracting Patterns ", refresh=False)
-            for i, _ in tqdm(enumerate(p.imap_unordered(callNodeJS, commit_ids))):
+            for commit_id, single_line_changes, error in p.imap_unordered(callNodeJS, commit_ids):
+                if error is None and single_line_changes is not None:
+                    commit_store.update_single_line_changes(commit_id, single_line_changes)
                 pbar.update()
             p.close()
             p.join()
@@ -3,27 +3,43 @@
 """
 
 from mongoengine import *
+import mongoengine
 import json
-import codecs
+import os
+import queue
+import threading
+from typing import Dict, List, Tuple
+from pymongo import ReplaceOne
+from pymongo.errors import BulkWriteError
+from database.commit_store import CommitStore, CommitsNotSavedError, db_config
 
+# The process that has opened the connection. A connection can not be used after a fork
+_connected_pid = None
 
-def read_config(json_file_path):
-    try:
-        obj_text = codecs.open(json_file_path, 'r', encoding='utf-8').read()
-        return json.loads(obj_text)
-    except FileNotFoundError:
-        print(f"*** Can't find {json_file_path} provide a correct path")
-        return []
-    except Exception as e:
-        # Empty JSON file most likely due to abrupt killing of the process while writing
-        # print (e)
-        return []
 
-
-db_config = read_config(json_file_path='database_config.json')
-
-connect(db_config['database_name'], username=db_config['username'], password=db_config['password'],
-        authentication_source='admin', host=db_config['host'], port=db_config['port'])
+def connect_to_database(config: Dict = None) -> None:
+    """
+    Connect the current process to the database, once. Every process of a Pool connects on its own, eg. in the
+    initializer of the Pool. A 'host' starting with 'mongomock://' connects to an in-memory stand-in of MongoDB
+    provided by mongomock, eg. for tests. Its data is only seen by the process that has written it
+    :param config: The database config, the one in 'database_config.json' if not given
+    """
+    global _connected_pid
+    if _connected_pid == os.getpid():
+        return
+    config = config or db_config
+    settings = {'host': config['host'], 'port': config['port']}
+    if config['host'].startswith('mongomock://'):
+        import mongomock
+        # Later versions of mongoengine need the client class rather than the 'mongomock://' scheme
+        if mongoengine.VERSION >= (0, 27):
+            settings = {'host': config['host'].replace('mongomock://', 'mongodb://', 1),
+                        'mongo_client_class': mongomock.MongoClient}
+    else:
+        settings.update(username=config['username'], password=config['password'], authentication_source='admin')
+    disconnect()
+    connect(config['database_name'], **settings)
+    _connected_pid = os.getpid()
 
 
 class QueryChanges(QuerySet):
@@ -142,4 +158,150 @@ class Commits(Document):
 
     single_line_changes = ListField(DictField(DictField()))
     num_single_line_changes = IntField()
-    meta = {'queryset_class': QueryChanges}
+    meta = {'queryset_class': QueryChanges, 'indexes': [('num_files_changed', 'num_single_line_changes')]}
+
+
+class BulkCommitWriter:
+    """
+    Save commits in batches of unordered upserts rather than one round trip per commit. A commit that is already in
+    the database gets replaced, like Commits.save() does. While a thread writes the batches, the commits of the next
+    batch are collected. Once 'max_pending_batches' batches are waiting for the thread (ie. the database lags behind),
+    adding a commit blocks until a batch has been written. If some commits of a batch can not be written, the other
+    batches are written nevertheless and flushing raises CommitsNotSavedError.
+    """
+
+    def __init__(self, batch_size: int = 500, max_pending_batches: int = 4):
+        """
+        :param batch_size: The number of commits written at once
+        :param max_pending_batches: 0 means the batches are written by the caller rather than a thread
+        """
+        self.batch_size = max(1, batch_size)
+        self.collection = Commits._get_collection()
+        self.num_written = 0
+        self._batch = []  # The (commit id, write) of every commit not submitted yet
+        self._error = None
+        self._failed_commit_ids = []
+        self._failure_reason = None
+        self._pending_batches = None
+        self._thread = None
+        if max_pending_batches > 0:
+            self._pending_batches = queue.Queue(maxsize=max_pending_batches)
+            self._thread = threading.Thread(target=self._write_pending_batches, daemon=True)
+            self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            # Keep the original error, the commits added so far are written if possible
+            try:
+                self.close()
+            except Exception:
+                pass
+
+    def add(self, commit: Dict) -> None:
+        commit = Commits(**commit)
+        commit.validate()
+        self._batch.append((commit.pk, ReplaceOne({'_id': commit.pk}, commit.to_mongo(), upsert=True)))
+        if len(self._batch) >= self.batch_size:
+            self._submit()
+
+    def flush(self) -> None:
+        """
+        Write all commits added so far
+        """
+        self._submit()
+        if self._pending_batches is not None:
+            self._pending_batches.join()
+        self._raise_error()
+        if len(self._failed_commit_ids) > 0:
+            failed_commit_ids, self._failed_commit_ids = self._failed_commit_ids, []
+            raise CommitsNotSavedError(failed_commit_ids, self._failure_reason)
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            if self._thread is not None:
+                self._pending_batches.put(None)
+                self._thread.join()
+                self._thread = None
+
+    def _submit(self) -> None:
+        self._raise_error()
+        batch, self._batch = self._batch, []
+        if len(batch) == 0:
+            return
+        if self._pending_batches is None:
+            self._write(batch)
+        else:
+            self._pending_batches.put(batch)
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _write(self, batch: List[Tuple[str, ReplaceOne]]) -> None:
+        try:
+            result = self.collection.bulk_write([write for _, write in batch], ordered=False)
+            self.num_written += result.upserted_count + result.matched_count
+        except BulkWriteError as e:
+            # The other commits of the batch have been written nevertheless
+            write_errors = e.details.get('writeErrors', [])
+            if len(write_errors) == 0:
+                raise
+            self.num_written += len(batch) - len(write_errors)
+            self._failed_commit_ids.extend(batch[write_error['index']][0] for write_error in write_errors)
+            self._failure_reason = write_errors[0].get('errmsg')
+
+    def _write_pending_batches(self) -> None:
+        while True:
+            batch = self._pending_batches.get()
+            try:
+                if batch is None:
+                    return
+                # Once the database has failed (eg. the connection is lost) the remaining batches are dropped
+                if self._error is None:
+                    self._write(batch)
+            except Exception as e:
+                self._error = e
+            finally:
+                self._pending_batches.task_done()
+
+
+class MongoCommitStore(CommitStore):
+    def __init__(self, config: Dict = None):
+        self.config = config or db_config
+
+    def connect(self) -> None:
+        connect_to_database(self.config)
+
+    def writer(self, batch_size: int = 500, max_pending_batches: int = 4) -> BulkCommitWriter:
+        return BulkCommitWriter(batch_size=batch_size, max_pending_batches=max_pending_batches)
+
+    def get_commit_ids(self, num_files_changed: int, num_single_line_changes: int,
+                       only_new_commits: bool = False) -> List[str]:
+        query_obj = Commits.objects(num_files_changed=num_files_changed,
+                                    num_single_line_changes=num_single_line_changes)
+        if only_new_commits:
+            query_obj = query_obj.filter(__raw__={'single_line_changes.analysis_report': {'$exists': False}})
+        # The primary keys are nothing but commit hashes concatenated with the repository
+        return [pk['_id'] for pk in json.loads(query_obj.only('pk').to_json())]
+
+    def get_commit(self, commit_id: str) -> Dict:
+        commit = Commits._get_collection().find_one({'_id': commit_id})
+        if commit is None:
+            return None
+        commit['commit_id'] = commit.pop('_id')
+        return commit
+
+    def update_single_line_changes(self, commit_id: str, single_line_changes: List[Dict]) -> None:
+        Commits._get_collection().update_one({'_id': commit_id},
+                                             {'$set': {'single_line_changes': single_line_changes}})
+
+    def get_abstracted_changes(self) -> List[Dict]:
+        return list(Commits.objects.get_abstracted_changes())
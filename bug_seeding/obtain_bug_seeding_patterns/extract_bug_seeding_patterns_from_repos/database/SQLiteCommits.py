@@ -0,0 +1,179 @@
+"""
+
+Created on 18-October-2026
+
+Keep the mined commits in a SQLite file rather than MongoDB, hence mining needs no database server. Every commit is
+a row of the table 'commits', its single line changes (along with the results of their analysis) are a JSON column.
+The queries of the pipeline select the commits by the number of changed files and single line changes, which are
+indexed. The file is given by 'sqlite_path' of 'database_config.json'.
+"""
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, List
+from database.commit_store import CommitStore, db_config
+
+DEFAULT_SQLITE_PATH = os.path.join('benchmarks', 'github_commits.sqlite')
+
+COLUMNS = ('commit_id', 'commit_hash', 'commit_message', 'commit_time', 'local_repo_path', 'parent_hash', 'url',
+           'num_files_changed', 'single_line_changes', 'num_single_line_changes')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS commits (
+    commit_id TEXT PRIMARY KEY,
+    commit_hash TEXT NOT NULL,
+    commit_message TEXT NOT NULL,
+    commit_time TEXT,
+    local_repo_path TEXT,
+    parent_hash TEXT,
+    url TEXT,
+    num_files_changed INTEGER,
+    single_line_changes TEXT,
+    num_single_line_changes INTEGER
+);
+CREATE INDEX IF NOT EXISTS commits_by_num_of_changes ON commits (num_files_changed, num_single_line_changes);
+CREATE INDEX IF NOT EXISTS commits_by_num_single_line_changes ON commits (num_single_line_changes);
+'''
+
+# The fields of an abstracted change and where they are in a single line change, as in
+# GitHubCommits.QueryChanges.get_abstracted_changes
+ABSTRACTED_CHANGE_FIELDS = {
+    'fix': '$.change_summary.fix',
+    'fix_tokenType': '$.new_file.change_analysis.type',
+    'fix_file_path': '$.new_file.path',
+    'fix_actual': '$.new_file.change_analysis.tokens',
+    'fix_range': '$.new_file.change_analysis.range',
+    'fix_line': '$.new_file.change_analysis.line',
+    'buggy': '$.change_summary.buggy',
+    'buggy_tokenType': '$.old_file.change_analysis.type',
+    'buggy_file_path': '$.old_file.path',
+    'buggy_actual': '$.old_file.change_analysis.tokens',
+    'buggy_range': '$.old_file.change_analysis.range',
+    'buggy_line': '$.old_file.change_analysis.line'
+}
+
+
+def _to_row(commit: Dict) -> tuple:
+    row = dict(commit)
+    if isinstance(row.get('commit_time'), datetime):
+        row['commit_time'] = row['commit_time'].isoformat()
+    row['single_line_changes'] = json.dumps(row.get('single_line_changes', []), separators=(',', ':'))
+    return tuple(row.get(column) for column in COLUMNS)
+
+
+def _parse_commit_time(commit_time: str):
+    return datetime.fromisoformat(commit_time) if commit_time is not None else None
+
+
+class SQLiteCommitWriter:
+    """
+    Save commits in batches, one transaction per batch. The batches are written by the caller, hence a slow disk (or
+    another process holding the lock of the file) pauses the caller
+    """
+
+    def __init__(self, connection: sqlite3.Connection, batch_size: int = 500):
+        self.connection = connection
+        self.batch_size = max(1, batch_size)
+        self.num_written = 0
+        self._batch = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def add(self, commit: Dict) -> None:
+        self._batch.append(_to_row(commit))
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        batch, self._batch = self._batch, []
+        if len(batch) == 0:
+            return
+        with self.connection:
+            # Replacing a commit drops the results of its analysis, like Commits.save() does
+            self.connection.executemany(
+                f"INSERT OR REPLACE INTO commits ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                batch)
+        self.num_written += len(batch)
+
+    def close(self) -> None:
+        self.flush()
+
+
+class SQLiteCommitStore(CommitStore):
+    def __init__(self, config: Dict = None):
+        config = config or db_config
+        self.path = config.get('sqlite_path', DEFAULT_SQLITE_PATH)
+        self._connection = None
+        self._connected_pid = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        self.connect()
+        return self._connection
+
+    def connect(self) -> None:
+        # A connection can not be used after a fork
+        if self._connected_pid == os.getpid():
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Several processes write to the file while mining, a writer waits for the others rather than failing
+        self._connection = sqlite3.connect(self.path, timeout=600)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.executescript(SCHEMA)
+        self._connected_pid = os.getpid()
+
+    def writer(self, batch_size: int = 500, max_pending_batches: int = 4) -> SQLiteCommitWriter:
+        return SQLiteCommitWriter(self.connection, batch_size=batch_size)
+
+    def get_commit_ids(self, num_files_changed: int, num_single_line_changes: int,
+                       only_new_commits: bool = False) -> List[str]:
+        query = 'SELECT commit_id FROM commits WHERE num_files_changed = ? AND num_single_line_changes = ?'
+        if only_new_commits:
+            query += ''' AND NOT EXISTS (SELECT 1 FROM json_each(commits.single_line_changes) AS change
+                                         WHERE json_extract(change.value, '$.analysis_report') IS NOT NULL)'''
+        return [row[0] for row in self.connection.execute(query, (num_files_changed, num_single_line_changes))]
+
+    def get_commit(self, commit_id: str) -> Dict:
+        row = self.connection.execute(f"SELECT {', '.join(COLUMNS)} FROM commits WHERE commit_id = ?",
+                                      (commit_id,)).fetchone()
+        if row is None:
+            return None
+        commit = dict(zip(COLUMNS, row))
+        commit['commit_time'] = _parse_commit_time(commit['commit_time'])
+        commit['single_line_changes'] = json.loads(commit['single_line_changes'])
+        return commit
+
+    def update_single_line_changes(self, commit_id: str, single_line_changes: List[Dict]) -> None:
+        with self.connection:
+            self.connection.execute('UPDATE commits SET single_line_changes = ? WHERE commit_id = ?',
+                                    (json.dumps(single_line_changes, separators=(',', ':')), commit_id))
+
+    def get_abstracted_changes(self) -> List[Dict]:
+        # Only the fields needed are taken out of the JSON of a change, which also holds all identifiers and literals
+        # of the changed file. json_quote keeps strings and numbers as JSON as well
+        names = list(ABSTRACTED_CHANGE_FIELDS.keys())
+        fields = ', '.join(f"json_quote(json_extract(change.value, '{path}'))"
+                           for path in ABSTRACTED_CHANGE_FIELDS.values())
+        query = f'''
+            SELECT commit_id, commit_hash, commit_time, local_repo_path, url, {fields}
+            FROM commits, json_each(commits.single_line_changes) AS change
+            WHERE num_files_changed = 1 AND num_single_line_changes = 1
+                AND json_extract(change.value, '$.analysis_report') = 'success'
+                AND json_array_length(change.value, '$.change_summary.fix') < 20
+                AND json_array_length(change.value, '$.change_summary.buggy') < 20
+            ORDER BY commit_time, commit_id, change.key'''
+        abstracted_changes = []
+        for row in self.connection.execute(query):
+            commit_id, commit_hash, commit_time, local_repo_path, url = row[:5]
+            change = {'_id': commit_id, 'commit_hash': commit_hash, 'commit_time': _parse_commit_time(commit_time),
+                      'local_repo_path': local_repo_path, 'url': url}
+            change.update(zip(names, (json.loads(value) for value in row[5:])))
+            abstracted_changes.append(change)
+        return abstracted_changes
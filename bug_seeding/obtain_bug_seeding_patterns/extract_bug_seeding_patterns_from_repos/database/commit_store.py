@@ -0,0 +1,106 @@
+"""
+
+Created on 18-October-2026
+
+The storage of the mined commits. The pattern mining pipeline (main.py, callNodeJSExtractData.py and
+aggregateChanges.py) only goes through a CommitStore, the 'backend' of 'database_config.json' selects which one:
+    mongodb     A MongoDB server, see GitHubCommits.py
+    sqlite      A SQLite file needing no server, see SQLiteCommits.py
+"""
+from abc import ABC, abstractmethod
+import json
+from typing import Dict, List
+
+DEFAULT_BACKEND = 'mongodb'
+
+
+def read_config(json_file_path: str) -> Dict:
+    """
+    :return: An empty config if the file does not exist. A broken file raises an error
+    """
+    try:
+        with open(json_file_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        print(f"*** Can't find {json_file_path} provide a correct path")
+        return {}
+
+
+db_config = read_config(json_file_path='database_config.json')
+
+
+class CommitsNotSavedError(Exception):
+    """
+    Some commits could not be saved although the others have been
+    """
+
+    def __init__(self, commit_ids: List[str], reason: str):
+        super().__init__(f'Could not save {len(commit_ids)} commits: {reason}')
+        self.commit_ids = commit_ids
+
+
+class CommitStore(ABC):
+    """
+    A commit is a dict having the fields of GitHubCommits.Commits, its 'commit_time' is a datetime
+    """
+
+    @abstractmethod
+    def connect(self) -> None:
+        """
+        Connect the current process, once. Every process of a Pool connects on its own
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def writer(self, batch_size: int = 500, max_pending_batches: int = 4):
+        """
+        :param batch_size: The number of commits written at once
+        :param max_pending_batches: The number of batches that may wait for the storage before adding a commit blocks
+        :return: A context manager whose add(commit) saves a commit, replacing a commit having the same 'commit_id'.
+                 All commits added have been saved once it is closed. Otherwise, closing it raises an error, eg.
+                 CommitsNotSavedError
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_commit_ids(self, num_files_changed: int, num_single_line_changes: int,
+                       only_new_commits: bool = False) -> List[str]:
+        """
+        :param only_new_commits: Only the commits whose single line changes have not been analysed yet, ie. have no
+                                 'analysis_report'
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_commit(self, commit_id: str) -> Dict:
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_single_line_changes(self, commit_id: str, single_line_changes: List[Dict]) -> None:
+        """
+        Save the single line changes of a commit along with the results of their analysis
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_abstracted_changes(self) -> List[Dict]:
+        """
+        The successfully analysed single line changes of the commits changing a single line of a single file,
+        oldest first. Changes of 20 or more tokens are left out
+        """
+        raise NotImplementedError
+
+
+def get_commit_store(config: Dict = None) -> CommitStore:
+    """
+    :param config: The database config, the one in 'database_config.json' if not given
+    """
+    config = config or db_config
+    backend = config.get('backend', DEFAULT_BACKEND)
+    if backend == 'mongodb':
+        from database.GitHubCommits import MongoCommitStore
+        return MongoCommitStore(config)
+    if backend == 'sqlite':
+        from database.SQLiteCommits import SQLiteCommitStore
+        return SQLiteCommitStore(config)
+    raise ValueError(f"Unknown database backend '{backend}', use 'mongodb' or 'sqlite'")
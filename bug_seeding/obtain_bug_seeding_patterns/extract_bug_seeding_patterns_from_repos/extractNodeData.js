@@ -70,10 +70,8 @@ function extractNodeData(inFile, outFile) {
             //         extractedData.line = knownLocationOfInterest.line;
             //     }
             // }
-            if (fs.existsSync(outFile)) {
-                let random_num = Math.floor(Math.random() * 100000);
-                outFile = outFile.replace('.js', '_' + random_num + '.js')
-            }
+            // The output path is unique for each input file. An existing output is from an earlier run on the
+            // same file, hence it gets overwritten
             fs.writeFileSync(outFile, JSON.stringify(extractedData));
         } catch (err) {
             return err;
@@ -109,13 +107,17 @@ function parse_cli_arguments() {
 }
 
 
-(
-    async function () {
-        let {
-            inFile, outFile
-        } = parse_cli_arguments();
-        extractNodeData(inFile, outFile);
-    }
-)();
+// Only run from the command line, the persistent worker (nodeWorker.js) requires this file
+if (require.main === module) {
+    (
+        async function () {
+            let {
+                inFile, outFile
+            } = parse_cli_arguments();
+            extractNodeData(inFile, outFile);
+        }
+    )();
+}
 
 module.exports.analyseCode = analyseCode;
+module.exports.extractNodeData = extractNodeData;
@@ -13,7 +13,6 @@ import multiprocessing
 from os.path import isfile, join
 import tqdm
 from pygit2 import GIT_SORT_TOPOLOGICAL, GIT_SORT_REVERSE
-from parsepatch.patch import Patch
 import re
 from pathlib import Path
 from datetime import datetime
@@ -21,6 +20,31 @@ from multiprocessing import Pool
 from tqdm import tqdm
 from typing import List
 from callNodeJSExtractData import create_patterns_from_commits
+from utils.mining_watermarks import get_mining_settings, read_processed_tips, write_processed_tips, \
+    get_default_watermark_dir
+from database.commit_store import get_commit_store, db_config, CommitsNotSavedError
+
+# A changed line (starting with '-' or '+') containing only whitespace and comments
+EMPTY_LINE = re.compile(r'^[+-][ \t]*(?://.*)?(?:/\*[^\*]*[\*]+/)?[ \t]*$')
+
+DEFAULT_WATERMARK_DIR = get_default_watermark_dir(db_config)
+
+# The arguments of CommitStore.writer used by the current process
+_write_settings = {}
+# The storage of the commits used by the current process
+_commit_store = None
+
+
+def init_mining_worker(batch_size: int = 500, max_pending_batches: int = 4) -> None:
+    """
+    The initializer of every process of the Pool. The process opens its own connection to the database and saves
+    the commits in batches
+    :param batch_size: The number of commits saved at once
+    :param max_pending_batches: The number of batches that may wait for the database before the walk is paused
+    """
+    get_mining_commit_store()
+    _write_settings.clear()
+    _write_settings.update(batch_size=batch_size, max_pending_batches=max_pending_batches)
 
 
 def get_git_repos_file_paths(source_dir):
@@ -37,15 +61,46 @@ def get_git_repos_file_paths(source_dir):
     return repo_paths
 
 
-def query_repo_save_commits(repo_path: str, query_terms: List, file_extension: str) -> None:
+def get_mining_commit_store():
+    """
+    The storage of the commits (see database/commit_store.py), connected once per process
+    """
+    global _commit_store
+    if _commit_store is None:
+        _commit_store = get_commit_store()
+    _commit_store.connect()
+    return _commit_store
+
+
+def get_tips(repo) -> List:
+    """
+    The commits from which the history of the repository is walked. The commit HEAD points to and, since a
+    'git fetch' does not move HEAD, the commit of the remote branch tracked by the current branch
+    """
+    tips = [repo.head.target]
+    if not repo.head_is_detached:
+        try:
+            branch = repo.branches.local.get(repo.head.shorthand)
+            upstream = branch.upstream if branch is not None else None
+        except (KeyError, git.GitError):
+            upstream = None
+        if upstream is not None and upstream.target not in tips:
+            tips.append(upstream.target)
+    return tips
+
+
+def query_repo_save_commits(repo_path: str, query_terms: List, file_extension: str, watermark_dir: str = None) -> None:
     '''
 
     @param repo_path:
     @param query_terms:
     @param file_extension:
+    @param watermark_dir: Where the commits already mined are remembered. If given, only the commits that have not
+                          been mined by an earlier run are walked. The watermark is only written if every commit
+                          could be saved
     @return:
     '''
-    from database import GitHubCommits as db
+    commit_store = get_mining_commit_store()
 
     repo = git.Repository(repo_path)
     remote_url = None
@@ -55,112 +110,131 @@ def query_repo_save_commits(repo_path: str, query_terms: List, file_extension: s
     def file_filter(file_path):
         return file_path.endswith(file_extension)
 
-    last_commit = None
-    for l in repo.head.log():
-        last_commit = l.oid_new
-    # Go through each commit starting from the most recent commit
-    for commit in repo.walk(last_commit, GIT_SORT_TOPOLOGICAL | GIT_SORT_REVERSE):
-        num_parents = len(
-            commit.parents)  # Do not want to include merges, hence we check if the number of parents is 'one'
-        if num_parents == 1 and commit_message_contains_query(commit.message, query_terms):
-            # Diff between the current commit and its parent
-            diff = repo.diff(commit.hex + '^', commit.hex)
-            changes = extract_single_line_changes(diff, file_filter)
-
-            if len(changes) > 0:
-                cm = db.Commits(
-                    commit_id=remote_url.split('https://github.com/')[1] + '_' + commit.hex,
-                    commit_hash=commit.hex,
-                    commit_message=commit.message,
-                    commit_time=datetime.fromtimestamp(commit.commit_time),
-                    local_repo_path=repo_path,
-                    parent_hash=str(commit.parent_ids[0]),
-                    url=f'{remote_url}/commit/{commit.hex}',
-                    num_files_changed=diff.stats.files_changed,
-                    single_line_changes=changes,
-                    num_single_line_changes=len(changes)
-                )
-                cm.save()  # Save the commit to the database
+    tips = get_tips(repo)
+    walker = repo.walk(tips[0], GIT_SORT_TOPOLOGICAL | GIT_SORT_REVERSE)
+    for tip in tips[1:]:
+        walker.push(tip)
+
+    settings = get_mining_settings(query_terms, file_extension)
+    processed_tips = []
+    if watermark_dir is not None:
+        # The commits reachable from a tip mined earlier are hidden. A tip may be gone after a force push and gc
+        processed_tips = [tip for tip in read_processed_tips(watermark_dir, repo_path, settings)
+                          if repo.get(tip) is not None]
+        for tip in processed_tips:
+            walker.hide(tip)
+
+    with commit_store.writer(**_write_settings) as writer:
+        # Go through each commit starting from the most recent commit
+        for commit in walker:
+            num_parents = len(
+                commit.parents)  # Do not want to include merges, hence we check if the number of parents is 'one'
+            if num_parents == 1 and commit_message_contains_query(commit.message, query_terms):
+                # Diff between the current commit and its parent. Most commits change more than one file or line and
+                # are rejected before the changes of the files get compared
+                diff = get_single_file_diff(repo, commit, file_filter)
+                if diff is None:
+                    continue
+                changes = extract_single_line_changes(diff, file_filter)
+
+                if len(changes) > 0:
+                    commit_hash = str(commit.id)
+                    cm = dict(
+                        commit_id=remote_url.split('https://github.com/')[1] + '_' + commit_hash,
+                        commit_hash=commit_hash,
+                        commit_message=commit.message,
+                        commit_time=datetime.fromtimestamp(commit.commit_time),
+                        local_repo_path=repo_path,
+                        parent_hash=str(commit.parent_ids[0]),
+                        url=f'{remote_url}/commit/{commit_hash}',
+                        num_files_changed=diff.stats.files_changed,
+                        single_line_changes=changes,
+                        num_single_line_changes=len(changes)
+                    )
+                    writer.add(cm)  # Saved to the database along with the other commits of the batch
+
+    if watermark_dir is not None:
+        # Every commit has been saved, the next run can start from here. Earlier tips are kept only if they are not
+        # part of the history walked now (eg. a branch that has been rewritten)
+        new_tips = [str(tip) for tip in tips]
+        for tip in processed_tips:
+            if tip not in new_tips and not any(repo.descendant_of(new_tip, tip) for new_tip in new_tips):
+                new_tips.append(tip)
+        write_processed_tips(watermark_dir, repo_path, settings, new_tips)
+
+
+def get_single_file_diff(repo, commit, file_filter):
+    """
+    The diff between the commit and its parent if the commit changes exactly one file having the required file
+    extension. Comparing the trees only compares the ids of the files, the content of the files is not read
+    :param repo:
+    :param commit:
+    :param file_filter:
+    :return: None if the commit changes more than one file or a file not having the required extension
+    """
+    diff = repo.diff(commit.parents[0], commit)
+    if len(diff) != 1:
+        return None
+    for delta in diff.deltas:
+        if not file_filter(delta.new_file.path):
+            return None
+    return diff
+
+
+def _is_empty_line(line):
+    """
+    Whether a changed line contains only whitespace and comments. A change is not single line if both the removed
+    and the added line are empty
+    """
+    content = line.content[:-1] if line.content.endswith('\n') else line.content
+    return EMPTY_LINE.match(line.origin + content) is not None
 
 
 def extract_single_line_changes(diff, file_filter):
     """
     Given a diff and a file extension filter. Extract only single line changes.
-    This function extracts only those commits where exactly one line has changed.
+    This function extracts only those commits where exactly one line has changed i.e., one line has been removed
+    and the line added right after it replaces it.
     :param diff:
     :param file_filter:
     :return:
     """
     single_line_changes = []
-    if diff.stats.files_changed > 1:
+    if diff.stats.files_changed != 1:
         return []
-    if diff.stats.deletions > 1 or diff.stats.insertions > 1:
+    if diff.stats.deletions != 1 or diff.stats.insertions != 1:
         return []
     for patch in diff:
         # In most cases, the file paths remain the same
         old_file_path = patch.delta.new_file.path
         new_file_path = patch.delta.old_file.path
+        if not file_filter(patch.delta.new_file.path):
+            return []
 
-        # Parse the patch and also select only those files that have the required file extension
-        try:
-            parsed_patch = Patch.parse_patch(
-                patch.text, file_filter=file_filter)
-            line_numbers = get_changes_from_new_file(parsed_patch)
-            # If more than one line has changed in the 'new'/'fixed' file, we ignore the commit.
-            if new_file_path not in line_numbers or len(line_numbers[new_file_path]) > 1:
-                return []
-        except IndexError:
-            continue
-
-        # Once we have got the line number from the 'new' file, we get the line numbers from the 'old' file
         for hunk in patch.hunks:
             lines = hunk.lines
             for idx, lin in enumerate(lines):
-                if new_file_path in line_numbers and lin.new_lineno in line_numbers[new_file_path]:
-                    single_line_changes.append({
-                        'old_file':
-                            {
-                                'path': old_file_path,
-                                'line_num': lines[idx - 1].old_lineno,
-                                'changed_line': lines[idx - 1].content
-                            },
-                        'new_file': {
-                            'path': new_file_path,
-                            'line_num': lin.new_lineno,
-                            'changed_line': lin.content
-                        }
-                    })
+                # The added line must directly follow the removed line
+                if lin.origin != '+' or idx == 0 or lines[idx - 1].origin != '-':
+                    continue
+                if _is_empty_line(lin) and _is_empty_line(lines[idx - 1]):
+                    continue
+                single_line_changes.append({
+                    'old_file':
+                        {
+                            'path': old_file_path,
+                            'line_num': lines[idx - 1].old_lineno,
+                            'changed_line': lines[idx - 1].content
+                        },
+                    'new_file': {
+                        'path': new_file_path,
+                        'line_num': lin.new_lineno,
+                        'changed_line': lin.content
+                    }
+                })
     return single_line_changes
 
 
-def get_changes_from_new_file(parsed_patch):
-    '''
-
-    @param parsed_patch:
-    @return:
-    '''
-    single_changes_line_numbers = {}
-    for file in parsed_patch:
-        single_changes_line_numbers[file] = []
-        if 'touched' in parsed_patch[file] and 'added' in parsed_patch[file] and 'deleted' in parsed_patch[file]:
-            # List of line numbers
-            touched_lines = parsed_patch[file]['touched']
-            added_lines = parsed_patch[file]['added']  # List of line numbers
-            # List of line numbers
-            deleted_lines = parsed_patch[file]['deleted']
-        else:
-            continue
-
-        if len(touched_lines) > 0:
-            for line in touched_lines:
-                next_line = line + 1
-                prev_line = line - 1
-                if next_line not in added_lines and next_line not in touched_lines and prev_line not in touched_lines:
-                    single_changes_line_numbers[file].append(
-                        line)  # The line number is always the '+' line number in the new file
-    return single_changes_line_numbers
-
-
 def commit_message_contains_query(message, query_terms):
     """
     Check if the commit message contains the query terms
@@ -175,8 +249,12 @@ def commit_message_contains_query(message, query_terms):
 
 
 def extract_from_repo(arguments):
-    repo_path, query_terms, file_extension = arguments
-    query_repo_save_commits(repo_path, query_terms, file_extension)
+    repo_path, query_terms, file_extension, watermark_dir = arguments
+    try:
+        query_repo_save_commits(repo_path, query_terms, file_extension, watermark_dir)
+    except CommitsNotSavedError as e:
+        # The watermark of the repository has not been written, the next run walks these commits again
+        print(f'{repo_path}: {e}')
 
 
 def write_extracted_commits(data, outdir, repo_path):
@@ -185,7 +263,19 @@ def write_extracted_commits(data, outdir, repo_path):
 
 
 def parse_repos_extract_changes(git_repo_location, file_extension, query_terms,
-                                num_of_repos_to_parse=-1):
+                                num_of_repos_to_parse=-1, watermark_dir=DEFAULT_WATERMARK_DIR,
+                                batch_size=500, max_pending_batches=4):
+    """
+    Go through the commits of the repositories and save the single line changes to the database
+    :param git_repo_location: The directory containing the repositories
+    :param file_extension: Only changes of files having this extension are saved
+    :param query_terms: The terms that we look for in the commit messages
+    :param num_of_repos_to_parse: -1 means all repositories
+    :param watermark_dir: Where the commits already mined are remembered, a rerun only walks the new commits of a
+                          repository. None means walk the whole history of every repository
+    :param batch_size: The number of commits saved to the database at once
+    :param max_pending_batches: The number of batches that may wait for the database before the walk is paused
+    """
     repo_paths = get_git_repos_file_paths(git_repo_location)
     debug = False  # Disable multiprocessing if debug is True
     if num_of_repos_to_parse > 0:
@@ -193,10 +283,11 @@ def parse_repos_extract_changes(git_repo_location, file_extension, query_terms,
               (num_of_repos_to_parse, len(repo_paths)))
         repo_paths = repo_paths[:num_of_repos_to_parse]
 
-    arguments = [(repo_path, query_terms, file_extension)
+    arguments = [(repo_path, query_terms, file_extension, watermark_dir)
                  for repo_path in repo_paths]
     if not debug:
-        with Pool(processes=multiprocessing.cpu_count()) as p:
+        with Pool(processes=multiprocessing.cpu_count(), initializer=init_mining_worker,
+                  initargs=(batch_size, max_pending_batches)) as p:
             with tqdm(total=len(repo_paths)) as pbar:
                 pbar.set_description_str(
                     desc="Parsing repos ", refresh=False)
@@ -208,6 +299,7 @@ def parse_repos_extract_changes(git_repo_location, file_extension, query_terms,
                 p.close()
                 p.join()
     else:
+        init_mining_worker(batch_size, max_pending_batches)
         for _ in enumerate(map(extract_from_repo, arguments)):
             pass
 
@@ -218,10 +310,10 @@ if __name__ == "__main__":
 
     print("Make sure MongoDB is running. On Ubuntu, you may use 'sudo systemctl start mongod' ")
 
-    # Extract and save all single line changes from the repos to the MongoDB database
+    # Extract and save all single line changes from the repos to the database
     parse_repos_extract_changes(git_repo_location=top_JS_repos_path,
                                 file_extension='.js', query_terms=terms_to_search_in_commit_message,
                                 num_of_repos_to_parse=100)
 
-    # After this has finished, call Node.js and create bug-seeding patterns.
-    create_patterns_from_commits(select_num_of_commits=-1)
+    # After this has finished, call Node.js and create bug-seeding patterns for the commits not analysed yet
+    create_patterns_from_commits(select_num_of_commits=-1, only_new_commits=True)
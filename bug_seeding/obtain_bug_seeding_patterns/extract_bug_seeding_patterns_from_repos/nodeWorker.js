@@ -0,0 +1,71 @@
+/**
+
+ A long-lived Node.js process that performs the static analysis tasks requested by Python. Starting Node.js and
+ loading esprima, escodegen etc. costs more than analysing a typical file. Hence, rather than spawning a process
+ for every file, Python keeps this worker running and sends it one request per line on stdin:
+
+    {"id": 1, "task": "extractNodeData", "args": {"inFile": "a.js", "outFile": "a.json"}}
+
+ The worker answers every request with one line on stdout:
+
+    {"id": 1, "error": null}
+
+ A task computing a result (eg. 'analyseCommit') answers it as well:
+
+    {"id": 2, "error": null, "result": [...]}
+ **/
+
+const readline = require('readline');
+
+// The modules of a task are only loaded once the task has been requested
+const tasks = {
+    extractNodeData: args => require('./extractNodeData').extractNodeData(args.inFile, args.outFile),
+    formatFile: args => require('./utils/format_a_js_file').formatJSfile(args.inFile),
+    extractPatterns: args => require('./python_calls_me_to_extract_patterns').extractData(args.commitId),
+    analyseCommit: async args => ({
+        result: await require('./python_calls_me_to_extract_patterns').analyseCommit(args.commit)
+    })
+};
+
+// stdout only carries the responses, anything logged by the tasks goes to stderr
+const respond = response => process.stdout.write(JSON.stringify(response) + '\n');
+console.log = console.error;
+
+async function handleRequest(line) {
+    let request;
+    try {
+        request = JSON.parse(line);
+    } catch (e) {
+        respond({id: null, error: `Could not parse the request: ${e}`});
+        return;
+    }
+    if (!{}.hasOwnProperty.call(tasks, request.task)) {
+        respond({id: request.id, error: `Unknown task ${request.task}`});
+        return;
+    }
+    try {
+        // A task resolves to an error (nothing if it was successful) or to {result: ...} if it computes a result
+        let outcome = await tasks[request.task](request.args);
+        if (outcome !== null && typeof outcome === 'object' && {}.hasOwnProperty.call(outcome, 'result')) {
+            respond({id: request.id, error: null, result: outcome.result});
+            return;
+        }
+        respond({id: request.id, error: outcome ? String(outcome) : null});
+    } catch (e) {
+        respond({id: request.id, error: String(e)});
+    }
+}
+
+(
+    async function () {
+        const lines = readline.createInterface({input: process.stdin, terminal: false});
+        // Requests are handled one after the other. Python waits for a response before sending the next request
+        for await (const line of lines) {
+            if (line.trim().length === 0) continue;
+            await handleRequest(line);
+        }
+        if (require.cache[require.resolve('./python_calls_me_to_extract_patterns')]) {
+            await require('./python_calls_me_to_extract_patterns').closeConnection();
+        }
+    }
+)();
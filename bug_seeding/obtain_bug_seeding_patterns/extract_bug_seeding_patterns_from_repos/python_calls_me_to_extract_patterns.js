@@ -280,60 +280,78 @@ function parse_cli_arguments() {
     }
 }
 
+let mongoClient = null;
+
+/**
+ * Connect to the database once and reuse the connection for every commit
+ */
+async function getCollection() {
+    if (mongoClient === null) {
+        const MongoClient = require('mongodb').MongoClient;
+        const url = `mongodb://${dbconfig.username}:${dbconfig.password}@${dbconfig.host}:${dbconfig.port}`;
+        mongoClient = new MongoClient(url, {
+            useNewUrlParser: true,
+            useUnifiedTopology: true
+        });
+        await mongoClient.connect();
+    }
+    return mongoClient.db(dbconfig.database_name).collection(dbconfig.collection_name);
+}
+
+async function closeConnection() {
+    if (mongoClient !== null) {
+        await mongoClient.close();
+        mongoClient = null;
+    }
+}
+
+/**
+ * Given a commit, analyse its single line changes. The commit is passed by Python, which saves the result to
+ * whichever storage it uses (see database/commit_store.py)
+ * @param {Object} commit - The 'commit_hash', 'parent_hash', 'local_repo_path' and 'single_line_changes' of the commit
+ * @returns {Promise<Array>} The single line changes along with the results of their analysis
+ */
+async function analyseCommit(commit) {
+    return extractSpecificNodes([commit]);
+}
+
 /**
  * Given  a commitId extract data
  * @param {String} commitId
  */
 async function extractData(commitId) {
-    const MongoClient = require('mongodb').MongoClient;
-    const url = `mongodb://${dbconfig.username}:${dbconfig.password}@${dbconfig.host}:${dbconfig.port}`;
-    // console.log(url);
-    const dbName = dbconfig.database_name;
-
-    const client = new MongoClient(url, {
-        useNewUrlParser: true,
-        useUnifiedTopology: true
-    });
-
-    client.connect(function (err) {
-        assert.strictEqual(null, err);
-        // console.log("Connected successfully to server");
-        const collection = client.db(dbName).collection(dbconfig.collection_name);
-
-        let query = {
-            _id: commitId
-        };
-
-
-        // First query the database and find the correct commit
-        collection.find(query).toArray(async function (err, items) {
-            let singleLineChanges = await extractSpecificNodes(items);
-            // Once the updated, single line changes are available. Add them
-            collection.updateOne({
-                    _id: commitId
-                }, {
-                    $set: {
-                        single_line_changes: singleLineChanges
-                    }
-                },
-                {},
-                function (err, res) {
-                    // console.log(res);
-                    // console.log(err);
-                    client.close();
-                }
-            );
-        });
+    const collection = await getCollection();
+
+    // First query the database and find the correct commit
+    let items = await collection.find({
+        _id: commitId
+    }).toArray();
+    let singleLineChanges = await analyseCommit(items[0]);
+    // Once the updated, single line changes are available. Add them
+    await collection.updateOne({
+        _id: commitId
+    }, {
+        $set: {
+            single_line_changes: singleLineChanges
+        }
     });
+}
 
+// Only run from the command line, the persistent worker (nodeWorker.js) requires this file
+if (require.main === module) {
+    (
+        async function () {
+            let {
+                commitId
+            } = parse_cli_arguments();
+            if (commitId) {
+                await extractData(commitId);
+                await closeConnection();
+            }
+        }
+    )();
 }
 
-(
-    async function () {
-        let {
-            commitId
-        } = parse_cli_arguments();
-        if (commitId)
-            await extractData(commitId);
-    }
-)();
+module.exports.analyseCommit = analyseCommit;
+module.exports.extractData = extractData;
+module.exports.closeConnection = closeConnection;
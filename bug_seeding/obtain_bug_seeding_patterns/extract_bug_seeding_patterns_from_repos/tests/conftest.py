@@ -0,0 +1,68 @@
+"""
+
+Created on 18-October-2026
+
+The modules of the pattern extraction import each other relative to this directory (eg. 'utils.fileutils',
+'database.commit_store'), like they do when main.py is run. The package 'utils' clashes with the one of bug seeding,
+hence run these tests on their own:
+    python -m pytest bug_seeding/obtain_bug_seeding_patterns/extract_bug_seeding_patterns_from_repos/tests
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+class GitRepos:
+    """
+    A repository 'origin' and a clone of it in 'repos', whose remote looks like a GitHub repository
+    """
+
+    def __init__(self, root: Path):
+        self.origin = root / 'origin'
+        self.repos_dir = root / 'repos'
+        self.clone = self.repos_dir / 'project'
+        self.origin.mkdir()
+        self._git('init', '-q', '-b', 'main', cwd=self.origin)
+        self.num_of_commits = 0
+        self.lines = [f'var x{i} = {i};\n' for i in range(5)]
+
+    @staticmethod
+    def _git(*args, cwd: Path) -> None:
+        subprocess.run(['git', '-c', 'user.name=Jibesh', '-c', 'user.email=jibesh@example.com', *args], cwd=cwd,
+                       check=True, capture_output=True)
+
+    def commit(self, message: str = 'Fix the bug') -> None:
+        """
+        Change a single line of 'a.js'
+        """
+        self.lines[self.num_of_commits % len(self.lines)] = f'var x = {self.num_of_commits};\n'
+        (self.origin / 'a.js').write_text(''.join(self.lines))
+        self._git('add', '.', cwd=self.origin)
+        self._git('commit', '-q', '-m', message, cwd=self.origin)
+        self.num_of_commits += 1
+
+    def commit_ids(self) -> list:
+        """
+        The ids of the commits of 'origin', oldest first
+        """
+        log = subprocess.run(['git', 'log', '--reverse', '--format=%H'], cwd=self.origin, check=True,
+                             capture_output=True, text=True)
+        return log.stdout.split()
+
+    def clone_origin(self) -> None:
+        self._git('clone', '-q', str(self.origin), str(self.clone), cwd=self.origin)
+        self._git('remote', 'set-url', 'origin', 'https://github.com/jibesh/project.git', cwd=self.clone)
+
+    def fetch(self) -> None:
+        self._git('fetch', '-q', str(self.origin), 'main:refs/remotes/origin/main', cwd=self.clone)
+
+
+@pytest.fixture
+def git_repos(tmp_path):
+    if os.system('git --version > /dev/null 2>&1') != 0:
+        pytest.skip('git is not installed')
+    return GitRepos(tmp_path)
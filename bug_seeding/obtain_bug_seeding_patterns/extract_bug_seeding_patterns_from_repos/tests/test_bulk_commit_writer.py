@@ -0,0 +1,101 @@
+"""
+
+Created on 18-October-2026
+
+"""
+import pytest
+
+mongomock = pytest.importorskip('mongomock')
+from pymongo.errors import BulkWriteError
+import main
+from database.commit_store import CommitsNotSavedError
+from database.GitHubCommits import MongoCommitStore, BulkCommitWriter, Commits
+from utils.mining_watermarks import get_mining_settings, read_processed_tips
+
+MONGOMOCK_CONFIG = {'host': 'mongomock://localhost', 'port': 27017, 'database_name': 'test_github_commits'}
+
+
+@pytest.fixture
+def commit_store():
+    commit_store = MongoCommitStore(MONGOMOCK_CONFIG)
+    commit_store.connect()
+    Commits.drop_collection()
+    yield commit_store
+    Commits.drop_collection()
+
+
+@pytest.fixture
+def failing_commits(monkeypatch):
+    """
+    The ids of the commits that the database refuses to write, the others of a batch are written
+    """
+    failing_commit_ids = set()
+    bulk_write = mongomock.collection.Collection.bulk_write
+
+    def partially_failing_bulk_write(collection, requests, ordered=True, **kwargs):
+        failing = [i for i, request in enumerate(requests) if request._filter['_id'] in failing_commit_ids]
+        result = bulk_write(collection, [request for i, request in enumerate(requests) if i not in failing],
+                            ordered=ordered, **kwargs)
+        if len(failing) > 0:
+            raise BulkWriteError({'writeErrors': [{'index': i, 'code': 17419, 'errmsg': 'Document too large'}
+                                                  for i in failing],
+                                  'nUpserted': result.upserted_count, 'nMatched': result.matched_count})
+        return result
+
+    monkeypatch.setattr(mongomock.collection.Collection, 'bulk_write', partially_failing_bulk_write)
+    return failing_commit_ids
+
+
+def make_commit(i: int) -> dict:
+    return {'commit_id': f'jibesh/project_{i}', 'commit_hash': f'{i}', 'commit_message': 'Fix', 'num_files_changed': 1,
+            'single_line_changes': [], 'num_single_line_changes': 0}
+
+
+@pytest.mark.parametrize('max_pending_batches', [0, 2])
+def test_commits_are_written_in_batches(commit_store, max_pending_batches):
+    with commit_store.writer(batch_size=3, max_pending_batches=max_pending_batches) as writer:
+        for i in range(10):
+            writer.add(make_commit(i))
+        # Replaces the commit written before
+        writer.add(dict(make_commit(0), commit_message='Fix again'))
+    assert writer.num_written == 11
+    assert Commits.objects.count() == 10
+    assert commit_store.get_commit('jibesh/project_0')['commit_message'] == 'Fix again'
+
+
+@pytest.mark.parametrize('max_pending_batches', [0, 2])
+def test_partially_failed_batch_is_reported(commit_store, failing_commits, max_pending_batches):
+    failing_commits.update({'jibesh/project_1', 'jibesh/project_7'})
+    writer = BulkCommitWriter(batch_size=3, max_pending_batches=max_pending_batches)
+    for i in range(10):
+        writer.add(make_commit(i))
+    with pytest.raises(CommitsNotSavedError) as e:
+        writer.close()
+    assert sorted(e.value.commit_ids) == ['jibesh/project_1', 'jibesh/project_7']
+    # The other commits, also those of the same batches, have been written
+    assert writer.num_written == 8
+    assert Commits.objects.count() == 8
+
+
+def test_watermark_does_not_advance_if_commits_could_not_be_saved(git_repos, commit_store, failing_commits,
+                                                                 monkeypatch, tmp_path):
+    monkeypatch.setattr(main, 'get_mining_commit_store', lambda: commit_store)
+    watermark_dir = str(tmp_path / 'watermarks')
+    settings = get_mining_settings(['Fix'], '.js')
+    for _ in range(4):
+        git_repos.commit()
+    git_repos.clone_origin()
+    repo_path = str(git_repos.clone)
+    first_commit_id = f'jibesh/project_{git_repos.commit_ids()[1]}'
+    failing_commits.add(first_commit_id)
+
+    main.extract_from_repo((repo_path, ['Fix'], '.js', watermark_dir))
+    assert Commits.objects.count() == 2
+    assert read_processed_tips(watermark_dir, repo_path, settings) == []
+
+    # The next run walks the whole history again
+    failing_commits.clear()
+    main.extract_from_repo((repo_path, ['Fix'], '.js', watermark_dir))
+    assert Commits.objects.count() == 3
+    assert commit_store.get_commit(first_commit_id) is not None
+    assert read_processed_tips(watermark_dir, repo_path, settings) == [git_repos.commit_ids()[-1]]
@@ -0,0 +1,86 @@
+"""
+
+Created on 18-October-2026
+
+"""
+import json
+import pytest
+import main
+from database.SQLiteCommits import SQLiteCommitStore
+from utils.mining_watermarks import get_mining_settings, get_watermark_path, read_processed_tips, \
+    write_processed_tips, get_default_watermark_dir
+
+SETTINGS = get_mining_settings(query_terms=['Fix', 'Bug'], file_extension='.js')
+
+
+def test_round_trip(tmp_path):
+    watermark_dir = str(tmp_path / 'watermarks')
+    assert read_processed_tips(watermark_dir, 'repos/project', SETTINGS) == []
+    write_processed_tips(watermark_dir, 'repos/project', SETTINGS, ['a' * 40, 'b' * 40])
+    assert read_processed_tips(watermark_dir, 'other/repos/project', SETTINGS) == ['a' * 40, 'b' * 40]
+    assert [path.name for path in (tmp_path / 'watermarks').iterdir()] == ['project.json']
+
+
+def test_watermark_of_other_settings_is_ignored(tmp_path):
+    write_processed_tips(str(tmp_path), 'project', SETTINGS, ['a' * 40])
+    # The order of the query terms does not matter
+    assert read_processed_tips(str(tmp_path), 'project', get_mining_settings(['Bug', 'Fix'], '.js')) == ['a' * 40]
+    assert read_processed_tips(str(tmp_path), 'project', get_mining_settings(['Fix'], '.js')) == []
+    assert read_processed_tips(str(tmp_path), 'project', get_mining_settings(['Fix', 'Bug'], '.ts')) == []
+
+
+def test_broken_watermark_is_ignored(tmp_path):
+    with open(get_watermark_path(str(tmp_path), 'project'), 'w') as f:
+        f.write('{"settings": ')
+    assert read_processed_tips(str(tmp_path), 'project', SETTINGS) == []
+
+
+def test_default_watermark_dir():
+    assert get_default_watermark_dir({'mining_state_dir': 'state'}) == 'state/watermarks'
+    assert get_default_watermark_dir({}) == 'mining_state/watermarks'
+
+
+@pytest.fixture
+def mine(tmp_path, monkeypatch):
+    commit_store = SQLiteCommitStore({'sqlite_path': str(tmp_path / 'commits.sqlite')})
+    monkeypatch.setattr(main, 'get_mining_commit_store', lambda: commit_store)
+    watermark_dir = str(tmp_path / 'watermarks')
+
+    def mine_and_get_mined_commits(repo_path: str, query_terms=('Fix',)) -> int:
+        walked = []
+        original_get_single_file_diff = main.get_single_file_diff
+
+        def get_single_file_diff(repo, commit, file_filter):
+            walked.append(str(commit.id))
+            return original_get_single_file_diff(repo, commit, file_filter)
+
+        monkeypatch.setattr(main, 'get_single_file_diff', get_single_file_diff)
+        main.query_repo_save_commits(repo_path, list(query_terms), '.js', watermark_dir)
+        return len(walked)
+
+    mine_and_get_mined_commits.commit_store = commit_store
+    mine_and_get_mined_commits.watermark_dir = watermark_dir
+    return mine_and_get_mined_commits
+
+
+def test_only_new_commits_are_mined(git_repos, mine):
+    for _ in range(4):
+        git_repos.commit()
+    git_repos.clone_origin()
+    # The first commit has no parent, hence it is never mined
+    assert mine(str(git_repos.clone)) == 3
+    assert mine(str(git_repos.clone)) == 0
+    assert len(mine.commit_store.get_commit_ids(num_files_changed=1, num_single_line_changes=1)) == 3
+
+    # A 'git fetch' does not move HEAD, the commits of the remote branch are mined nevertheless
+    for _ in range(2):
+        git_repos.commit()
+    git_repos.fetch()
+    assert mine(str(git_repos.clone)) == 2
+    assert mine(str(git_repos.clone)) == 0
+    assert len(mine.commit_store.get_commit_ids(num_files_changed=1, num_single_line_changes=1)) == 5
+
+    # Other settings mine the whole history again
+    assert mine(str(git_repos.clone), query_terms=('Fix', 'Bug')) == 5
+    with open(get_watermark_path(mine.watermark_dir, str(git_repos.clone))) as f:
+        assert json.load(f)['settings'] == get_mining_settings(['Fix', 'Bug'], '.js')
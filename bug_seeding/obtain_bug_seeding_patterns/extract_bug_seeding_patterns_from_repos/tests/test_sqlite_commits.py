@@ -0,0 +1,106 @@
+"""
+
+Created on 18-October-2026
+
+"""
+from datetime import datetime
+import pytest
+from database.commit_store import read_config, get_commit_store
+from database.SQLiteCommits import SQLiteCommitStore
+
+
+def make_change(fix_tokens: list, buggy_tokens: list) -> dict:
+    return {
+        'old_file': {'path': 'a.js', 'line_num': 3, 'changed_line': 'x = a - b;\n',
+                     'change_analysis': {'type': 'BinaryExpression', 'tokens': ['a', '-', 'b'], 'range': [4, 9],
+                                         'line': '3-3'}},
+        'new_file': {'path': 'a.js', 'line_num': 3, 'changed_line': 'x = a + b;\n',
+                     'change_analysis': {'type': 'BinaryExpression', 'tokens': ['a', '+', 'b'], 'range': [4, 9],
+                                         'line': '3-3'}},
+        'change_summary': {'fix': fix_tokens, 'buggy': buggy_tokens}
+    }
+
+
+def make_commit(i: int, num_files_changed: int = 1, single_line_changes: list = None) -> dict:
+    single_line_changes = single_line_changes if single_line_changes is not None else [make_change([], [])]
+    return {'commit_id': f'jibesh/project_{i}', 'commit_hash': f'{i:040d}', 'commit_message': f'Fix {i}',
+            'commit_time': datetime(2020, 1, 1 + i, 12, 30), 'local_repo_path': 'repos/project',
+            'parent_hash': f'{i - 1:040d}', 'url': f'https://github.com/jibesh/project/commit/{i:040d}',
+            'num_files_changed': num_files_changed, 'single_line_changes': single_line_changes,
+            'num_single_line_changes': len(single_line_changes)}
+
+
+@pytest.fixture
+def commit_store(tmp_path):
+    return SQLiteCommitStore({'sqlite_path': str(tmp_path / 'state' / 'commits.sqlite')})
+
+
+def test_round_trip(commit_store):
+    with commit_store.writer(batch_size=2) as writer:
+        for i in range(5):
+            writer.add(make_commit(i, num_files_changed=1 if i < 4 else 2))
+        # Replaces the commit written before
+        writer.add(dict(make_commit(0), commit_message='Fix again'))
+    assert writer.num_written == 6
+
+    assert sorted(commit_store.get_commit_ids(num_files_changed=1, num_single_line_changes=1)) == \
+           [f'jibesh/project_{i}' for i in range(4)]
+    assert commit_store.get_commit_ids(num_files_changed=1, num_single_line_changes=2) == []
+    assert commit_store.get_commit('jibesh/project_1') == make_commit(1)
+    assert commit_store.get_commit('jibesh/project_0')['commit_message'] == 'Fix again'
+    assert commit_store.get_commit('jibesh/project_9') is None
+
+
+def test_analysed_commits(commit_store):
+    with commit_store.writer() as writer:
+        for i in range(4):
+            writer.add(make_commit(i))
+
+    def analysed(change: dict, report: str) -> list:
+        return [dict(change, analysis_report=report)]
+
+    fix, buggy = ['Idf_1', '+', 'Idf_2'], ['Idf_1', '-', 'Idf_2']
+    commit_store.update_single_line_changes('jibesh/project_2', analysed(make_change(fix, buggy), 'success'))
+    commit_store.update_single_line_changes('jibesh/project_0', analysed(make_change(buggy, fix), 'success'))
+    commit_store.update_single_line_changes('jibesh/project_1', analysed(make_change(fix, buggy), 'failed'))
+    # Changes of 20 or more tokens are left out
+    commit_store.update_single_line_changes('jibesh/project_3', analysed(make_change(['Idf_1'] * 20, buggy),
+                                                                         'success'))
+
+    assert commit_store.get_commit_ids(num_files_changed=1, num_single_line_changes=1, only_new_commits=True) == []
+    assert commit_store.get_commit('jibesh/project_2')['single_line_changes'][0]['analysis_report'] == 'success'
+
+    abstracted_changes = commit_store.get_abstracted_changes()
+    # Oldest first
+    assert [change['_id'] for change in abstracted_changes] == ['jibesh/project_0', 'jibesh/project_2']
+    change = abstracted_changes[1]
+    assert change['fix'] == fix and change['buggy'] == buggy
+    assert change['fix_actual'] == ['a', '+', 'b'] and change['buggy_actual'] == ['a', '-', 'b']
+    assert change['fix_tokenType'] == 'BinaryExpression' and change['buggy_range'] == [4, 9]
+    assert change['fix_line'] == '3-3' and change['fix_file_path'] == 'a.js'
+    assert change['commit_time'] == datetime(2020, 1, 3, 12, 30)
+    assert change['url'] == make_commit(2)['url']
+
+
+def test_only_new_commits(commit_store):
+    with commit_store.writer() as writer:
+        for i in range(3):
+            writer.add(make_commit(i))
+    commit_store.update_single_line_changes('jibesh/project_1', [dict(make_change([], []), analysis_report='failed')])
+    assert sorted(commit_store.get_commit_ids(num_files_changed=1, num_single_line_changes=1,
+                                              only_new_commits=True)) == ['jibesh/project_0', 'jibesh/project_2']
+
+
+def test_read_config(tmp_path):
+    assert read_config(str(tmp_path / 'missing.json')) == {}
+    broken = tmp_path / 'broken.json'
+    broken.write_text('{"backend": ')
+    with pytest.raises(ValueError):
+        read_config(str(broken))
+
+
+def test_get_commit_store(tmp_path):
+    assert isinstance(get_commit_store({'backend': 'sqlite', 'sqlite_path': str(tmp_path / 'c.sqlite')}),
+                      SQLiteCommitStore)
+    with pytest.raises(ValueError):
+        get_commit_store({'backend': 'postgres'})
@@ -0,0 +1,58 @@
+"""
+
+Created on 18-October-2026
+
+Remember which commits of a repository have already been mined, so that a rerun (eg. after a 'git fetch') only
+walks the new commits. The watermark of a repository is the list of the tips (commit ids) from which its history has
+been walked completely. Every commit reachable from one of these tips has been mined, hence the next walk hides them.
+The watermark of a repository is written to '<watermark_dir>/<repo name>.json' once all its commits have been saved.
+A watermark written using other settings (eg. other query terms) is ignored and the whole history is mined again.
+By default, the watermarks are kept in the state directory of the mining, 'mining_state_dir' of
+'database_config.json'.
+"""
+import os
+from pathlib import Path
+from typing import Dict, List
+import utils.fileutils as fs
+
+# Increment after changing which changes are extracted from a commit
+MINING_VERSION = 1
+
+DEFAULT_MINING_STATE_DIR = 'mining_state'
+
+
+def get_default_watermark_dir(config: Dict) -> str:
+    """
+    :param config: The database config
+    """
+    return os.path.join(config.get('mining_state_dir', DEFAULT_MINING_STATE_DIR), 'watermarks')
+
+
+def get_watermark_path(watermark_dir: str, repo_path: str) -> str:
+    return os.path.join(watermark_dir, Path(repo_path).name + '.json')
+
+
+def get_mining_settings(query_terms: List, file_extension: str) -> Dict:
+    return {'version': MINING_VERSION, 'query_terms': sorted(query_terms), 'file_extension': file_extension}
+
+
+def read_processed_tips(watermark_dir: str, repo_path: str, settings: Dict) -> List[str]:
+    """
+    :return: The commit ids whose history has already been mined using the given settings
+    """
+    path = get_watermark_path(watermark_dir, repo_path)
+    if not fs.pathExists(path):
+        return []
+    watermark = fs.read_json_file(path)
+    if not isinstance(watermark, dict) or watermark.get('settings') != settings:
+        return []
+    return watermark.get('processed_tips', [])
+
+
+def write_processed_tips(watermark_dir: str, repo_path: str, settings: Dict, processed_tips: List[str]) -> None:
+    fs.create_dir_list_if_not_present([watermark_dir])
+    path = get_watermark_path(watermark_dir, repo_path)
+    # Write to a temporary file first, an interrupted write must not leave a broken watermark behind
+    fs.writeJSONFile(data={'settings': settings, 'processed_tips': processed_tips}, file_path=path + '.tmp')
+    if fs.pathExists(path + '.tmp'):
+        os.replace(path + '.tmp', path)
@@ -0,0 +1,24 @@
+"""
+
+Created on 18-October-2026
+
+The Node.js worker of the bug seeding pipeline (bug_seeding/utils/node_worker.py). Both pipelines have a package
+called 'utils', hence the module is loaded from its file rather than by putting 'bug_seeding' on the path.
+"""
+import importlib.util
+import os
+import sys
+
+_MODULE_NAME = 'bug_seeding_utils_node_worker'
+
+if _MODULE_NAME not in sys.modules:
+    _spec = importlib.util.spec_from_file_location(
+        _MODULE_NAME, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, os.pardir,
+                                   'utils', 'node_worker.py'))
+    sys.modules[_MODULE_NAME] = importlib.util.module_from_spec(_spec)
+    _spec.loader.exec_module(sys.modules[_MODULE_NAME])
+
+NodeWorker = sys.modules[_MODULE_NAME].NodeWorker
+PATH_TO_NODE_WORKER = sys.modules[_MODULE_NAME].PATH_TO_NODE_WORKER
+get_node_worker = sys.modules[_MODULE_NAME].get_node_worker
+close_node_workers = sys.modules[_MODULE_NAME].close_node_workers
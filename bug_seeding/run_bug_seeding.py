@@ -8,19 +8,33 @@ The main file from where all experiments are run
 import argparse
 import utils.fileutils as fs
 from utils.argument_utils import read_arguments
-from utils.prepare_for_seeding_bug import prepare_dir_for_seeding_bugs
-from utils.bug_seeding_pattern_utils import find_wrong_operand_in_binary_op_patterns, \
-    get_only_idf_lit_containing_patterns
+from utils.prepare_for_seeding_bug import get_target_js_files, get_colliding_file_names
+from utils.run_manifest import RunManifest, get_file_hash
+from utils.analysed_file_store import get_analysed_file_store
+from utils.task_scheduler import estimate_costs, create_batches, run_batch, WorkerUtilisation
+from utils.bug_quota import BugQuota
+from utils.bug_seeding_pattern_utils import select_patterns_of_category, create_pattern_index, \
+    add_pattern_fingerprints, BUG_CATEGORIES
+from utils.compiled_patterns import load_patterns
+from utils.seeding_cache import SeedingCache, get_fingerprint
 import os
+import random
 from tqdm import tqdm
 from multiprocessing import Pool, cpu_count
-from seed_bugs_to_a_file import seed_bugs_to_a_file, seed_bugs_to_a_file_multiprocessing
+from seed_bugs_to_a_file import analyse_and_seed_bugs_to_a_js_file_multiprocessing, init_seeding_worker, \
+    set_seeding_settings
+from utils.seeded_bug_writer import close_seeded_bug_writers
 import numpy as np
+from bug_seeding_approaches.SemSeed.BugSeedingUtils import token_embedding, TOKEN_EMBEDDING_MATRIX, \
+    TOKEN_EMBEDDING_VOCABULARY, token_similarity_cache
+from bug_seeding_approaches.SemSeed.TokenSimilarityCache import merge_shards
+from bug_seeding_approaches.SemSeed.TokenEmbedding import collect_tokens_for_embedding, \
+    export_token_embedding_matrix
 
 
 def select_particular_type_of_seeding_pattern(bug_seeding_patterns):
-    # Select only 'Wrong Binary Operand' patterns
-    # bug_seeding_patterns = find_wrong_operand_in_binary_op_patterns(bug_seeding_patterns)
+    # Select only 'Wrong Binary Operand' patterns (or any other of BUG_CATEGORIES)
+    # bug_seeding_patterns = select_patterns_of_category(bug_seeding_patterns, category='wrong_binary_operand')
 
     # Select only 'Wrong Assignments' patterns
     # bug_seeding_patterns = fs.read_json_file('benchmarks/bug_seeding_patterns_wrong_assignment.json')
@@ -34,67 +48,225 @@ if __name__ == '__main__':
         description="Provide the proper directories where bugs may be seeded",
         epilog="You must provide directories"
     )
-    in_dir, out_dir, working_dir, stats_dir, bug_seeding_patterns, k_freq_idf, k_freq_lit = read_arguments(parser)
+    in_dir, out_dir, working_dir, stats_dir, bug_seeding_patterns, k_freq_idf, k_freq_lit, \
+    similarity_cache, max_seconds_per_file, max_memory_per_process, max_tasks_per_process, output_format, \
+    num_of_writer_threads, beautify, max_bugs_per_file, max_bugs = read_arguments(parser)
 
     # print("Sampling files for using as target to seed bugs")
     # fs.sample_from_zip(zip_file_path='benchmarks/data.zip', out_dir=in_dir, file_extension_to_sample='.js',
     #                    required_number_of_files=100)
 
-    # Read bug seeding patterns
-    all_bug_seeding_patterns = fs.read_json_file(bug_seeding_patterns)
-    all_bug_seeding_patterns = get_only_idf_lit_containing_patterns(all_bug_seeding_patterns)
-    print(f"Complete bug seeding patterns = {len(all_bug_seeding_patterns)}")
-    l_len = len(all_bug_seeding_patterns) * 80 // 100
-    tr_patterns, val_patterns = all_bug_seeding_patterns[:l_len], all_bug_seeding_patterns[l_len:]
+    # Read bug seeding patterns. They are compiled once, along with the categories of bugs they seed, their
+    # fingerprints and the split into training and validation patterns
+    tr_patterns, val_patterns = load_patterns(pattern_file=bug_seeding_patterns)
+    print(f"Complete bug seeding patterns = {len(tr_patterns) + len(val_patterns)}")
     print(
         f'Training patterns are {len(tr_patterns)} and validation are {len(val_patterns)}. We only use training patterns for bug seeding')
     bug_seeding_patterns = tr_patterns
 
     bug_seeding_patterns = select_particular_type_of_seeding_pattern(bug_seeding_patterns=bug_seeding_patterns)
     print("There are {} bug seeding patterns".format(len(bug_seeding_patterns)))
+    print("Bug seeding patterns per category: {}".format(
+        {category: sum(category in pattern['labels'] for pattern in bug_seeding_patterns)
+         for category in BUG_CATEGORIES}))
 
-    # More intermediate directories needed
+    # The fingerprints of the patterns tell which of them have already been applied to a file by earlier runs
+    pattern_fingerprints = add_pattern_fingerprints(bug_seeding_patterns=bug_seeding_patterns)
+    # Index the patterns once by their 'fix' abstract token sequence. Every location looks up its patterns here
+    bug_seeding_pattern_index = create_pattern_index(bug_seeding_patterns=bug_seeding_patterns)
+    print("The bug seeding patterns have {} distinct abstract token sequences".format(len(bug_seeding_pattern_index)))
+
+    # More intermediate directories needed. The static analysis results of all files are kept in the shards of a
+    # store in this directory
     static_analysis_out_dir = os.path.join(working_dir, '__TEMP__target_js_file_nodes')
+    fs.create_dir_list_if_not_present([static_analysis_out_dir])
+    analysed_file_store = get_analysed_file_store(store_dir=static_analysis_out_dir)
+    print("The store in '{}' contains {} analysed files".format(static_analysis_out_dir, len(analysed_file_store)))
+
+    # Export the embeddings of the tokens needed for seeding, all workers memory-map the same matrix. New patterns or
+    # target files bring tokens that the matrix exported by an earlier run does not contain. Their vectors would come
+    # from the slow fastText model, hence the matrix is exported again
+    token_embedding.load_matrix(matrix_path=TOKEN_EMBEDDING_MATRIX, vocabulary_path=TOKEN_EMBEDDING_VOCABULARY)
+    tokens_to_export = collect_tokens_for_embedding(
+        bug_seeding_patterns=bug_seeding_patterns,
+        K_most_frequent_identifiers=fs.read_json_file(k_freq_idf),
+        K_most_frequent_literals=fs.read_json_file(k_freq_lit),
+        analysed_file_store=analysed_file_store)
+    missing_tokens = token_embedding.get_missing_tokens(tokens_to_export)
+    if len(missing_tokens) > 0:
+        print("{} of the {} tokens needed are missing from '{}', exporting the token embeddings".format(
+            len(missing_tokens), len(tokens_to_export), TOKEN_EMBEDDING_MATRIX))
+        export_token_embedding_matrix(tokens=tokens_to_export, fasttext_model_path=token_embedding.fasttext_model_path,
+                                      matrix_path=TOKEN_EMBEDDING_MATRIX, vocabulary_path=TOKEN_EMBEDDING_VOCABULARY)
+        token_embedding.load_matrix(matrix_path=TOKEN_EMBEDDING_MATRIX, vocabulary_path=TOKEN_EMBEDDING_VOCABULARY)
 
-    print("Preparing for bug seeding")
-    prepare_dir_for_seeding_bugs(target_js_dir=in_dir,
-                                 abstracted_out_dir=static_analysis_out_dir, num_of_files=-1)
+    # Start with the token similarities of the previous runs. The processes of the Pool inherit them
+    if similarity_cache:
+        token_similarity_cache.load(similarity_cache)
+        print("Loaded {} token similarities from '{}'".format(len(token_similarity_cache), similarity_cache))
 
     # Maximum number of tries to seed bugs per file. We could be always successful and seed 10 bugs or 0
     MAX_LOCATIONS_TO_TRY_TO_SEED_BUGS = -1  # If -1 then try to seed everywhere
+    # Maximum number of mutated sequences per (location, pattern) pair. Only matters for K > 1
+    MAX_VARIANTS_PER_LOCATION = None  # If None then write all of them
+    # The parameters of SemSeed
+    seeding_parameters = {'similarity_threshold': 0.3, 'K': 1, 'scope_of_selection': 'top_K'}
     actual_mutations_in_each_file = []
 
-    # Now seed bugs
     K_most_frequent_identifiers = fs.read_json_file(k_freq_idf)
     K_most_frequent_literals = fs.read_json_file(k_freq_lit)
-    analysed_files = fs.go_through_dir(directory=static_analysis_out_dir, filter_file_extension='.json')
 
-    args_for_files = [
-        (file, bug_seeding_patterns, K_most_frequent_identifiers, K_most_frequent_literals,
-         MAX_LOCATIONS_TO_TRY_TO_SEED_BUGS, out_dir) for
-        file in analysed_files]
+    # Every file is analysed and seeded on its own. The manifest records the finished stages of each file, hence
+    # a restarted run skips the files that have already been seeded
+    run_manifest = RunManifest(manifest_path=os.path.join(working_dir, 'run_manifest.jsonl'))
+    # A file is only seeded using the patterns that earlier runs have not yet applied to it with the same parameters.
+    # The files written by earlier runs are kept
+    seeding_cache = SeedingCache(manifest_path=run_manifest.manifest_path,
+                                 pattern_sets_dir=os.path.join(working_dir, 'pattern_sets'))
+    pattern_set = seeding_cache.add_pattern_set(pattern_fingerprints)
+    parameters = get_fingerprint({'seeding_parameters': seeding_parameters,
+                                  'MAX_LOCATIONS_TO_TRY_TO_SEED_BUGS': MAX_LOCATIONS_TO_TRY_TO_SEED_BUGS,
+                                  'MAX_VARIANTS_PER_LOCATION': MAX_VARIANTS_PER_LOCATION,
+                                  'max_bugs_per_file': max_bugs_per_file,
+                                  'K_most_frequent_identifiers': K_most_frequent_identifiers,
+                                  'K_most_frequent_literals': K_most_frequent_literals})
+    # Files that exceeded the time or memory limits in an earlier run are skipped unless they have changed. Delete
+    # the quarantine list to try them again
+    quarantine = RunManifest(manifest_path=os.path.join(working_dir, 'quarantine.jsonl'))
+    task_limits = {'max_seconds_per_file': max_seconds_per_file, 'max_memory_per_process': max_memory_per_process,
+                   'quarantine_path': quarantine.manifest_path}
+    target_js_files = get_target_js_files(target_js_dir=in_dir, num_of_files=-1)
+
+    # Only the files are sent with each task. Everything else is the same for all files and every process gets
+    # it only once (see set_seeding_settings)
+    seeding_settings = {
+        'analysed_file_store_dir': static_analysis_out_dir,
+        'manifest_path': run_manifest.manifest_path,
+        'bug_seeding_pattern_index': bug_seeding_pattern_index,
+        'K_most_frequent_identifiers': K_most_frequent_identifiers,
+        'K_most_frequent_literals': K_most_frequent_literals,
+        'MAX_LOCATIONS_TO_TRY_TO_SEED_BUGS': MAX_LOCATIONS_TO_TRY_TO_SEED_BUGS,
+        'MAX_VARIANTS_PER_LOCATION': MAX_VARIANTS_PER_LOCATION,
+        'out_dir': out_dir,
+        'output_format': output_format,
+        'num_of_writer_threads': num_of_writer_threads,
+        'beautify': beautify,
+        'seeding_parameters': seeding_parameters,
+        'parameters': parameters,
+        'pattern_set': pattern_set,
+        'pattern_sets_dir': seeding_cache.pattern_sets_dir,
+        'max_bugs_per_file': max_bugs_per_file,
+        'colliding_file_names': get_colliding_file_names(target_js_files)
+    }
+    args_for_files = []
+    # The number of nodes of the files that have already been analysed, used to estimate the cost of seeding them
+    known_num_of_nodes = {}
+    num_of_quarantined_files, num_of_partially_seeded_files = 0, 0
+    for js_file in target_js_files:
+        content_hash = get_file_hash(js_file)
+        patterns_to_seed = seeding_cache.get_patterns_to_seed(js_file, content_hash, parameters, pattern_fingerprints)
+        num_seeded_before = seeding_cache.get_num_seeded(js_file, content_hash, parameters)
+        if len(patterns_to_seed) == 0:
+            actual_mutations_in_each_file.append(num_seeded_before)
+            continue
+        if quarantine.is_done(js_file, 'quarantined', content_hash):
+            num_of_quarantined_files += 1
+            continue
+        needs_analysis = not (run_manifest.is_done(js_file, 'analysed', content_hash) and
+                              analysed_file_store.contains(js_file, content_hash))
+        if not needs_analysis:
+            # Seeding costs about the same for every pattern
+            known_num_of_nodes[len(args_for_files)] = analysed_file_store.get_num_of_nodes(
+                js_file, content_hash) * len(patterns_to_seed) / max(1, len(pattern_fingerprints))
+        if len(patterns_to_seed) < len(pattern_fingerprints):
+            num_of_partially_seeded_files += 1
+            args_for_files.append((js_file, needs_analysis, seeding_cache.add_pattern_set(patterns_to_seed),
+                                   num_seeded_before))
+        else:
+            args_for_files.append((js_file, needs_analysis, pattern_set, num_seeded_before))
+    print("{} files have already been seeded using all patterns in an earlier run, {} files are quarantined, "
+          "{} files remain of which {} only need the patterns they have not been seeded with yet".format(
+           len(actual_mutations_in_each_file), num_of_quarantined_files, len(args_for_files),
+           num_of_partially_seeded_files))
+
+    # The tokens of the files analysed during this run may not be present in the matrix. Loading the fastText model
+    # before creating the Pool lets all processes share it rather than each loading its own copy
+    if any(needs_analysis for _, needs_analysis, _, _ in args_for_files):
+        token_embedding.load_fasttext_model()
+
+    # Once 'max_bugs' bugs have been seeded, the files being seeded stop and the remaining files are skipped. The
+    # files are seeded in a random order, hence the seeded bugs are not biased towards the files that happen to come
+    # first (or are the most expensive)
+    bug_quota = BugQuota(max_bugs=max_bugs, num_seeded_before=sum(actual_mutations_in_each_file)) \
+        if max_bugs > 0 else None
+    if max_bugs > 0:
+        random.Random(42).shuffle(args_for_files)
+        print("At most {} bugs are seeded, {} of them have been seeded by earlier runs".format(
+            max_bugs, sum(actual_mutations_in_each_file)))
+        if sum(actual_mutations_in_each_file) >= max_bugs:
+            args_for_files = []
 
     # Multiprocessing only on machine with many CPUs
     if cpu_count() > 4:
-        with Pool(processes=cpu_count()) as p:
-            with tqdm(total=len(analysed_files)) as pbar:
+        # The most expensive files are seeded first and the cheap files are sent in batches. The cost of the files
+        # that still need to be analysed is estimated from the size of the JS file. Every file is sent on its own if
+        # seeding may stop early, to keep the random order
+        if max_bugs > 0:
+            batches = [[args_for_file] for args_for_file in args_for_files]
+        else:
+            batches = create_batches(tasks=args_for_files,
+                                     costs=estimate_costs(sizes=[os.path.getsize(js_file)
+                                                                 for js_file, _, _, _ in args_for_files],
+                                                          known_costs=known_num_of_nodes),
+                                     num_of_processes=cpu_count())
+        utilisation = WorkerUtilisation()
+        # The processes are replaced after some batches, which frees any memory they have accumulated
+        with Pool(processes=cpu_count(), initializer=init_seeding_worker,
+                  initargs=(similarity_cache, seeding_settings, task_limits, bug_quota),
+                  maxtasksperchild=max_tasks_per_process or None) as p:
+            with tqdm(total=len(args_for_files)) as pbar:
                 pbar.set_description_str(
                     desc="Seeding bugs to files ", refresh=False)
-                for i, successful_mutations in tqdm(
-                        enumerate(p.imap_unordered(seed_bugs_to_a_file_multiprocessing, args_for_files, chunksize=1)),
-                        position=0):
-                    actual_mutations_in_each_file.append(successful_mutations)
-                    pbar.update()
+                for pid, busy_time, successful_mutations in p.imap_unordered(
+                        run_batch, [(analyse_and_seed_bugs_to_a_js_file_multiprocessing, batch) for batch in batches],
+                        chunksize=1):
+                    # The files skipped after stopping have not been seeded
+                    successful_mutations = [n for n in successful_mutations if n is not None]
+                    actual_mutations_in_each_file.extend(successful_mutations)
+                    utilisation.add(pid=pid, busy_time=busy_time, num_of_tasks=len(successful_mutations))
+                    # The processes skip the remaining files rather than being terminated, hence they still save
+                    # their token similarities and close their archives
+                    pbar.update(len(successful_mutations))
                 p.close()
                 p.join()
+        print(utilisation)
+        if similarity_cache:
+            print("Token similarity cache of all processes: {}".format(
+                merge_shards(cache=token_similarity_cache, file_path=similarity_cache)))
     else:
         # Non multiprocessing
-        for file in tqdm(analysed_files, desc='Seeding bugs to files', position=0, postfix={'approach': 'SemSeed'}):
-            successful_mutations = seed_bugs_to_a_file(file, bug_seeding_patterns, K_most_frequent_identifiers,
-                                                       K_most_frequent_literals,
-                                                       MAX_LOCATIONS_TO_TRY_TO_SEED_BUGS, out_dir)
+        set_seeding_settings(seeding_settings, task_limits, bug_quota)
+        for args_for_file in tqdm(args_for_files, desc='Seeding bugs to files', position=0,
+                                  postfix={'approach': 'SemSeed'}):
+            if bug_quota is not None and bug_quota.is_reached():
+                break
+            successful_mutations = analyse_and_seed_bugs_to_a_js_file_multiprocessing(args_for_file)
             actual_mutations_in_each_file.append(successful_mutations)
+        close_seeded_bug_writers()
+        print("Token similarity cache: {}".format(token_similarity_cache.stats()))
+        if similarity_cache:
+            token_similarity_cache.save(similarity_cache)
+
+    newly_quarantined_files = [record for key, record in
+                               RunManifest(manifest_path=quarantine.manifest_path).completed_stages.items()
+                               if quarantine.completed_stages.get(key) != record]
+    if len(newly_quarantined_files) > 0:
+        print("{} files exceeded the limits and have been added to '{}'".format(len(newly_quarantined_files),
+                                                                               quarantine.manifest_path))
 
+    if bug_quota is not None and bug_quota.is_reached():
+        print("Stopped seeding after {} bugs, {} files have not been seeded".format(
+            sum(actual_mutations_in_each_file), len(target_js_files) - len(actual_mutations_in_each_file)))
     print("\n *** Bugs could be seeded in {}/{} files output directory is '{}' ***".format(
         np.count_nonzero(actual_mutations_in_each_file),
-        len(analysed_files), out_dir))
+        len(target_js_files), out_dir))
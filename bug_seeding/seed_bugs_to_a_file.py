@@ -5,49 +5,281 @@ Created on 01-April-2020
 
 """
 from bug_seeding_approaches.SemSeed.SemSeedBugs import SemSeedBugs
+from bug_seeding_approaches.SemSeed.CandidateContext import CandidateContext
+from bug_seeding_approaches.SemSeed.BugSeedingUtils import token_similarity_cache
+from bug_seeding_approaches.SemSeed.TokenSimilarityCache import get_shard_path
 import utils.static_analysis_utils as static_analysis_utils
 import utils.fileutils as fs
+from utils.prepare_for_seeding_bug import prepare_a_js_file_for_seeding_bug, create_out_file_path
+from utils.run_manifest import get_file_hash, append_to_manifest
+from utils.task_budget import TaskBudget, TaskBudgetExceeded, checks_deferred
+from utils.analysed_file_store import get_analysed_file_store, get_analysed_file_store_writer
+from utils.seeded_bug_writer import get_seeded_bug_writer, get_seeded_file_name
+from utils.seeding_cache import read_pattern_set
+from utils.bug_seeding_pattern_utils import filter_pattern_index
+from utils.reservoir_sampling import sample_in_random_order
+from utils.bug_quota import BugQuota
 import random
 from tqdm import tqdm
 from pathlib import Path
-from typing import List
+from typing import List, Dict, Tuple, Iterator, Collection, Callable
 import os
-import jsbeautifier
+from multiprocessing.util import Finalize
 
 random.seed(a=42)
 
 
+# The settings shared by all files of a run (patterns, top-K lists, directories etc.). Every process of the Pool
+# gets them once through its initializer, hence the tasks only carry the files
+_seeding_settings = {}
+# The limits of a single file. Files exceeding them are stopped and added to the quarantine list
+_task_limits = {}
+# The bugs that all files together may seed, no limit if None. Once reached, the remaining files are skipped
+_bug_quota = None
+# The pattern indices of the sets of patterns that only some files need (eg. the patterns added since the last run)
+_pattern_indices_of_sets = {}
+
+# The parameters of SemSeed used unless others are given
+DEFAULT_SEEDING_PARAMETERS = {'similarity_threshold': 0.3, 'K': 1, 'scope_of_selection': 'top_K'}
+
+
+def set_seeding_settings(seeding_settings: Dict, task_limits: Dict = None, bug_quota: BugQuota = None) -> None:
+    """
+    :param seeding_settings: The arguments of analyse_and_seed_bugs_to_a_js_file except 'js_file',
+                            'analysed_file' and 'needs_analysis'
+    :param task_limits: 'max_seconds_per_file', 'max_memory_per_process' (MB) and 'quarantine_path'.
+                        No limits if not given
+    :param bug_quota: The bugs that all files together may seed, shared by all processes. No limit if not given
+    """
+    global _bug_quota
+    _seeding_settings.clear()
+    _seeding_settings.update(seeding_settings)
+    _task_limits.clear()
+    _task_limits.update(task_limits or {})
+    _pattern_indices_of_sets.clear()
+    _bug_quota = bug_quota
+
+
+def init_seeding_worker(similarity_cache_path: str, seeding_settings: Dict, task_limits: Dict = None,
+                        bug_quota: BugQuota = None) -> None:
+    """
+    The initializer of every process of the Pool. If the token similarities are kept across runs, each
+    process saves the similarities it has computed to its own shard when it exits. The similarities inherited from
+    the parent are not saved again, since every recycled process (see maxtasksperchild) would write another copy
+    :param similarity_cache_path:
+    :param seeding_settings: See set_seeding_settings
+    :param task_limits: See set_seeding_settings
+    :param bug_quota: See set_seeding_settings
+    :return:
+    """
+    set_seeding_settings(seeding_settings, task_limits, bug_quota)
+    if similarity_cache_path:
+        token_similarity_cache.track_added_pairs()
+        Finalize(None, token_similarity_cache.save, args=(get_shard_path(similarity_cache_path),),
+                 kwargs={'only_added': True}, exitpriority=10)
+
+
 def seed_bugs_to_a_file_multiprocessing(args):
     """
     The multiprocessing wrapper of seed_bugs_to_a_file function
     :param args:
     :return:
     """
-    file, bug_seeding_patterns, K_most_frequent_identifiers, K_most_frequent_literals, MAX_TRIES_TO_SEED_BUGS, out_dir = args
-    return seed_bugs_to_a_file(file, bug_seeding_patterns, K_most_frequent_identifiers, K_most_frequent_literals,
-                               MAX_TRIES_TO_SEED_BUGS, out_dir)
+    file, bug_seeding_pattern_index, K_most_frequent_identifiers, K_most_frequent_literals, MAX_TRIES_TO_SEED_BUGS, out_dir = args
+    return seed_bugs_to_a_file(fs.read_json_file(file), Path(file).name, bug_seeding_pattern_index,
+                               K_most_frequent_identifiers, K_most_frequent_literals, MAX_TRIES_TO_SEED_BUGS, out_dir)
+
 
+def analyse_and_seed_bugs_to_a_js_file_multiprocessing(args):
+    """
+    The multiprocessing wrapper of analyse_and_seed_bugs_to_a_js_file function. Everything apart from the file
+    comes from the settings of the process (see set_seeding_settings). A file exceeding the time or memory
+    limits is stopped and added to the quarantine list. Only its analysis and seeding get stopped, the results
+    are always persisted completely (see checks_deferred).
+    :param args: The JS file, whether it needs to be analysed, the fingerprint of the set of patterns that need to
+                 be applied to it and the number of locations seeded by earlier runs
+    :return: None if the file has been skipped
+    """
+    js_file, needs_analysis, patterns_to_seed, num_seeded_before = args
+    if _bug_quota is not None and _bug_quota.is_reached():
+        return None
+    try:
+        with TaskBudget(max_seconds=_task_limits.get('max_seconds_per_file', 0),
+                        max_rss_mb=_task_limits.get('max_memory_per_process', 0)):
+            return analyse_and_seed_bugs_to_a_js_file(js_file=js_file, needs_analysis=needs_analysis,
+                                                      patterns_to_seed=patterns_to_seed,
+                                                      num_seeded_before=num_seeded_before,
+                                                      reserve_bug=_bug_quota.reserve if _bug_quota else None,
+                                                      **_seeding_settings)
+    except TaskBudgetExceeded as e:
+        tqdm.write(f'Quarantined {js_file} because {e}')
+        if _task_limits.get('quarantine_path'):
+            append_to_manifest(_task_limits['quarantine_path'], {'file': js_file, 'stage': 'quarantined',
+                                                                 'hash': get_file_hash(js_file), 'reason': str(e)})
+        return 0
 
-def seed_bugs_to_a_file(file: str,
-                        bug_seeding_patterns: List,
+
+def analyse_and_seed_bugs_to_a_js_file(js_file: str,
+                                       analysed_file_store_dir: str,
+                                       needs_analysis: bool,
+                                       manifest_path: str,
+                                       bug_seeding_pattern_index: Dict[Tuple, List],
+                                       K_most_frequent_identifiers: List,
+                                       K_most_frequent_literals: List,
+                                       MAX_LOCATIONS_TO_TRY_TO_SEED_BUGS: int,
+                                       out_dir: str,
+                                       MAX_VARIANTS_PER_LOCATION: int = None,
+                                       output_format: str = 'files',
+                                       num_of_writer_threads: int = 4,
+                                       beautify: bool = False,
+                                       seeding_parameters: Dict = None,
+                                       parameters: str = '',
+                                       pattern_set: str = '',
+                                       pattern_sets_dir: str = '',
+                                       patterns_to_seed: str = '',
+                                       num_seeded_before: int = 0,
+                                       max_bugs_per_file: int = 0,
+                                       colliding_file_names: Collection[str] = (),
+                                       analysed_file: str = None,
+                                       reserve_bug: Callable[[], bool] = None) -> int:
+    """
+    Take a single JS file through all stages of bug seeding i.e., analyse it and then seed bugs to it. Each
+    finished stage is recorded in the manifest of the run along with the hash of the (formatted) JS file.
+    :param js_file: The JS file where bugs need to be seeded
+    :param analysed_file_store_dir: The directory of the store containing the static analysis results
+    :param needs_analysis: False if the file has already been analysed and added to the store in an earlier run
+    :param manifest_path: The manifest of the run
+    :param bug_seeding_pattern_index:
+    :param K_most_frequent_identifiers:
+    :param K_most_frequent_literals:
+    :param MAX_LOCATIONS_TO_TRY_TO_SEED_BUGS:
+    :param out_dir:
+    :param MAX_VARIANTS_PER_LOCATION:
+    :param output_format:
+    :param num_of_writer_threads:
+    :param beautify:
+    :param seeding_parameters: The parameters of SemSeed, see DEFAULT_SEEDING_PARAMETERS
+    :param parameters: The fingerprint of everything (apart from the patterns) deciding the bugs seeded to a file
+    :param pattern_set: The fingerprint of the set of all patterns of the run (see SeedingCache)
+    :param pattern_sets_dir: The directory containing the sets of patterns
+    :param patterns_to_seed: The fingerprint of the set of patterns to apply to the file, all patterns if empty
+    :param num_seeded_before: The number of locations seeded by earlier runs using other patterns
+    :param max_bugs_per_file: See seed_bugs_to_a_file
+    :param colliding_file_names: The names shared by several JS files of the run, see create_out_file_path
+    :param analysed_file: The path of the JSON file written by the static analysis. It is removed once its content
+                            has been added to the store. Its name is also used to name the files having seeded bugs.
+                            By default, see create_out_file_path
+    :param reserve_bug: See seed_bugs_to_a_file
+    :return: The count of bugs that could be seeded to the file, including those of earlier runs
+    """
+    analysed_file = analysed_file or create_out_file_path(analysed_file_store_dir, js_file, colliding_file_names)
+    if needs_analysis:
+        prepare_a_js_file_for_seeding_bug(target_js_file_path=js_file, out_json_file_path=analysed_file)
+    # The static analysis formats the JS file in place. Hence, the hash is computed after the analysis
+    content_hash = get_file_hash(js_file)
+    if needs_analysis:
+        target_js_file_analysed = fs.read_json_file(analysed_file)
+        # The task budget must not interrupt writing the store or the manifest
+        with checks_deferred():
+            if len(target_js_file_analysed) > 0:
+                get_analysed_file_store_writer(analysed_file_store_dir).append(
+                    key=js_file, content_hash=content_hash, analysed_file=target_js_file_analysed)
+            if fs.pathExists(analysed_file):
+                os.remove(analysed_file)
+            append_to_manifest(manifest_path, {'file': js_file, 'stage': 'analysed', 'hash': content_hash})
+    else:
+        target_js_file_analysed = get_analysed_file_store(analysed_file_store_dir).read_analysed_file(
+            key=js_file, content_hash=content_hash)
+
+    if patterns_to_seed and patterns_to_seed != pattern_set:
+        if patterns_to_seed not in _pattern_indices_of_sets:
+            _pattern_indices_of_sets[patterns_to_seed] = filter_pattern_index(
+                pattern_index=bug_seeding_pattern_index,
+                pattern_fingerprints=read_pattern_set(pattern_sets_dir, patterns_to_seed))
+        bug_seeding_pattern_index = _pattern_indices_of_sets[patterns_to_seed]
+
+    # Whether the quota of the run has stopped seeding the file before all its (location, pattern) pairs were tried
+    quota_reached = False
+
+    def reserve_bug_of_the_file() -> bool:
+        nonlocal quota_reached
+        quota_reached = not reserve_bug()
+        return not quota_reached
+
+    num_of_locations_that_could_be_mutated = seed_bugs_to_a_file(target_js_file_analysed, Path(analysed_file).name,
+                                                                 bug_seeding_pattern_index,
+                                                                 K_most_frequent_identifiers, K_most_frequent_literals,
+                                                                 MAX_LOCATIONS_TO_TRY_TO_SEED_BUGS, out_dir,
+                                                                 MAX_VARIANTS_PER_LOCATION, output_format,
+                                                                 num_of_writer_threads, beautify, js_file,
+                                                                 seeding_parameters, num_seeded_before,
+                                                                 max_bugs_per_file,
+                                                                 reserve_bug_of_the_file if reserve_bug else None)
+    record = {'file': js_file, 'stage': 'seeded', 'hash': content_hash,
+              'num_seeded': num_of_locations_that_could_be_mutated}
+    if quota_reached:
+        # The patterns have not been applied everywhere, hence a later run seeds the file again (see SeedingCache)
+        record['partial'] = True
+    elif pattern_set:
+        record.update({'parameters': parameters, 'pattern_set': patterns_to_seed or pattern_set})
+    with checks_deferred():
+        append_to_manifest(manifest_path, record)
+    return num_seeded_before + num_of_locations_that_could_be_mutated
+
+
+def get_seeding_candidates(locations: List[Dict], bug_seeding_pattern_index: Dict[Tuple, List]) -> Iterator[Tuple]:
+    """
+    The (location, pattern) pairs where the pattern may be applied ie. the 'fix' of the pattern is exactly the
+    abstracted tokens of the location
+    """
+    for target_location in locations:
+        for seeding_pattern in bug_seeding_pattern_index.get(tuple(target_location['abstractedTokens']), []):
+            yield target_location, seeding_pattern
+
+
+def seed_bugs_to_a_file(target_js_file_analysed: Dict,
+                        file_name: str,
+                        bug_seeding_pattern_index: Dict[Tuple, List],
                         K_most_frequent_identifiers: List,
                         K_most_frequent_literals: List,
                         MAX_LOCATIONS_TO_TRY_TO_SEED_BUGS: int,
-                        out_dir: str) -> int:
+                        out_dir: str,
+                        MAX_VARIANTS_PER_LOCATION: int = None,
+                        output_format: str = 'files',
+                        num_of_writer_threads: int = 4,
+                        beautify: bool = False,
+                        js_file: str = None,
+                        seeding_parameters: Dict = None,
+                        num_seeded_before: int = 0,
+                        max_bugs_per_file: int = 0,
+                        reserve_bug: Callable[[], bool] = None) -> int:
     """
-    Given a file seed bugs to it. The expected file is a JSON file rather than a JS file. It is expected
-    that the input JS file has been analysed before and a corresponding JSON file has been createdl
-    :param file: the corresponding JSON file of the JS file where bugs need to be seeded
-    :param bug_seeding_patterns:
+    Given a file seed bugs to it. It is expected that the JS file has been analysed before and the results
+    of the static analysis are given rather than the JS file
+    :param target_js_file_analysed: The static analysis results of the JS file where bugs need to be seeded
+    :param file_name: The name of the corresponding JSON file, the files having seeded bugs are named after it
+    :param bug_seeding_pattern_index: The bug seeding patterns indexed by their 'fix' abstract token sequence
     :param K_most_frequent_identifiers:
     :param K_most_frequent_literals:
     :param MAX_LOCATIONS_TO_TRY_TO_SEED_BUGS:
     :param out_dir: A path where the mutate code will be written
+    :param MAX_VARIANTS_PER_LOCATION: The maximum number of mutated sequences written for a (location, pattern)
+                                      pair. If None, all of them
+    :param output_format: Write one file per output ('files') or pack them into archives ('tar' or 'zip')
+    :param num_of_writer_threads: The threads beautifying and writing the outputs in the background
+    :param beautify: Beautify the complete code of every file having a seeded bug
+    :param js_file: The analysed JS file. By default, the 'file_path' given by the static analysis
+    :param seeding_parameters: The parameters of SemSeed, see DEFAULT_SEEDING_PARAMETERS
+    :param num_seeded_before: The locations are numbered after those seeded by earlier runs, hence the files
+                              written by earlier runs are kept
+    :param max_bugs_per_file: Stop once bugs have been seeded to these many locations, 0 for no limit
+    :param reserve_bug: Called before seeding bugs to a further location, seeding stops once it returns False
+                        (eg. BugQuota.reserve)
     :return: The count of bugs that could be seeded to the file
     """
     num_of_locations_that_could_be_mutated = 0
+    seeding_parameters = dict(DEFAULT_SEEDING_PARAMETERS, **(seeding_parameters or {}))
 
-    target_js_file_analysed = fs.read_json_file(file)
     if len(target_js_file_analysed) == 0:  # The static analysis could not finish properly
         return num_of_locations_that_could_be_mutated
     possible_bug_seeding_locations = target_js_file_analysed['nodes']
@@ -67,74 +299,96 @@ def seed_bugs_to_a_file(file: str,
         analysed_file=target_js_file_analysed,
         kind='literal',
         k_most_frequent=K_most_frequent_literals)
+    # Seeding a bug only replaces the code of the target location, the rest of the code remains as it is. If the
+    # JS file is not available (anymore), the code is created by joining all tokens and beautified
+    source_code = static_analysis_utils.read_source_code(js_file=js_file or target_js_file_analysed['file_path'],
+                                                         analysed_file=target_js_file_analysed)
+    if source_code is None:
+        # The ranges of the tokens are needed for every mutated sequence, they are parsed only once for the file
+        token_starts, token_ends = static_analysis_utils.get_token_ranges(analysed_file=target_js_file_analysed)
+    # The candidate tokens (and their embeddings) are created once for the file and shared across all patterns
+    candidate_context = CandidateContext(available_identifiers=identifiers_in_different_scopes,
+                                         available_literals=literals_in_different_scopes,
+                                         scope_of_selection=seeding_parameters['scope_of_selection'])
+
+    # The outputs are written (and beautified if needed) in the background while the seeding goes on
+    writer = get_seeded_bug_writer(out_dir=out_dir, output_format=output_format,
+                                   num_of_threads=num_of_writer_threads)
+
+    if max_bugs_per_file > 0:
+        # Rather than trying every pattern at every location, the (location, pattern) candidates are tried in a random
+        # order until enough bugs have been seeded. The seeded bugs are a uniform sample of all bugs that could be
+        # seeded to the file, hence the kinds of patterns keep their distribution
+        candidates = sample_in_random_order(
+            get_candidates=lambda: get_seeding_candidates(possible_bug_seeding_locations, bug_seeding_pattern_index),
+            reservoir_size=4 * max_bugs_per_file, seed=file_name)
+        num_of_candidates = None
+    else:
+        candidates = get_seeding_candidates(possible_bug_seeding_locations, bug_seeding_pattern_index)
+        num_of_candidates = sum(len(bug_seeding_pattern_index.get(tuple(target_location['abstractedTokens']), []))
+                                for target_location in possible_bug_seeding_locations)
 
-    file_name = Path(file).name
-    # Go through each seeding pattern available from the bug seeding patterns
-    for seeding_pattern in tqdm(bug_seeding_patterns, position=1, ncols=100, ascii=" #",
-                                desc='Trying to apply pattern',
-                                postfix={'file': file_name}):
-        # For each location in the file, try to seed a bug
-        for target_location in possible_bug_seeding_locations:
-            # ------------------------ SemSeed -----------------------------------------
-            bug_seeding = SemSeedBugs(bug_seeding_pattern=seeding_pattern,
-                                      target_location=target_location,
-                                      file_path=target_js_file_analysed['file_path'],
-                                      similarity_threshold=0.3,
-                                      K=1,
-                                      available_identifiers=identifiers_in_different_scopes,
-                                      available_literals=literals_in_different_scopes,
-                                      scope_of_selection='top_K')
-
-            # Check if the seeding pattern and the target locations match
-            if bug_seeding.is_matching_token_sequence():
-
-                # The mutated token sequences is only the 'mutated' target location token sequence
-                # We may get multiple sequences based on K. If K=2 and there is only one
-                # unbound token, we get 2 sequences
-                mutated_token_sequences = bug_seeding.apply_pattern()
-                if len(mutated_token_sequences) > 0:
+    # For each location in the file and each pattern that may match it, try to seed a bug
+    quota_reached = False
+    for target_location, seeding_pattern in tqdm(candidates, total=num_of_candidates, position=1, ncols=100,
+                                                 ascii=" #", desc='Trying to apply patterns',
+                                                 postfix={'file': file_name}):
+        if quota_reached or 0 < max_bugs_per_file <= num_of_locations_that_could_be_mutated:
+            break
+        # ------------------------ SemSeed -----------------------------------------
+        bug_seeding = SemSeedBugs(bug_seeding_pattern=seeding_pattern,
+                                  target_location=target_location,
+                                  file_path=target_js_file_analysed['file_path'],
+                                  similarity_threshold=seeding_parameters['similarity_threshold'],
+                                  K=seeding_parameters['K'],
+                                  available_identifiers=identifiers_in_different_scopes,
+                                  available_literals=literals_in_different_scopes,
+                                  scope_of_selection=seeding_parameters['scope_of_selection'],
+                                  candidate_context=candidate_context)
+
+        # Check if the seeding pattern and the target locations match
+        if bug_seeding.is_matching_token_sequence():
+
+            # The mutated token sequences is only the 'mutated' target location token sequence
+            # We may get multiple sequences based on K. If K=2 and there is only one
+            # unbound token, we get 2 sequences. They are generated lazily, one after the other
+            for ms, mutated_sequence in enumerate(bug_seeding.generate_variants(
+                    max_variants=MAX_VARIANTS_PER_LOCATION)):
+                if ms == 0:
+                    if reserve_bug is not None and not reserve_bug():
+                        quota_reached = True
+                        break
                     num_of_locations_that_could_be_mutated += 1
 
-                    for ms, mutated_sequence in enumerate(mutated_token_sequences):
-                        token_sequence_after_seeding_bug = bug_seeding.replace_target_with_mutated_token_sequence(
-                            token_list=target_js_file_analysed['tokenList'],
-                            token_range_list=target_js_file_analysed['tokenRangesList'],
-                            mutated_token_sequence=mutated_sequence)
-
-                        bug_seeding.bug_metadata['target_token_sequence-Buggy'] = mutated_sequence
-                        bug_seeding.bug_metadata['token_sequence_abstraction-Buggy'] = seeding_pattern['buggy']
-                        bug_seeding.bug_metadata['num_of_available_identifiers_to_choose_from'] = len(
-                            bug_seeding.identifiers_available_for_selecting_unbound_token)
-                        bug_seeding.bug_metadata['num_of_available_literals_to_choose_from'] = len(
-                            bug_seeding.literals_available_for_selecting_unbound_token)
-                        bug_seeding.bug_metadata['seeding_pattern_url'] = seeding_pattern['url']
-
-                        # Simply joining the token list with a space
-                        mutated_code = ' '.join(token_sequence_after_seeding_bug)
-
-                        # Write the output code & metadata about the bug seed
-                        out_file_name = file_name.replace('.json',
-                                                          f'_SEMSEED_MUTATED_{num_of_locations_that_could_be_mutated}.js')
-                        out_file_path = os.path.join(out_dir, out_file_name)
-                        if fs.pathExists(out_file_path):
-                            out_file_path = out_file_path.replace('.js',
-                                                                  f'_{str(random.randint(0, 10000))}_{["a", "b", "c", "d"][random.randint(0, 3)]}.js')
-                        try:
-                            # Remember, this does not check for Syntax Errors in the generated JS code. This needs to be
-                            # done separately
-                            mutated_code = jsbeautifier.beautify(mutated_code, {
-                                "indent_empty_lines": False,
-                                "break_chained_methods": False,
-                                "space_after_anon_function": False,
-                                "space_in_paren": False
-                            })
-                            fs.writeFile(data=mutated_code, file_path=out_file_path)
-                        except Exception as e:
-                            tqdm.write(f'ERROR: Could not seed bugs to {file_name} because {e}')
-                            bug_seeding.bug_metadata['error'] = str(e)
-                        finally:
-                            fs.writeJSONFile(data=bug_seeding.bug_metadata, file_path=out_file_path + 'on')
-                    else:
-                        pass
+                bug_seeding.bug_metadata['target_token_sequence-Buggy'] = mutated_sequence
+                bug_seeding.bug_metadata['token_sequence_abstraction-Buggy'] = seeding_pattern['buggy']
+                bug_seeding.bug_metadata['num_of_available_identifiers_to_choose_from'] = len(
+                    bug_seeding.identifiers_available_for_selecting_unbound_token)
+                bug_seeding.bug_metadata['num_of_available_literals_to_choose_from'] = len(
+                    bug_seeding.literals_available_for_selecting_unbound_token)
+                bug_seeding.bug_metadata['seeding_pattern_url'] = seeding_pattern['url']
+
+                if source_code is not None:
+                    mutated_code = bug_seeding.replace_target_in_source_code(
+                        source_code=source_code, mutated_token_sequence=mutated_sequence)
+                else:
+                    token_sequence_after_seeding_bug = bug_seeding.replace_target_with_mutated_token_sequence(
+                        token_list=target_js_file_analysed['tokenList'],
+                        token_starts=token_starts,
+                        token_ends=token_ends,
+                        mutated_token_sequence=mutated_sequence)
+                    # Simply joining the token list with a space
+                    mutated_code = ' '.join(token_sequence_after_seeding_bug)
+
+                # Write the output code & metadata about the bug seed
+                with checks_deferred():
+                    writer.write(file_name=get_seeded_file_name(analysed_file_name=file_name,
+                                                                location_number=num_seeded_before +
+                                                                                num_of_locations_that_could_be_mutated,
+                                                                variant_number=ms),
+                                 code=mutated_code, metadata=bug_seeding.bug_metadata,
+                                 beautify=beautify or source_code is None)
 
+    # All outputs of the file are on disk once the file is reported as seeded
+    writer.flush()
     return num_of_locations_that_could_be_mutated
@@ -0,0 +1,48 @@
+"""
+
+Created on 18-October-2026
+
+The modules of the bug seeding pipeline import each other relative to 'bug_seeding' (eg. 'utils.fileutils'), like
+they do when run_bug_seeding.py is run. Run the tests using 'python -m pytest bug_seeding/tests'
+"""
+import sys
+from pathlib import Path
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def make_analysed_file():
+    """
+    Create the static analysis results of a small JS file 'var <name> = <value>;', like the ones the static
+    analysis writes to JSON
+    """
+
+    def make(name: str = 'a', value: str = '1') -> dict:
+        tokens = ['var', name, '=', value, ';']
+        ranges, start = [], 0
+        for token in tokens:
+            ranges.append([start, start + len(token)])
+            start += len(token) + 1
+        name_range, value_range = f'{ranges[1][0]}-{ranges[1][1]}', f'{ranges[3][0]}-{ranges[3][1]}'
+        return {
+            'file_path': f'{name}.js',
+            'tokenList': tokens,
+            'tokenRangesList': [f'{s}-{e}' for s, e in ranges],
+            'nodes': [{
+                'tokens': [name, '=', value],
+                'abstractedTokens': ['Idf_1', '=', 'Lit_1'],
+                'range': [ranges[1][0], ranges[3][1]],
+                'type': 'VariableDeclarator',
+                'line': '1-1',
+                'belongs_to_function': None,
+                'belonging_function_range': '0-0'
+            }],
+            'range_to_identifier': {name_range: name},
+            'range_to_literal': {value_range: value},
+            'functions_to_identifiers': {'0-0': [name]},
+            'functions_to_literals': {'0-0': [value]}
+        }
+
+    return make
@@ -0,0 +1,116 @@
+"""
+
+Created on 18-October-2026
+
+"""
+import numpy as np
+import pytest
+import utils.analysed_file_store as analysed_file_store
+from utils.analysed_file_store import AnalysedFileStore, AnalysedFileStoreWriter
+
+
+def without_token_ranges(analysed_file: dict) -> dict:
+    analysed_file = dict(analysed_file)
+    analysed_file.pop('tokenRangesList', None)
+    analysed_file.pop('tokenRanges', None)
+    return analysed_file
+
+
+def test_round_trip(tmp_path, make_analysed_file):
+    writer = AnalysedFileStoreWriter(str(tmp_path))
+    files = {'a.js': make_analysed_file('a', '1'), 'b.js': make_analysed_file('b', 'null')}
+    for key, analysed_file in files.items():
+        writer.append(key=key, content_hash='h', analysed_file=analysed_file)
+
+    store = AnalysedFileStore(str(tmp_path))
+    assert len(store) == 2
+    for key, analysed_file in files.items():
+        read = store.read_analysed_file(key, 'h')
+        assert without_token_ranges(read) == without_token_ranges(analysed_file)
+        assert read['tokenRanges'].tolist() == [[int(i) for i in rng.split('-')]
+                                                for rng in analysed_file['tokenRangesList']]
+        assert store.get_num_of_nodes(key, 'h') == 1
+    assert store.read_analysed_file('a.js', 'other hash') == {}
+    assert store.get_identifiers_and_literals() == {'a', '1', 'b', 'null'}
+
+
+def test_tokens_that_are_not_strings_keep_their_type(tmp_path, make_analysed_file):
+    analysed_file = make_analysed_file()
+    analysed_file['nodes'][0]['type'] = None
+    writer = AnalysedFileStoreWriter(str(tmp_path))
+    writer.append(key='a.js', content_hash='h', analysed_file=analysed_file)
+    assert AnalysedFileStore(str(tmp_path)).read_analysed_file('a.js', 'h')['nodes'][0]['type'] is None
+
+
+def test_new_shard_once_the_shard_is_full(tmp_path, make_analysed_file):
+    writer = AnalysedFileStoreWriter(str(tmp_path), max_shard_size=1)
+    writer.append(key='a.js', content_hash='h', analysed_file=make_analysed_file('a'))
+    writer.append(key='b.js', content_hash='h', analysed_file=make_analysed_file('b'))
+    assert len(list(tmp_path.glob('*.index'))) == 2
+    store = AnalysedFileStore(str(tmp_path))
+    assert store.read_analysed_file('b.js', 'h')['tokenList'] == ['var', 'b', '=', '1', ';']
+
+
+@pytest.mark.parametrize('fail_at', ['bin', 'vocab', 'index'])
+def test_interrupted_append_is_rolled_back(tmp_path, make_analysed_file, monkeypatch, fail_at):
+    writer = AnalysedFileStoreWriter(str(tmp_path))
+    writer.append(key='a.js', content_hash='h', analysed_file=make_analysed_file('a', '1'))
+
+    class Interrupted(BaseException):
+        pass
+
+    # Fail after some bytes of the file have been written, like an interrupt in the middle of the append would
+    original_append = analysed_file_store._append_or_roll_back
+
+    def failing_append(path, write):
+        if not path.endswith('.' + fail_at):
+            return original_append(path, write)
+
+        def write_and_fail(f):
+            write(f)
+            raise Interrupted()
+
+        return original_append(path, write_and_fail)
+
+    monkeypatch.setattr(analysed_file_store, '_append_or_roll_back', failing_append)
+    with pytest.raises(Interrupted):
+        writer.append(key='b.js', content_hash='h', analysed_file=make_analysed_file('b', '"x"'))
+    monkeypatch.undo()
+
+    # The records appended later are read back correctly
+    writer.append(key='c.js', content_hash='h', analysed_file=make_analysed_file('c', '"x"'))
+    store = AnalysedFileStore(str(tmp_path))
+    assert not store.contains('b.js', 'h')
+    assert store.read_analysed_file('a.js', 'h')['tokenList'] == ['var', 'a', '=', '1', ';']
+    assert store.read_analysed_file('c.js', 'h')['tokenList'] == ['var', 'c', '=', '"x"', ';']
+    assert store.read_analysed_file('c.js', 'h')['range_to_literal'] == {'8-11': '"x"'}
+
+
+def test_arrays_are_aligned_views_of_the_shard(tmp_path, make_analysed_file):
+    writer = AnalysedFileStoreWriter(str(tmp_path))
+    writer.append(key='a.js', content_hash='h', analysed_file=make_analysed_file())
+    store = AnalysedFileStore(str(tmp_path))
+    arrays, vocabulary = store.get_arrays('a.js', 'h')
+    _, entry = store.records[('a.js', 'h')]
+    assert all(offset % analysed_file_store.ALIGNMENT == 0 for offset, _ in entry['arrays'].values())
+    assert not arrays['tokens'].flags.writeable
+    assert [vocabulary[i] for i in arrays['tokens'].tolist()] == ['var', 'a', '=', '1', ';']
+    assert arrays['node_ranges'].dtype == np.int32
+
+
+def test_fields_are_decoded_once_they_are_used(tmp_path, make_analysed_file):
+    analysed_file = make_analysed_file('a', '1')
+    writer = AnalysedFileStoreWriter(str(tmp_path))
+    writer.append(key='a.js', content_hash='h', analysed_file=analysed_file)
+    read = AnalysedFileStore(str(tmp_path)).read_analysed_file('a.js', 'h')
+
+    [node] = read['nodes']
+    assert node['abstractedTokens'] == ['Idf_1', '=', 'Lit_1']
+    assert node._values.keys() == {'abstractedTokens'}
+    assert 'tokenList' not in read._values
+    assert dict(node) == analysed_file['nodes'][0]
+    assert node.get('missing') is None
+    assert read['functions_to_identifiers']['0-0'] == ['a']
+    assert dict(read['functions_to_literals']) == {'0-0': ['1']}
+    with pytest.raises(KeyError):
+        read['functions_to_identifiers']['1-2']
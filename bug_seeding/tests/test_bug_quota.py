@@ -0,0 +1,118 @@
+"""
+
+Created on 18-October-2026
+
+"""
+import os
+import shutil
+from multiprocessing import Pool
+from pathlib import Path
+import pytest
+import utils.fileutils as fs
+from utils.bug_quota import BugQuota
+from utils.analysed_file_store import get_analysed_file_store_writer
+from utils.run_manifest import get_file_hash
+from utils.seeding_cache import SeedingCache
+from utils.seeded_bug_writer import close_seeded_bug_writers
+from utils.bug_seeding_pattern_utils import get_only_idf_lit_containing_patterns, create_pattern_index
+from bug_seeding_approaches.SemSeed.BugSeedingUtils import token_embedding
+import seed_bugs_to_a_file
+
+FIXTURES_DIR = os.path.join(Path(__file__).resolve().parent.parent, 'benchmarks', 'fixtures')
+
+_quota = None
+
+
+def init_worker(quota: BugQuota) -> None:
+    global _quota
+    _quota = quota
+
+
+def reserve_many(num_of_bugs: int) -> int:
+    return sum(_quota.reserve() for _ in range(num_of_bugs))
+
+
+def test_quota_is_shared_by_the_processes():
+    quota = BugQuota(max_bugs=250, num_seeded_before=10)
+    with Pool(processes=4, initializer=init_worker, initargs=(quota,)) as p:
+        reserved = p.map(reserve_many, [100] * 4)
+    assert sum(reserved) == 240
+    assert quota.num_seeded == 250
+    assert quota.is_reached()
+    assert not quota.reserve()
+
+
+@pytest.fixture(scope='module')
+def fixture_corpus():
+    assert token_embedding.load_matrix(matrix_path=os.path.join(FIXTURES_DIR, 'token_embedding_matrix.npy'),
+                                       vocabulary_path=os.path.join(FIXTURES_DIR, 'token_embedding_vocabulary.json'))
+    patterns = get_only_idf_lit_containing_patterns(
+        fs.read_json_file(os.path.join(FIXTURES_DIR, 'bug_seeding_patterns.json')))
+    yield {
+        'analysed_file': os.path.join(FIXTURES_DIR, 'analysed', 'synthetic_0.json'),
+        'bug_seeding_pattern_index': create_pattern_index(bug_seeding_patterns=patterns),
+        'K_most_frequent_identifiers': fs.read_json_file(os.path.join(FIXTURES_DIR, 'topK_identifiers.json')),
+        'K_most_frequent_literals': fs.read_json_file(os.path.join(FIXTURES_DIR, 'topK_literals.json'))
+    }
+    close_seeded_bug_writers()
+
+
+def seed(fixture_corpus, out_dir, **kwargs) -> int:
+    out_dir.mkdir()
+    return seed_bugs_to_a_file.seed_bugs_to_a_file(
+        fs.read_json_file(fixture_corpus['analysed_file']), 'synthetic_0.json',
+        fixture_corpus['bug_seeding_pattern_index'], fixture_corpus['K_most_frequent_identifiers'],
+        fixture_corpus['K_most_frequent_literals'], -1, str(out_dir), MAX_VARIANTS_PER_LOCATION=1,
+        num_of_writer_threads=0, **kwargs)
+
+
+def seeded_files(out_dir) -> list:
+    return sorted(path.name for path in Path(out_dir).glob('*.js'))
+
+
+def test_at_most_max_bugs_per_file_are_seeded(fixture_corpus, tmp_path):
+    num_of_bugs = seed(fixture_corpus, tmp_path / 'all')
+    assert num_of_bugs > 2
+    assert seed(fixture_corpus, tmp_path / 'two', max_bugs_per_file=2) == 2
+    assert seeded_files(tmp_path / 'two') == ['synthetic_0_SEMSEED_MUTATED_1.js', 'synthetic_0_SEMSEED_MUTATED_2.js']
+
+
+def test_seeding_stops_once_the_quota_is_reached(fixture_corpus, tmp_path):
+    quota = BugQuota(max_bugs=3, num_seeded_before=2)
+    assert seed(fixture_corpus, tmp_path / 'out', reserve_bug=quota.reserve) == 1
+    assert quota.is_reached()
+    assert seeded_files(tmp_path / 'out') == ['synthetic_0_SEMSEED_MUTATED_1.js']
+
+
+def test_rerun_seeds_the_bugs_left_out_by_the_quota(fixture_corpus, tmp_path):
+    js_file = str(tmp_path / 'synthetic_0.js')
+    shutil.copyfile(os.path.join(FIXTURES_DIR, 'js', 'synthetic_0.js'), js_file)
+    store_dir, manifest_path = str(tmp_path / 'store'), str(tmp_path / 'run_manifest.jsonl')
+    fs.create_dir_list_if_not_present([store_dir])
+    get_analysed_file_store_writer(store_dir).append(key=js_file, content_hash=get_file_hash(js_file),
+                                                     analysed_file=fs.read_json_file(fixture_corpus['analysed_file']))
+    num_of_bugs = seed(fixture_corpus, tmp_path / 'all')
+
+    def run(reserve_bug=None) -> int:
+        seeding_cache = SeedingCache(manifest_path=manifest_path, pattern_sets_dir=str(tmp_path / 'pattern_sets'))
+        pattern_set = seeding_cache.add_pattern_set(['p1'])
+        content_hash = get_file_hash(js_file)
+        if len(seeding_cache.get_patterns_to_seed(js_file, content_hash, 'parameters', ['p1'])) == 0:
+            return seeding_cache.get_num_seeded(js_file, content_hash, 'parameters')
+        return seed_bugs_to_a_file.analyse_and_seed_bugs_to_a_js_file(
+            js_file=js_file, analysed_file_store_dir=store_dir, needs_analysis=False, manifest_path=manifest_path,
+            bug_seeding_pattern_index=fixture_corpus['bug_seeding_pattern_index'],
+            K_most_frequent_identifiers=fixture_corpus['K_most_frequent_identifiers'],
+            K_most_frequent_literals=fixture_corpus['K_most_frequent_literals'], MAX_LOCATIONS_TO_TRY_TO_SEED_BUGS=-1,
+            out_dir=str(tmp_path / 'out'), MAX_VARIANTS_PER_LOCATION=1, num_of_writer_threads=0,
+            parameters='parameters', pattern_set=pattern_set, pattern_sets_dir=seeding_cache.pattern_sets_dir,
+            num_seeded_before=seeding_cache.get_num_seeded(js_file, content_hash, 'parameters'),
+            reserve_bug=reserve_bug)
+
+    (tmp_path / 'out').mkdir()
+    assert run(reserve_bug=BugQuota(max_bugs=1).reserve) == 1
+    # Seeded again without a limit, the bugs the quota has left out are seeded as well
+    assert run() == num_of_bugs
+    assert seeded_files(tmp_path / 'out') == seeded_files(tmp_path / 'all')
+    # Once all bugs are seeded, nothing is left to do
+    assert run() == num_of_bugs
@@ -0,0 +1,137 @@
+"""
+
+Created on 18-October-2026
+
+"""
+import json
+import re
+import pytest
+from utils.bug_seeding_pattern_utils import classify_pattern, select_patterns_of_category, label_patterns, \
+    find_wrong_operand_in_binary_op_patterns, get_pattern_labels_path, BUG_CATEGORIES
+
+
+def make_pattern(fix: str, buggy: str, token_type: str = 'BinaryExpression') -> dict:
+    return {'fix': fix.split(), 'buggy': buggy.split(), 'fix_tokenType': token_type, 'buggy_tokenType': token_type,
+            'url': 'https://github.com/x/y/commit/1'}
+
+
+def find_wrong_operand_using_regexes(bug_seeding_patterns):
+    # How find_wrong_operand_in_binary_op_patterns used to select the patterns
+    operators = ["==", "!=", "===", "!==", "<", "<=", ">", ">=", "<<", ">>", ">>>", "\\+", "-", "\\*", "/", "%", "\\|",
+                 "\\^", "&", "in", "instanceof"]
+    regexps = [re.compile('(Idf_[\\d]|Lit_[\\d])\\s(' + op + ')\\s(Idf_[\\d]|Lit_[\\d])') for op in operators]
+    selected = []
+    for pattern in bug_seeding_patterns:
+        fix, buggy = ' '.join(pattern['fix']), ' '.join(pattern['buggy'])
+        if pattern['fix_tokenType'] != 'BinaryExpression' or pattern['buggy_tokenType'] != 'BinaryExpression':
+            continue
+        matches = [(c, b) for r1 in regexps for c in r1.findall(fix) for r2 in regexps for b in r2.findall(buggy)]
+        if any(c[1] == b[1] and (c[0] != b[0]) != (c[2] != b[2]) for c, b in matches):
+            selected.append(pattern)
+    return selected
+
+
+CLASSIFIED_PATTERNS = [
+    # wrong_binary_operand
+    (make_pattern('Idf_1 * Idf_2', 'Idf_1 * Idf_3'), ['wrong_binary_operand']),
+    (make_pattern('Idf_1 < Lit_1', 'Idf_2 < Lit_1'), ['wrong_binary_operand']),
+    (make_pattern('Idf_1 . Idf_2 === Lit_1', 'Idf_1 . Idf_2 === Lit_2'), ['wrong_binary_operand']),
+    # wrong_binary_operator
+    (make_pattern('Idf_1 === Idf_2', 'Idf_1 !== Idf_2'), ['wrong_binary_operator']),
+    (make_pattern('Idf_1 + Lit_1', 'Idf_1 - Lit_1'), ['wrong_binary_operator']),
+    # swapped_binary_operands
+    (make_pattern('Idf_1 - Idf_2', 'Idf_2 - Idf_1'), ['swapped_binary_operands']),
+    (make_pattern('Idf_1 - Idf_1', 'Idf_1 - Idf_1'), []),
+    # wrong_assignment
+    (make_pattern('Idf_1 = Idf_2', 'Idf_1 = Idf_3', 'AssignmentExpression'), ['wrong_assignment']),
+    (make_pattern('Idf_1 = Idf_2 ( Lit_1 )', 'Idf_1 = Lit_2', 'VariableDeclarator'), ['wrong_assignment']),
+    (make_pattern('Idf_1 = Idf_2', 'Idf_3 = Idf_2', 'AssignmentExpression'), []),
+    (make_pattern('Idf_1 ( Idf_2 = Lit_1 )', 'Idf_1 ( Idf_2 = Lit_2 )', 'AssignmentExpression'), []),
+    # swapped_arguments
+    (make_pattern('Idf_1 ( Idf_2 , Idf_3 )', 'Idf_1 ( Idf_3 , Idf_2 )', 'CallExpression'), ['swapped_arguments']),
+    (make_pattern('Idf_1 . Idf_2 ( Lit_1 , Idf_3 , Idf_4 )', 'Idf_1 . Idf_2 ( Idf_4 , Idf_3 , Lit_1 )',
+                  'CallExpression'), ['swapped_arguments']),
+    (make_pattern('Idf_1 ( Idf_2 , Idf_3 )', 'Idf_4 ( Idf_3 , Idf_2 )', 'CallExpression'), []),
+    # missing_argument
+    (make_pattern('Idf_1 ( Idf_2 , Idf_3 )', 'Idf_1 ( Idf_2 )', 'CallExpression'), ['missing_argument']),
+    (make_pattern('Idf_1 ( Idf_2 )', 'Idf_1 ( )', 'CallExpression'), ['missing_argument']),
+    (make_pattern('Idf_1 ( Idf_2 ( Lit_1 , Lit_2 ) )', 'Idf_1 ( Idf_2 ( Lit_1 ) )', 'CallExpression'), []),
+    # Several categories or none
+    (make_pattern('Idf_1 + Idf_2', 'Idf_3 - Idf_2'), []),
+    (make_pattern('Idf_1 + Idf_2 - Idf_3', 'Idf_1 - Idf_2 - Idf_4'),
+     ['wrong_binary_operand', 'wrong_binary_operator']),
+    (make_pattern('Idf_1 * Idf_2', 'Idf_1 * Idf_3', 'CallExpression'), []),
+    (make_pattern('Idf_1 * Idf_2', 'Idf_1 * Idf_3 ( )', 'CallExpression'), []),
+]
+
+
+@pytest.mark.parametrize('pattern, categories', CLASSIFIED_PATTERNS)
+def test_classify_pattern(pattern, categories):
+    assert classify_pattern(pattern) == categories
+
+
+def test_every_category_is_covered():
+    covered = {category for _, categories in CLASSIFIED_PATTERNS for category in categories}
+    assert covered == set(BUG_CATEGORIES)
+
+
+# The wrong operand patterns selected the same way as by the regexes used before
+SELECTED_AS_BEFORE = [
+    make_pattern('Idf_1 * Idf_2', 'Idf_1 * Idf_3'),
+    make_pattern('Lit_1 in Idf_1', 'Lit_2 in Idf_1'),
+    make_pattern('Idf_1 instanceof Idf_2', 'Idf_1 instanceof Idf_3'),
+    make_pattern('Idf_1 . Idf_2 === Lit_1', 'Idf_1 . Idf_2 === Lit_2'),
+    make_pattern('Idf_1 * Idf_2', 'Idf_3 * Idf_4'),
+    make_pattern('Idf_1 === Idf_2', 'Idf_1 !== Idf_2'),
+    make_pattern('Idf_1 = Idf_2', 'Idf_1 = Idf_3', 'AssignmentExpression'),
+]
+
+# The wrong operand patterns whose selection has changed
+SELECTED_UNLIKE_BEFORE = [
+    # Multi-digit ids did not match the regexes, the classifier compares whole tokens
+    (make_pattern('Idf_12 + Idf_2', 'Idf_12 + Idf_3'), True),
+    (make_pattern('Idf_1 + Idf_12', 'Idf_1 + Idf_13'), True),
+    # The regexes compared only the first digit, 'Idf_1' and 'Idf_12' were the same operand
+    (make_pattern('Lit_1 + Idf_1', 'Lit_1 + Idf_12'), True),
+    (make_pattern('Lit_1 + Idf_12', 'Lit_2 + Idf_13'), False),
+    # findall did not match overlapping operations, the second operation of 'a + b + c' was never compared
+    (make_pattern('Idf_1 + Idf_2 + Idf_3', 'Idf_1 + Idf_2 + Idf_4'), True),
+]
+
+
+def test_same_selection_as_before():
+    assert find_wrong_operand_in_binary_op_patterns(SELECTED_AS_BEFORE) == \
+           find_wrong_operand_using_regexes(SELECTED_AS_BEFORE)
+
+
+@pytest.mark.parametrize('pattern, selected', SELECTED_UNLIKE_BEFORE)
+def test_changed_selection(pattern, selected):
+    assert (len(find_wrong_operand_in_binary_op_patterns([pattern])) == 1) == selected
+    assert (len(find_wrong_operand_using_regexes([pattern])) == 1) != selected
+
+
+def test_duplicate_patterns_are_selected_once():
+    patterns = [make_pattern('Idf_1 * Idf_2', 'Idf_1 * Idf_3'), make_pattern('Idf_1 * Idf_2', 'Idf_1 * Idf_3'),
+                make_pattern('Idf_1 * Idf_2', 'Idf_1 * Idf_4')]
+    assert select_patterns_of_category(patterns, 'wrong_binary_operand') == [patterns[0], patterns[2]]
+    with pytest.raises(ValueError):
+        select_patterns_of_category(patterns, 'off_by_one')
+
+
+def test_labels_are_cached_next_to_the_pattern_file(tmp_path):
+    pattern_file = tmp_path / 'patterns.json'
+    patterns = [make_pattern('Idf_1 * Idf_2', 'Idf_1 * Idf_3'), make_pattern('Idf_1 - Idf_2', 'Idf_2 - Idf_1')]
+    pattern_file.write_text(json.dumps(patterns))
+    assert [p['labels'] for p in label_patterns(str(pattern_file), json.loads(pattern_file.read_text()))] == \
+           [['wrong_binary_operand'], ['swapped_binary_operands']]
+
+    # The cached labels are used as long as the pattern file does not change
+    labels_path = get_pattern_labels_path(str(pattern_file))
+    cached = json.loads(open(labels_path).read())
+    cached['labels'][0] = ['missing_argument']
+    open(labels_path, 'w').write(json.dumps(cached))
+    assert label_patterns(str(pattern_file), json.loads(pattern_file.read_text()))[0]['labels'] == \
+           ['missing_argument']
+    pattern_file.write_text(json.dumps(patterns, indent=2))
+    assert label_patterns(str(pattern_file), json.loads(pattern_file.read_text()))[0]['labels'] == \
+           ['wrong_binary_operand']
@@ -0,0 +1,71 @@
+"""
+
+Created on 18-October-2026
+
+"""
+import json
+import os
+import utils.compiled_patterns as compiled_patterns
+from utils.compiled_patterns import load_patterns, is_compiled, prepare_patterns, split_patterns, \
+    get_compiled_patterns_dir
+
+FIXTURE = os.path.join(os.path.dirname(__file__), os.pardir, 'benchmarks', 'fixtures', 'bug_seeding_patterns.json')
+
+
+def make_pattern_file(tmp_path) -> str:
+    patterns = json.loads(open(FIXTURE).read())
+    # Fields that are not strings or that only some patterns have
+    for i, pattern in enumerate(patterns):
+        pattern['fix_line'] = i
+        if i % 3 == 0:
+            pattern['commit_hash'] = f'hash_{i}'
+    pattern_file = str(tmp_path / 'patterns.json')
+    open(pattern_file, 'w').write(json.dumps(patterns))
+    return pattern_file
+
+
+def test_same_patterns_as_the_pattern_file(tmp_path):
+    pattern_file = make_pattern_file(tmp_path)
+    expected = split_patterns(prepare_patterns(pattern_file))
+    assert load_patterns(pattern_file) == expected
+    assert is_compiled(pattern_file)
+    # Read from the compiled copy this time
+    assert load_patterns(pattern_file) == expected
+
+
+def test_equal_strings_are_the_same_object(tmp_path):
+    pattern_file = make_pattern_file(tmp_path)
+    load_patterns(pattern_file)
+    training_patterns, _ = load_patterns(pattern_file)
+    tokens = {}
+    for pattern in training_patterns:
+        for token in pattern['fix'] + pattern['buggy']:
+            assert tokens.setdefault(token, token) is token
+
+
+def test_compiled_again_once_the_pattern_file_changes(tmp_path):
+    pattern_file = make_pattern_file(tmp_path)
+    load_patterns(pattern_file)
+    patterns = json.loads(open(pattern_file).read())[:10]
+    open(pattern_file, 'w').write(json.dumps(patterns))
+    assert not is_compiled(pattern_file)
+    assert load_patterns(pattern_file) == split_patterns(prepare_patterns(pattern_file))
+    assert is_compiled(pattern_file)
+
+
+def test_copy_missing_its_meta_file_is_not_used(tmp_path):
+    pattern_file = make_pattern_file(tmp_path)
+    load_patterns(pattern_file)
+    os.remove(os.path.join(get_compiled_patterns_dir(pattern_file), 'meta.json'))
+    assert not is_compiled(pattern_file)
+
+
+def test_patterns_are_read_from_the_pattern_file_if_they_can_not_be_compiled(tmp_path, monkeypatch):
+    pattern_file = make_pattern_file(tmp_path)
+
+    def fail(pattern_file, compiled_dir):
+        raise OSError('No space left on device')
+
+    monkeypatch.setattr(compiled_patterns, 'compile_patterns', fail)
+    assert load_patterns(pattern_file) == split_patterns(prepare_patterns(pattern_file))
+    assert not is_compiled(pattern_file)
@@ -0,0 +1,51 @@
+import importlib.util
+import shutil
+from pathlib import Path
+import pytest
+import utils.node_worker as node_worker
+from utils.node_worker import NodeWorker
+
+pytestmark = pytest.mark.skipif(shutil.which('node') is None, reason='Node.js is not installed')
+
+FAKE_WORKER = '''
+const readline = require('readline');
+const lines = readline.createInterface({input: process.stdin, terminal: false});
+lines.on('line', line => {
+    const request = JSON.parse(line);
+    if (request.task === 'crash') process.exit(1);
+    if (request.task === 'hang') return;
+    process.stdout.write(JSON.stringify({id: request.id, error: null, result: request.args.value}) + '\\n');
+});
+'''
+
+
+@pytest.fixture
+def worker(tmp_path):
+    path = tmp_path / 'worker.js'
+    path.write_text(FAKE_WORKER)
+    worker = NodeWorker(path_to_worker=str(path), max_jobs_per_process=2)
+    yield worker
+    worker.close()
+
+
+def test_requests_are_answered_by_a_recycled_process(worker):
+    pids = set()
+    for value in range(5):
+        assert worker.run(task='echo', args={'value': value}) == {'id': value + 1, 'error': None, 'result': value}
+        pids.add(worker.process.pid)
+    assert len(pids) == 3
+
+
+def test_a_crashed_or_hanging_process_is_replaced(worker):
+    assert worker.run(task='crash', args={})['error'] == 'The Node.js process has crashed'
+    assert worker.run(task='hang', args={}, timeout=0.5)['error'] == 'Timed out after 0.5 seconds'
+    assert worker.run(task='echo', args={'value': 'é'})['result'] == 'é'
+
+
+def test_the_pattern_mining_pipeline_uses_the_same_module():
+    path = Path(node_worker.__file__).parent.parent / 'obtain_bug_seeding_patterns' / \
+        'extract_bug_seeding_patterns_from_repos' / 'utils' / 'node_worker.py'
+    spec = importlib.util.spec_from_file_location('mining_node_worker', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    assert Path(module.get_node_worker.__code__.co_filename).resolve() == Path(node_worker.__file__).resolve()
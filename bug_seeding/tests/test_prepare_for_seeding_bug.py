@@ -0,0 +1,24 @@
+import os
+from utils.prepare_for_seeding_bug import create_out_file_path, get_colliding_file_names
+from utils.seeded_bug_writer import get_seeded_file_name
+
+
+def test_names_are_kept_unless_they_collide():
+    js_files = ['data/a/index.js', 'data/b/index.js', 'data/a/util.js']
+    colliding_file_names = get_colliding_file_names(js_files)
+    assert colliding_file_names == {'index.js'}
+
+    util = create_out_file_path('out', 'data/a/util.js', colliding_file_names)
+    assert util == os.path.join('out', 'util.json')
+    assert get_seeded_file_name(os.path.basename(util), 3, 0) == 'util_SEMSEED_MUTATED_3.js'
+
+    index_a = create_out_file_path('out', 'data/a/index.js', colliding_file_names)
+    index_b = create_out_file_path('out', 'data/b/index.js', colliding_file_names)
+    assert index_a != index_b
+    assert os.path.basename(index_a).startswith('index_') and index_a.endswith('.json')
+    # The same file always gets the same name
+    assert index_a == create_out_file_path('out', 'data/a/index.js', colliding_file_names)
+
+
+def test_without_collisions_the_name_is_the_name_of_the_js_file():
+    assert create_out_file_path('out', 'data/a/index.js') == os.path.join('out', 'index.json')
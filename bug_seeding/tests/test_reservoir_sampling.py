@@ -0,0 +1,62 @@
+"""
+
+Created on 18-October-2026
+
+"""
+from collections import Counter
+import random
+import pytest
+from utils.reservoir_sampling import sample_in_random_order
+
+
+class Stream:
+    def __init__(self, candidates):
+        self.candidates = candidates
+        self.num_of_passes = 0
+
+    def __call__(self):
+        self.num_of_passes += 1
+        return iter(self.candidates)
+
+
+@pytest.mark.parametrize('reservoir_size', [1, 3, 10, 100])
+def test_every_candidate_is_yielded_once(reservoir_size):
+    stream = Stream(list(range(25)))
+    sampled = list(sample_in_random_order(get_candidates=stream, reservoir_size=reservoir_size, seed='x.json'))
+    assert sorted(sampled) == list(range(25))
+    assert sampled != list(range(25))
+    # One pass for every reservoir, the last one is not filled up
+    assert stream.num_of_passes == 25 // reservoir_size + 1
+
+
+def test_same_order_for_the_same_seed():
+    def sample(seed):
+        return list(sample_in_random_order(get_candidates=lambda: range(50), reservoir_size=7, seed=seed))
+
+    assert sample('a.json') == sample('a.json')
+    assert sample('a.json') != sample('b.json')
+
+
+def test_order_equals_sorting_by_the_random_keys():
+    # The candidates come out exactly as if all keys had been drawn at once and sorted
+    rng = random.Random(3)
+    keys = [rng.random() for _ in range(40)]
+    expected = sorted(range(40), key=lambda i: keys[i])
+    assert list(sample_in_random_order(get_candidates=lambda: range(40), reservoir_size=6, seed=3)) == expected
+
+
+def test_empty_stream():
+    assert list(sample_in_random_order(get_candidates=lambda: [], reservoir_size=4, seed=0)) == []
+
+
+def test_first_candidates_are_a_uniform_sample():
+    # Take the first 3 of 10 candidates using 4000 seeds. Each candidate should be taken 1200 times
+    num_of_candidates, sample_size, num_of_seeds = 10, 3, 4000
+    counts = Counter()
+    for seed in range(num_of_seeds):
+        sampled = sample_in_random_order(get_candidates=lambda: range(num_of_candidates), reservoir_size=2, seed=seed)
+        counts.update(next(sampled) for _ in range(sample_size))
+    expected = num_of_seeds * sample_size / num_of_candidates
+    chi_square = sum((counts[i] - expected) ** 2 / expected for i in range(num_of_candidates))
+    # The critical value of the chi-square distribution having 9 degrees of freedom at p = 0.001
+    assert chi_square < 27.88
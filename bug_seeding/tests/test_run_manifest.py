@@ -0,0 +1,65 @@
+"""
+
+Created on 18-October-2026
+
+"""
+import hashlib
+from multiprocessing import Pool
+from utils.run_manifest import RunManifest, append_to_manifest, get_file_hash
+
+
+def test_round_trip(tmp_path):
+    manifest_path = str(tmp_path / 'manifest.jsonl')
+    manifest = RunManifest(manifest_path)
+    assert not manifest.is_done('a.js', 'analysed', 'h1')
+    manifest.record('a.js', 'analysed', 'h1')
+    manifest.record('a.js', 'seeded', 'h1', num_seeded=3)
+    assert manifest.is_done('a.js', 'analysed', 'h1')
+
+    manifest = RunManifest(manifest_path)
+    assert manifest.is_done('a.js', 'analysed', 'h1')
+    assert not manifest.is_done('a.js', 'analysed', 'h2')
+    assert not manifest.is_done('b.js', 'analysed', 'h1')
+    assert manifest.get_record('a.js', 'seeded') == {'file': 'a.js', 'stage': 'seeded', 'hash': 'h1', 'num_seeded': 3}
+    assert manifest.get_record('b.js', 'seeded') == {}
+
+
+def test_latest_record_wins(tmp_path):
+    manifest_path = str(tmp_path / 'manifest.jsonl')
+    append_to_manifest(manifest_path, {'file': 'a.js', 'stage': 'analysed', 'hash': 'h1'})
+    append_to_manifest(manifest_path, {'file': 'a.js', 'stage': 'analysed', 'hash': 'h2'})
+    manifest = RunManifest(manifest_path)
+    assert manifest.is_done('a.js', 'analysed', 'h2')
+    assert not manifest.is_done('a.js', 'analysed', 'h1')
+
+
+def test_incomplete_last_line_is_ignored(tmp_path):
+    manifest_path = tmp_path / 'manifest.jsonl'
+    append_to_manifest(str(manifest_path), {'file': 'a.js', 'stage': 'analysed', 'hash': 'h1'})
+    with open(manifest_path, 'a') as f:
+        f.write('{"file": "b.js", "stage": "anal')
+    manifest = RunManifest(str(manifest_path))
+    assert manifest.is_done('a.js', 'analysed', 'h1')
+    assert not manifest.get_record('b.js', 'analysed')
+    # The next record is not glued onto the incomplete line
+    append_to_manifest(str(manifest_path), {'file': 'c.js', 'stage': 'seeded', 'hash': 'h1'})
+    assert RunManifest(str(manifest_path)).is_done('c.js', 'seeded', 'h1')
+
+
+def append_records(arguments) -> None:
+    manifest_path, process = arguments
+    for i in range(200):
+        append_to_manifest(manifest_path, {'file': f'{process}_{i}.js', 'stage': 'seeded', 'hash': 'x' * 40})
+
+
+def test_many_processes_append_to_the_same_manifest(tmp_path):
+    manifest_path = str(tmp_path / 'manifest.jsonl')
+    with Pool(processes=4) as p:
+        p.map(append_records, [(manifest_path, process) for process in range(4)])
+    assert len(RunManifest(manifest_path).completed_stages) == 800
+
+
+def test_file_hash(tmp_path):
+    js_file = tmp_path / 'a.js'
+    js_file.write_bytes(b'var a = 1;\r\n')
+    assert get_file_hash(str(js_file)) == hashlib.sha1(b'var a = 1;\r\n').hexdigest()
@@ -0,0 +1,55 @@
+"""
+
+Created on 18-October-2026
+
+"""
+import os
+import stat
+import tarfile
+import pytest
+from utils.seeded_bug_writer import SeededBugWriter, get_seeded_file_name
+
+
+def test_file_names():
+    assert get_seeded_file_name('x.json', 3, 0) == 'x_SEMSEED_MUTATED_3.js'
+    assert get_seeded_file_name('x.json', 3, 1) == 'x_SEMSEED_MUTATED_3_1.js'
+
+
+@pytest.mark.parametrize('output_format', ['files', 'tar'])
+def test_outputs_are_written(tmp_path, output_format):
+    writer = SeededBugWriter(out_dir=str(tmp_path), output_format=output_format, num_of_threads=2)
+    for i in range(10):
+        writer.write(file_name=f'x_{i}.js', code=f'var a = {i};', metadata={'i': i}, beautify=False)
+    writer.close()
+    assert writer.num_of_files_written == 20
+    if output_format == 'tar':
+        [archive] = os.listdir(tmp_path)
+        with tarfile.open(str(tmp_path / archive)) as f:
+            assert len(f.getnames()) == 20
+    else:
+        assert (tmp_path / 'x_3.js').read_text() == 'var a = 3;'
+
+
+def test_a_file_that_can_not_be_written_does_not_stop_the_others(tmp_path, capsys):
+    writer = SeededBugWriter(out_dir=str(tmp_path), num_of_threads=2)
+    writer.write(file_name='x' * 300 + '.js', code='var a;', metadata={}, beautify=False)
+    writer.write(file_name='y.js', code='var b;', metadata={}, beautify=False)
+    writer.close()
+    assert sorted(os.listdir(tmp_path)) == ['y.js', 'y.json']
+    assert 'Could not write' in capsys.readouterr().out
+
+
+@pytest.mark.skipif(hasattr(os, 'geteuid') and os.geteuid() == 0, reason='root may write to read-only directories')
+def test_read_only_directory(tmp_path, capsys):
+    out_dir = tmp_path / 'out'
+    out_dir.mkdir()
+    out_dir.chmod(stat.S_IRUSR | stat.S_IXUSR)
+    try:
+        writer = SeededBugWriter(out_dir=str(out_dir), num_of_threads=2)
+        for i in range(10):
+            writer.write(file_name=f'x_{i}.js', code='var a;', metadata={}, beautify=False)
+        writer.close()
+    finally:
+        out_dir.chmod(stat.S_IRWXU)
+    assert writer.num_of_files_written == 0
+    assert capsys.readouterr().out.count('Could not write') == 10
@@ -0,0 +1,51 @@
+"""
+
+Created on 18-October-2026
+
+"""
+from utils.run_manifest import append_to_manifest
+from utils.seeding_cache import SeedingCache, get_fingerprint, read_pattern_set
+
+
+def seeded(manifest_path: str, file: str, pattern_set: str, num_seeded: int, content_hash: str = 'h1',
+           parameters: str = 'p1') -> None:
+    append_to_manifest(manifest_path, {'file': file, 'stage': 'seeded', 'hash': content_hash,
+                                       'num_seeded': num_seeded, 'parameters': parameters,
+                                       'pattern_set': pattern_set})
+
+
+def test_fingerprint_does_not_depend_on_the_order_of_keys():
+    assert get_fingerprint({'a': 1, 'b': [1, 2]}) == get_fingerprint({'b': [1, 2], 'a': 1})
+    assert get_fingerprint({'a': 1}) != get_fingerprint({'a': 2})
+
+
+def test_pattern_sets_are_written_once(tmp_path):
+    cache = SeedingCache(str(tmp_path / 'manifest.jsonl'), str(tmp_path / 'pattern_sets'))
+    fingerprint = cache.add_pattern_set(['p2', 'p1', 'p2'])
+    assert fingerprint == cache.add_pattern_set(['p1', 'p2'])
+    assert len(list((tmp_path / 'pattern_sets').iterdir())) == 1
+    assert read_pattern_set(str(tmp_path / 'pattern_sets'), fingerprint) == {'p1', 'p2'}
+
+
+def test_only_the_new_patterns_are_seeded(tmp_path):
+    manifest_path, pattern_sets_dir = str(tmp_path / 'manifest.jsonl'), str(tmp_path / 'pattern_sets')
+    cache = SeedingCache(manifest_path, pattern_sets_dir)
+    first_run = cache.add_pattern_set(['p1', 'p2'])
+    second_run = cache.add_pattern_set(['p3'])
+    seeded(manifest_path, 'a.js', first_run, num_seeded=4)
+    seeded(manifest_path, 'a.js', second_run, num_seeded=1)
+    # Another content or other parameters have not been seeded yet
+    seeded(manifest_path, 'b.js', first_run, num_seeded=2, content_hash='old')
+    seeded(manifest_path, 'c.js', first_run, num_seeded=2, parameters='p2')
+    # Records of earlier versions do not say which patterns have been used
+    append_to_manifest(manifest_path, {'file': 'd.js', 'stage': 'seeded', 'hash': 'h1', 'num_seeded': 3})
+    append_to_manifest(manifest_path, {'file': 'a.js', 'stage': 'analysed', 'hash': 'h1'})
+
+    cache = SeedingCache(manifest_path, pattern_sets_dir)
+    all_patterns = ['p1', 'p2', 'p3', 'p4']
+    assert cache.get_seeded_patterns('a.js', 'h1', 'p1') == {'p1', 'p2', 'p3'}
+    assert cache.get_patterns_to_seed('a.js', 'h1', 'p1', all_patterns) == ['p4']
+    assert cache.get_num_seeded('a.js', 'h1', 'p1') == 5
+    for file in ['b.js', 'c.js', 'd.js']:
+        assert cache.get_patterns_to_seed(file, 'h1', 'p1', all_patterns) == all_patterns
+        assert cache.get_num_seeded(file, 'h1', 'p1') == 0
@@ -0,0 +1,55 @@
+"""
+
+Created on 18-October-2026
+
+"""
+import numpy as np
+import pytest
+from utils.static_analysis_utils import get_code_in_range, splice_source_code, read_source_code, get_token_ranges
+
+
+def utf16_range(source_code: str, code: str) -> tuple:
+    """
+    The range of the code like the static analysis gives it, counting UTF-16 code units
+    """
+    start = len(source_code[:source_code.index(code)].encode('utf-16-le')) // 2
+    return start, start + len(code.encode('utf-16-le')) // 2
+
+
+@pytest.mark.parametrize('source_code', [
+    'var a = b + c;\nvar d = a * 2;\n',
+    # Characters of the Basic Multilingual Plane are one code unit, like in Python
+    "var café = 'crème';\nvar d = a * 2;\n",
+    # Characters outside of it (eg. emoji) are two code units but a single character of a Python string
+    "var s = '😀😀';\nvar d = a * 2; // 𝒳\n",
+    'var s = "😀";\r\nvar d = a * 2;\r\n',
+])
+def test_splice_at_the_ranges_of_the_static_analysis(source_code):
+    start, end = utf16_range(source_code, 'a * 2')
+    assert get_code_in_range(source_code, start, end) == 'a * 2'
+    assert splice_source_code(source_code, start, end, 'a / 2') == source_code.replace('a * 2', 'a / 2')
+
+
+def test_splice_at_the_start_and_the_end():
+    source_code = '😀 x 😀'
+    assert splice_source_code(source_code, 0, 2, 'y') == 'y x 😀'
+    assert splice_source_code(source_code, 5, 7, '') == '😀 x '
+    assert splice_source_code(source_code, 3, 3, 'z') == '😀 zx 😀'
+
+
+def test_read_source_code_keeps_the_newlines(tmp_path):
+    js_file = tmp_path / 'a.js'
+    source_code = "var s = '😀';\r\nvar d = a * 2;\r\n"
+    js_file.write_bytes(source_code.encode('utf-8'))
+    start, end = utf16_range(source_code, 'd')
+    assert read_source_code(str(js_file), {'range_to_identifier': {f'{start}-{end}': 'd'}}) == source_code
+    # The file has changed since it has been analysed
+    assert read_source_code(str(js_file), {'range_to_identifier': {f'{start + 1}-{end + 1}': 'd'}}) is None
+    assert read_source_code(str(tmp_path / 'missing.js'), {}) is None
+
+
+def test_token_ranges():
+    starts, ends = get_token_ranges({'tokenRangesList': ['0-3', '4-5']})
+    assert starts.tolist() == [0, 4] and ends.tolist() == [3, 5]
+    starts, ends = get_token_ranges({'tokenRanges': np.array([[0, 3], [4, 5]], dtype=np.int32)})
+    assert starts.tolist() == [0, 4] and ends.tolist() == [3, 5]
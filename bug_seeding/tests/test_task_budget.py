@@ -0,0 +1,119 @@
+"""
+
+Created on 18-October-2026
+
+"""
+import json
+import threading
+import time
+import pytest
+import seed_bugs_to_a_file
+import utils.analysed_file_store as analysed_file_store
+from utils.analysed_file_store import AnalysedFileStore
+from utils.run_manifest import RunManifest, get_file_hash
+from utils.task_budget import TaskBudget, TaskBudgetExceeded, checks_deferred
+
+
+def busy_wait(seconds: float) -> None:
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        pass
+
+
+def test_task_exceeding_the_time_limit_is_stopped():
+    start = time.monotonic()
+    with pytest.raises(TaskBudgetExceeded):
+        with TaskBudget(max_seconds=0.05, check_interval=0.01):
+            busy_wait(5)
+    assert time.monotonic() - start < 1
+
+
+def test_no_limits_are_enforced_by_default():
+    with TaskBudget():
+        busy_wait(0.05)
+
+
+def test_deferred_checks_raise_once_the_block_has_finished():
+    finished = []
+    with pytest.raises(TaskBudgetExceeded):
+        with TaskBudget(max_seconds=0.05, check_interval=0.01):
+            with checks_deferred():
+                busy_wait(0.2)
+                finished.append(True)
+            finished.append(False)
+    assert finished == [True]
+
+
+def test_deferred_checks_while_other_threads_run():
+    # The signal may be delivered to any thread of the process, eg. one writing the seeded files
+    done = threading.Event()
+    thread = threading.Thread(target=done.wait)
+    thread.start()
+    finished = []
+    try:
+        with pytest.raises(TaskBudgetExceeded):
+            with TaskBudget(max_seconds=0.05, check_interval=0.01):
+                with checks_deferred():
+                    busy_wait(0.2)
+                    finished.append(True)
+                finished.append(False)
+    finally:
+        done.set()
+        thread.join()
+    assert finished == [True]
+
+
+def test_file_running_out_of_time_while_persisting_leaves_store_and_manifest_readable(tmp_path, monkeypatch,
+                                                                                      make_analysed_file):
+    store_dir, out_dir = tmp_path / 'store', tmp_path / 'out'
+    store_dir.mkdir()
+    out_dir.mkdir()
+    manifest_path, quarantine_path = str(tmp_path / 'manifest.jsonl'), str(tmp_path / 'quarantine.jsonl')
+    js_files = []
+    for name in ['a', 'b']:
+        js_file = tmp_path / f'{name}.js'
+        js_file.write_text(f'var {name} = 1;')
+        js_files.append(str(js_file))
+
+    def analyse(target_js_file_path, out_json_file_path):
+        with open(out_json_file_path, 'w') as f:
+            json.dump(make_analysed_file(name=target_js_file_path[-4]), f)
+
+    # Appending to the store takes longer than the whole budget of the file
+    original_append = analysed_file_store._append_or_roll_back
+
+    def slow_append(path, write):
+        def write_slowly(f):
+            result = write(f)
+            busy_wait(0.1)
+            return result
+
+        return original_append(path, write_slowly)
+
+    monkeypatch.setattr(seed_bugs_to_a_file, 'prepare_a_js_file_for_seeding_bug', analyse)
+    monkeypatch.setattr(analysed_file_store, '_append_or_roll_back', slow_append)
+    seed_bugs_to_a_file.set_seeding_settings(
+        seeding_settings={'analysed_file_store_dir': str(store_dir), 'manifest_path': manifest_path,
+                          'bug_seeding_pattern_index': {}, 'K_most_frequent_identifiers': [],
+                          'K_most_frequent_literals': [], 'MAX_LOCATIONS_TO_TRY_TO_SEED_BUGS': -1,
+                          'out_dir': str(out_dir)},
+        task_limits={'max_seconds_per_file': 0.05, 'quarantine_path': quarantine_path})
+    try:
+        assert seed_bugs_to_a_file.analyse_and_seed_bugs_to_a_js_file_multiprocessing(
+            (js_files[0], True, '', 0)) == 0
+        monkeypatch.setattr(analysed_file_store, '_append_or_roll_back', original_append)
+        assert seed_bugs_to_a_file.analyse_and_seed_bugs_to_a_js_file_multiprocessing(
+            (js_files[1], True, '', 0)) == 0
+    finally:
+        seed_bugs_to_a_file.set_seeding_settings(seeding_settings={})
+
+    # The quarantined file has been analysed completely, but not seeded
+    manifest = RunManifest(manifest_path)
+    assert manifest.is_done(js_files[0], 'analysed', get_file_hash(js_files[0]))
+    assert not manifest.get_record(js_files[0], 'seeded')
+    assert manifest.is_done(js_files[1], 'seeded', get_file_hash(js_files[1]))
+    assert RunManifest(quarantine_path).is_done(js_files[0], 'quarantined', get_file_hash(js_files[0]))
+
+    store = AnalysedFileStore(str(store_dir))
+    for js_file, name in zip(js_files, ['a', 'b']):
+        assert store.read_analysed_file(js_file, get_file_hash(js_file))['tokenList'] == ['var', name, '=', '1', ';']
@@ -0,0 +1,57 @@
+"""
+
+Created on 18-October-2026
+
+"""
+import os
+import pytest
+from utils.task_scheduler import estimate_costs, create_batches, run_batch, WorkerUtilisation
+
+
+def test_known_costs_are_kept_and_the_others_scaled():
+    # The known tasks cost 2 per byte
+    assert estimate_costs(sizes=[10, 20, 5], known_costs={0: 20, 1: 40}) == [20, 40, 10]
+    assert estimate_costs(sizes=[10, 20]) == [10, 20]
+    assert estimate_costs(sizes=[0, 7], known_costs={0: 3}) == [3, 7]
+
+
+def test_batches_are_ordered_by_cost():
+    tasks = ['tiny_1', 'huge', 'tiny_2', 'medium', 'tiny_3']
+    costs = [1, 100, 1, 30, 1]
+    batches = create_batches(tasks=tasks, costs=costs, num_of_processes=2, batches_per_process=2)
+    # Target cost of a batch: 133 / 4
+    assert batches == [['huge'], ['medium', 'tiny_1', 'tiny_2', 'tiny_3']]
+
+
+@pytest.mark.parametrize('num_of_tasks', [0, 1, 7, 100])
+def test_every_task_is_in_one_batch(num_of_tasks):
+    tasks = list(range(num_of_tasks))
+    costs = [(i * 37) % 11 + 1 for i in tasks]
+    batches = create_batches(tasks=tasks, costs=costs, num_of_processes=3)
+    assert sorted(task for batch in batches for task in batch) == tasks
+    batch_costs = [sum(costs[task] for task in batch) for batch in batches]
+    assert batch_costs == sorted(batch_costs, reverse=True)
+
+
+def test_tasks_without_cost():
+    assert create_batches(tasks=['a', 'b'], costs=[0, 0], num_of_processes=4) == [['a'], ['b']]
+
+
+def test_run_batch():
+    pid, busy_time, results = run_batch((abs, [-1, 2, -3]))
+    assert pid == os.getpid()
+    assert busy_time >= 0
+    assert results == [1, 2, 3]
+
+
+def test_utilisation_report():
+    utilisation = WorkerUtilisation()
+    utilisation.add(pid=2, busy_time=0.5, num_of_tasks=3)
+    utilisation.add(pid=2, busy_time=0.25, num_of_tasks=1)
+    utilisation.add(pid=1, busy_time=0.0, num_of_tasks=0)
+    report = utilisation.get_report()
+    assert list(report['workers'].keys()) == ['1', '2']
+    assert report['workers']['2']['tasks'] == 4
+    assert report['workers']['2']['busy_s'] == 0.75
+    assert 'process        2:      4 tasks' in str(utilisation)
+    assert WorkerUtilisation().get_report()['mean_utilisation'] == 0.0
@@ -0,0 +1,36 @@
+"""
+
+Created on 18-October-2026
+
+"""
+import os
+from pathlib import Path
+import numpy as np
+from bug_seeding_approaches.SemSeed.TokenEmbedding import TokenEmbedding, normalize_rows
+
+FIXTURES_DIR = os.path.join(Path(__file__).resolve().parent.parent, 'benchmarks', 'fixtures')
+
+
+def make_token_embedding() -> TokenEmbedding:
+    return TokenEmbedding(fasttext_model_path='missing.bin',
+                          matrix_path=os.path.join(FIXTURES_DIR, 'token_embedding_matrix.npy'),
+                          vocabulary_path=os.path.join(FIXTURES_DIR, 'token_embedding_vocabulary.json'))
+
+
+def test_missing_tokens():
+    token_embedding = make_token_embedding()
+    assert token_embedding.get_missing_tokens(['0', "'a'", 'not_exported']) == {'not_exported'}
+    assert token_embedding.get_missing_tokens([]) == set()
+    assert TokenEmbedding(fasttext_model_path='missing.bin').get_missing_tokens(['0']) == {'0'}
+
+
+def test_vectors_of_exported_tokens_come_from_the_matrix():
+    token_embedding = make_token_embedding()
+    vectors = token_embedding.get_vectors(['0', "'a'"])
+    assert np.array_equal(vectors[0], token_embedding['0'])
+    assert np.array_equal(vectors[1], token_embedding["'a'"])
+    assert np.allclose(np.linalg.norm(token_embedding.get_normalized_vectors(['0', "'a'"]), axis=1), 1)
+
+
+def test_rows_of_zero_length_are_kept():
+    assert np.array_equal(normalize_rows(np.zeros((2, 3), dtype=np.float32)), np.zeros((2, 3)))
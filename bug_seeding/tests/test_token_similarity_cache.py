@@ -0,0 +1,102 @@
+import os
+import multiprocessing
+from bug_seeding_approaches.SemSeed.TokenSimilarityCache import TokenSimilarityCache, get_shard_path, merge_shards
+import utils.fileutils as fs
+
+
+def distance(label1, label2):
+    return abs(len(label1) - len(label2)) / 10
+
+
+def test_symmetric_pairs_share_an_entry():
+    cache = TokenSimilarityCache(max_size=10)
+    assert cache.get_or_compute('a', 'bb', distance) == 0.1
+    assert cache.get_or_compute('bb', 'a', lambda *_: 1 / 0) == 0.1
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_least_recently_used_pair_is_evicted():
+    cache = TokenSimilarityCache(max_size=2)
+    cache.get_or_compute('a', 'b', distance)
+    cache.get_or_compute('a', 'c', distance)
+    cache.get_or_compute('a', 'b', distance)
+    cache.get_or_compute('a', 'd', distance)
+    assert len(cache) == 2
+    assert cache.get_or_compute('a', 'b', lambda *_: 5.0) == 0.0
+    assert cache.get_or_compute('a', 'c', lambda *_: 5.0) == 5.0
+
+
+def test_save_and_load_round_trip(tmp_path):
+    cache = TokenSimilarityCache()
+    cache.get_or_compute('x', 'yyy', distance)
+    cache.get_or_compute('é', '"str"', distance)
+    cache.save(str(tmp_path / 'cache.json'))
+    loaded = TokenSimilarityCache()
+    assert loaded.load(str(tmp_path / 'cache.json'))['misses'] == 2
+    assert loaded.get_or_compute('yyy', 'x', lambda *_: 1 / 0) == 0.2
+    assert loaded.get_or_compute('"str"', 'é', lambda *_: 1 / 0) == 0.4
+    assert TokenSimilarityCache().load(str(tmp_path / 'missing.json')) == {}
+
+
+def test_shard_holds_only_the_pairs_computed_after_tracking(tmp_path):
+    cache = TokenSimilarityCache()
+    for i in range(100):
+        cache.get_or_compute('a', 'b' * i, distance)
+    cache.track_added_pairs()
+    cache.get_or_compute('a', 'b', distance)  # Inherited, hence not saved again
+    cache.get_or_compute('new', 'pair', distance)
+    cache.save(str(tmp_path / 'shard'), only_added=True)
+    saved = fs.read_json_file(str(tmp_path / 'shard'))
+    assert saved['similarities'] == [['new', 'pair', 0.1]]
+    assert saved['stats']['hits'] == 1 and saved['stats']['misses'] == 1
+
+
+def test_evicted_pairs_are_no_longer_tracked():
+    cache = TokenSimilarityCache(max_size=10)
+    cache.track_added_pairs()
+    for i in range(1000):
+        cache.get_or_compute('a', 'b' * i, distance)
+    assert len(cache._added) == 10
+    assert set(cache._added) == set(cache._cache.keys())
+
+
+# Inherited by the forked processes, like the cache of BugSeedingUtils is inherited by the processes of a Pool
+_parent_cache = TokenSimilarityCache()
+
+
+def _compute_in_child(cache_path, label):
+    _parent_cache.track_added_pairs()
+    _parent_cache.get_or_compute('child', label, distance)
+    _parent_cache.save(get_shard_path(cache_path), only_added=True)
+
+
+def test_merging_shards_adds_the_pairs_of_every_process(tmp_path):
+    cache_path = str(tmp_path / 'cache.json')
+    for i in range(50):
+        _parent_cache.get_or_compute('p', 'q' * i, distance)
+    context = multiprocessing.get_context('fork')
+    for label in ('one', 'three'):
+        process = context.Process(target=_compute_in_child, args=(cache_path, label))
+        process.start()
+        process.join()
+    shards = [name for name in os.listdir(tmp_path) if name.startswith('cache.json.')]
+    assert len(shards) == 2
+    assert all(len(fs.read_json_file(str(tmp_path / name))['similarities']) == 1 for name in shards)
+    total = merge_shards(cache=_parent_cache, file_path=cache_path)
+    assert total['misses'] == 2 and total['hits'] == 0
+    assert len(_parent_cache) == 52
+    assert os.listdir(tmp_path) == ['cache.json']
+    assert get_shard_path(cache_path).startswith(cache_path + '.')
+
+
+def test_only_the_shards_are_merged(tmp_path):
+    cache_path = str(tmp_path / 'cache.json')
+    for name in ('cache.json.bak', 'cache.json.tmp'):
+        (tmp_path / name).write_text('not a cache')
+    shard = TokenSimilarityCache()
+    shard.get_or_compute('a', 'bb', distance)
+    shard.save(cache_path + '.1234')
+    cache = TokenSimilarityCache()
+    assert merge_shards(cache=cache, file_path=cache_path)['misses'] == 1
+    assert len(cache) == 1
+    assert sorted(os.listdir(tmp_path)) == ['cache.json', 'cache.json.bak', 'cache.json.tmp']
@@ -0,0 +1,446 @@
+"""
+
+Created on 18-October-2026
+
+A compact container for the static analysis results of many JS files. Rather than one JSON file per analysed
+file, the results are appended to shards. Every shard consists of
+    <shard>.bin     The arrays of all records of the shard one after the other
+    <shard>.vocab   The tokens of the shard, one JSON value per line. The id of a token is its line number
+    <shard>.index   One JSON line per record giving the offsets of its arrays in '.bin'
+Tokens are stored as ids interned against the vocabulary of the shard and the ranges as integer arrays rather
+than 'start-end' strings. The arrays of a record are read back without copying by memory-mapping '.bin'. A record
+read from the store (see AnalysedFile) only decodes the fields that get used, eg. the nodes that match no pattern
+only decode their abstracted tokens.
+
+Every process appends to its own shard. The arrays and the new tokens of a record are written before its index
+line, hence a record whose index line is missing (eg. the process got killed while writing) is ignored. An append
+failing halfway (eg. interrupted by an exception) is rolled back.
+"""
+import json
+import mmap
+import os
+import uuid
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, List, Tuple, Callable, Any
+import numpy as np
+from utils.static_analysis_utils import parse_range
+
+TOKEN_ID = np.uint32
+INT = np.int32
+
+# The name of each array of a record -> (dtype, width). Arrays with width 2 hold (start, end) pairs
+RECORD_ARRAYS = {
+    'tokens': (TOKEN_ID, 1),
+    'token_ranges': (INT, 2),
+    'node_token_offsets': (INT, 1),  # The tokens of node 'i' are node_tokens[offsets[i]:offsets[i + 1]]
+    'node_tokens': (TOKEN_ID, 1),
+    'node_abstracted_tokens': (TOKEN_ID, 1),
+    'node_ranges': (INT, 2),
+    'node_lines': (INT, 2),
+    'node_types': (TOKEN_ID, 1),
+    'node_functions': (TOKEN_ID, 1),
+    'node_function_ranges': (INT, 2),
+    'identifier_ranges': (INT, 2),
+    'identifier_tokens': (TOKEN_ID, 1),
+    'literal_ranges': (INT, 2),
+    'literal_tokens': (TOKEN_ID, 1),
+    'function_identifier_ranges': (INT, 2),
+    'function_identifier_offsets': (INT, 1),
+    'function_identifier_tokens': (TOKEN_ID, 1),
+    'function_literal_ranges': (INT, 2),
+    'function_literal_offsets': (INT, 1),
+    'function_literal_tokens': (TOKEN_ID, 1)
+}
+ALIGNMENT = 8
+
+
+def _ranges(ranges: List) -> np.ndarray:
+    return np.array(ranges, dtype=INT).reshape(-1, 2)
+
+
+def _ids(tokens: List, intern: Callable[[Any], int]) -> np.ndarray:
+    return np.array([intern(token) for token in tokens], dtype=TOKEN_ID)
+
+
+def _offsets(groups: List[List]) -> np.ndarray:
+    return np.cumsum([0] + [len(group) for group in groups], dtype=INT)
+
+
+def encode_analysed_file(analysed_file: Dict, intern: Callable[[Any], int]) -> Dict[str, np.ndarray]:
+    """
+    Convert the JSON created by the static analysis of a JS file to the arrays of a record
+    :param analysed_file: The output of the static analysis
+    :param intern: Returns the id of a token
+    :return:
+    """
+    nodes = analysed_file['nodes']
+    arrays = {
+        'tokens': _ids(analysed_file['tokenList'], intern),
+        'token_ranges': _ranges([parse_range(rng) for rng in analysed_file['tokenRangesList']]),
+        'node_token_offsets': _offsets([node['tokens'] for node in nodes]),
+        'node_tokens': _ids([token for node in nodes for token in node['tokens']], intern),
+        'node_abstracted_tokens': _ids([token for node in nodes for token in node['abstractedTokens']], intern),
+        'node_ranges': _ranges([node['range'] for node in nodes]),
+        'node_lines': _ranges([parse_range(node['line']) for node in nodes]),
+        'node_types': _ids([node.get('type') for node in nodes], intern),
+        'node_functions': _ids([node.get('belongs_to_function') for node in nodes], intern),
+        'node_function_ranges': _ranges([parse_range(node['belonging_function_range']) for node in nodes])
+    }
+    for kind in ['identifier', 'literal']:
+        range_to_token = analysed_file[f'range_to_{kind}']
+        arrays[f'{kind}_ranges'] = _ranges([parse_range(rng) for rng in range_to_token.keys()])
+        arrays[f'{kind}_tokens'] = _ids(list(range_to_token.values()), intern)
+
+        functions_to_tokens = analysed_file[f'functions_to_{kind}s']
+        arrays[f'function_{kind}_ranges'] = _ranges([parse_range(rng) for rng in functions_to_tokens.keys()])
+        arrays[f'function_{kind}_offsets'] = _offsets(list(functions_to_tokens.values()))
+        arrays[f'function_{kind}_tokens'] = _ids(
+            [token for tokens in functions_to_tokens.values() for token in tokens], intern)
+    return arrays
+
+
+def _to_range_strings(ranges: np.ndarray) -> List[str]:
+    return [f'{start}-{end}' for start, end in ranges.tolist()]
+
+
+class _Record:
+    """
+    The arrays of a record along with the vocabulary their token ids refer to. Every array is converted to a list
+    once it is needed, the arrays that are never needed are not touched
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], vocabulary: List):
+        self.arrays = arrays
+        self.vocabulary = vocabulary
+        self._lists = {}
+
+    def list_of(self, name: str) -> List:
+        if name not in self._lists:
+            self._lists[name] = self.arrays[name].tolist()
+        return self._lists[name]
+
+    def tokens_of(self, name: str, start: int = 0, end: int = None) -> List:
+        vocabulary = self.vocabulary
+        return [vocabulary[token_id] for token_id in self.list_of(name)[start:end]]
+
+
+class AnalysedNode(Mapping):
+    """
+    A node (ie. a possible bug seeding location) of a record. Its fields are decoded once they are used, most nodes
+    of a file only need their 'abstractedTokens' to be looked up in the pattern index
+    """
+    __slots__ = ('_record', '_i', '_values')
+
+    FIELDS = ('tokens', 'abstractedTokens', 'range', 'type', 'line', 'belongs_to_function',
+              'belonging_function_range')
+
+    def __init__(self, record: _Record, i: int):
+        self._record = record
+        self._i = i
+        self._values = {}
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self._values:
+            self._values[name] = self._decode(name)
+        return self._values[name]
+
+    def _decode(self, name: str) -> Any:
+        record, i = self._record, self._i
+        if name in ('tokens', 'abstractedTokens'):
+            offsets = record.list_of('node_token_offsets')
+            return record.tokens_of('node_tokens' if name == 'tokens' else 'node_abstracted_tokens',
+                                    offsets[i], offsets[i + 1])
+        if name == 'range':
+            return record.list_of('node_ranges')[i]
+        if name == 'type':
+            return record.vocabulary[record.list_of('node_types')[i]]
+        if name == 'line':
+            return '{}-{}'.format(*record.list_of('node_lines')[i])
+        if name == 'belongs_to_function':
+            return record.vocabulary[record.list_of('node_functions')[i]]
+        if name == 'belonging_function_range':
+            return '{}-{}'.format(*record.list_of('node_function_ranges')[i])
+        raise KeyError(name)
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def __len__(self) -> int:
+        return len(self.FIELDS)
+
+
+class _FunctionTokens(Mapping):
+    """
+    The Identifiers or Literals of every function of a record, keyed by the range of the function. Only the tokens of
+    the functions looked up are decoded
+    """
+
+    def __init__(self, record: _Record, kind: str):
+        self._record = record
+        self._kind = kind
+        self._position_of_range = {rng: i for i, rng in enumerate(
+            _to_range_strings(record.arrays[f'function_{kind}_ranges']))}
+
+    def __getitem__(self, rng: str) -> List:
+        i = self._position_of_range[rng]
+        offsets = self._record.list_of(f'function_{self._kind}_offsets')
+        return self._record.tokens_of(f'function_{self._kind}_tokens', offsets[i], offsets[i + 1])
+
+    def __iter__(self):
+        return iter(self._position_of_range)
+
+    def __len__(self) -> int:
+        return len(self._position_of_range)
+
+
+class AnalysedFile(Mapping):
+    """
+    A record in the same form as the JSON created by the static analysis of the JS file. Rather than the 'start-end'
+    strings of 'tokenRangesList', the ranges of the tokens are given as the integer array 'tokenRanges' (see
+    utils.static_analysis_utils.get_token_ranges). Every field is decoded from the arrays once it is used, eg.
+    'tokenList' is only needed if the JS file itself can not be read
+    """
+    FIELDS = ('nodes', 'tokenList', 'tokenRanges', 'file_path', 'range_to_identifier', 'range_to_literal',
+              'functions_to_identifiers', 'functions_to_literals')
+
+    def __init__(self, arrays: Dict[str, np.ndarray], vocabulary: List, file_path: str):
+        self._record = _Record(arrays=arrays, vocabulary=vocabulary)
+        self._values = {'file_path': file_path, 'tokenRanges': arrays['token_ranges']}
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self._values:
+            self._values[name] = self._decode(name)
+        return self._values[name]
+
+    def _decode(self, name: str) -> Any:
+        record = self._record
+        if name == 'nodes':
+            return [AnalysedNode(record, i) for i in range(len(record.arrays['node_ranges']))]
+        if name == 'tokenList':
+            return record.tokens_of('tokens')
+        for kind in ['identifier', 'literal']:
+            if name == f'range_to_{kind}':
+                return dict(zip(_to_range_strings(record.arrays[f'{kind}_ranges']),
+                                record.tokens_of(f'{kind}_tokens')))
+            if name == f'functions_to_{kind}s':
+                return _FunctionTokens(record, kind)
+        raise KeyError(name)
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def __len__(self) -> int:
+        return len(self.FIELDS)
+
+
+def decode_analysed_file(arrays: Dict[str, np.ndarray], vocabulary: List, file_path: str) -> AnalysedFile:
+    """
+    Convert the arrays of a record back to the JSON created by the static analysis of the JS file, see AnalysedFile
+    """
+    return AnalysedFile(arrays=arrays, vocabulary=vocabulary, file_path=file_path)
+
+
+class AnalysedFileStoreWriter:
+    def __init__(self, store_dir: str, max_shard_size: int = 1 << 30):
+        """
+        :param store_dir: The directory containing the shards
+        :param max_shard_size: A new shard is started once the '.bin' file of the current shard grows beyond
+                                these many bytes
+        """
+        self.store_dir = store_dir
+        self.max_shard_size = max_shard_size
+        self.shard_name = None
+        self.shard_size = 0
+        self.token_to_id = {}
+        self._new_tokens = []
+
+    def _start_new_shard(self) -> None:
+        self.shard_name = 'shard_{}_{}'.format(os.getpid(), uuid.uuid4().hex[:8])
+        self.shard_size = 0
+        self.token_to_id = {}
+        self._new_tokens = []
+
+    def _intern(self, token: Any) -> int:
+        # Apart from strings, there may be None (eg. a token that could not be abstracted). The JSON of
+        # such tokens is used as the key so that they never share an id with a string
+        key = token if isinstance(token, str) else (json.dumps(token, sort_keys=True),)
+        token_id = self.token_to_id.get(key)
+        if token_id is None:
+            token_id = len(self.token_to_id)
+            self.token_to_id[key] = token_id
+            self._new_tokens.append(token)
+        return token_id
+
+    def append(self, key: str, content_hash: str, analysed_file: Dict) -> None:
+        """
+        Add the static analysis results of a JS file to the store
+        :param key: The path of the JS file
+        :param content_hash: The hash of the analysed JS file
+        :param analysed_file: The output of the static analysis
+        """
+        if self.shard_name is None or self.shard_size >= self.max_shard_size:
+            self._start_new_shard()
+        arrays = encode_analysed_file(analysed_file=analysed_file, intern=self._intern)
+        shard_path = os.path.join(self.store_dir, self.shard_name)
+
+        index_entry = {'key': key, 'hash': content_hash, 'file_path': analysed_file.get('file_path', key),
+                       'arrays': {}}
+
+        def write_arrays(f) -> int:
+            offset = f.tell()
+            for name, array in arrays.items():
+                padding = -offset % ALIGNMENT
+                f.write(b'\0' * padding)
+                offset += padding
+                data = np.ascontiguousarray(array).tobytes()
+                f.write(data)
+                index_entry['arrays'][name] = [offset, len(array)]
+                offset += len(data)
+            return offset
+
+        self.shard_size = _append_or_roll_back(shard_path + '.bin', write_arrays)
+        _append_or_roll_back(shard_path + '.vocab', lambda f: f.write(
+            ''.join(json.dumps(token) + '\n' for token in self._new_tokens).encode('utf-8')))
+        self._new_tokens = []
+        _append_or_roll_back(shard_path + '.index', lambda f: f.write(
+            (json.dumps(index_entry, separators=(',', ':')) + '\n').encode('utf-8')))
+
+
+def _append_or_roll_back(path: str, write: Callable[[Any], Any]) -> Any:
+    """
+    Append to a file. If writing fails halfway (eg. the task got interrupted), the file is truncated to its previous
+    size. Otherwise, the offsets of the records appended later would not match the index, or a broken line of the
+    index would swallow the next one
+    :param write: Writes to the file opened in binary append mode
+    """
+    with open(path, 'ab') as f:
+        size = f.tell()
+        try:
+            return write(f)
+        except BaseException:
+            f.truncate(size)
+            raise
+
+
+class AnalysedFileStore:
+    def __init__(self, store_dir: str):
+        """
+        :param store_dir: The directory containing the shards
+        """
+        self.store_dir = store_dir
+        # (key, hash) -> (shard, index entry). A later record of the same key and hash replaces an earlier one
+        self.records = {}
+        self._vocabularies = {}
+        self._buffers = {}
+        self.refresh()
+
+    def refresh(self) -> None:
+        """
+        Read the indices of the shards again to see the records appended since the store has been opened
+        """
+        self.close()
+        self.records = {}
+        for index_path in sorted(Path(self.store_dir).glob('*.index')):
+            shard = index_path.stem
+            with open(index_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.records[(entry['key'], entry['hash'])] = (shard, entry)
+
+    def close(self) -> None:
+        for buffer in self._buffers.values():
+            buffer.close()
+        self._buffers = {}
+        self._vocabularies = {}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def contains(self, key: str, content_hash: str) -> bool:
+        return (key, content_hash) in self.records
+
+    def get_num_of_nodes(self, key: str, content_hash: str) -> int:
+        """
+        The number of nodes of a record, known from the index without reading the record
+        """
+        return self.records[(key, content_hash)][1]['arrays']['node_ranges'][1]
+
+    def _get_buffer(self, shard: str) -> mmap.mmap:
+        if shard not in self._buffers:
+            with open(os.path.join(self.store_dir, shard + '.bin'), 'rb') as f:
+                self._buffers[shard] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._buffers[shard]
+
+    def get_vocabulary(self, shard: str) -> List:
+        if shard not in self._vocabularies:
+            with open(os.path.join(self.store_dir, shard + '.vocab'), 'r', encoding='utf-8') as f:
+                self._vocabularies[shard] = [json.loads(line) for line in f]
+        return self._vocabularies[shard]
+
+    def get_arrays(self, key: str, content_hash: str) -> Tuple[Dict[str, np.ndarray], List]:
+        """
+        Get the arrays of a record. The arrays are read-only views of the memory-mapped shard, nothing is copied.
+        :return: The arrays and the vocabulary that the token ids refer to
+        """
+        shard, entry = self.records[(key, content_hash)]
+        arrays = {}
+        for name, (offset, length) in entry['arrays'].items():
+            dtype, width = RECORD_ARRAYS[name]
+            if length == 0:
+                array = np.empty(0, dtype=dtype)
+            else:
+                array = np.frombuffer(self._get_buffer(shard), dtype=dtype, count=length * width, offset=offset)
+            arrays[name] = array.reshape(-1, 2) if width == 2 else array
+        return arrays, self.get_vocabulary(shard)
+
+    def read_analysed_file(self, key: str, content_hash: str) -> Mapping:
+        """
+        Get the static analysis results of a JS file in the same form as the JSON created by the static analysis. The
+        fields are decoded from the memory-mapped arrays once they are used, see AnalysedFile
+        :return: An empty dictionary if the store does not contain the file
+        """
+        if not self.contains(key, content_hash):
+            return {}
+        arrays, vocabulary = self.get_arrays(key, content_hash)
+        return decode_analysed_file(arrays=arrays, vocabulary=vocabulary,
+                                    file_path=self.records[(key, content_hash)][1]['file_path'])
+
+    def get_identifiers_and_literals(self) -> set:
+        """
+        All Identifiers and Literals present in the files of the store
+        """
+        token_ids_in_shards = {}
+        for (key, content_hash), (shard, _) in self.records.items():
+            arrays, _ = self.get_arrays(key, content_hash)
+            token_ids = token_ids_in_shards.setdefault(shard, set())
+            token_ids.update(arrays['identifier_tokens'].tolist())
+            token_ids.update(arrays['literal_tokens'].tolist())
+
+        tokens = set()
+        for shard, token_ids in token_ids_in_shards.items():
+            vocabulary = self.get_vocabulary(shard)
+            tokens.update(vocabulary[token_id] for token_id in token_ids if isinstance(vocabulary[token_id], str))
+        return tokens
+
+
+# The writers are keyed by the process id since the processes of a Pool inherit this dictionary but must each
+# append to their own shard
+_writers = {}
+_stores = {}
+
+
+def get_analysed_file_store_writer(store_dir: str) -> AnalysedFileStoreWriter:
+    key = (os.getpid(), store_dir)
+    if key not in _writers:
+        _writers[key] = AnalysedFileStoreWriter(store_dir=store_dir)
+    return _writers[key]
+
+
+def get_analysed_file_store(store_dir: str) -> AnalysedFileStore:
+    if store_dir not in _stores:
+        _stores[store_dir] = AnalysedFileStore(store_dir=store_dir)
+    return _stores[store_dir]
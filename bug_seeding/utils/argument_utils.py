@@ -13,7 +13,10 @@ def read_arguments(parser: ArgumentParser) -> Tuple:
     parser = add_arguments_to_parser(parser)
     args = parser.parse_args()
     create_dir_list_if_not_present([args.out_dir, args.working_dir, args.stats_dir])
-    return args.in_dir, args.out_dir, args.working_dir, args.stats_dir, args.bug_seeding_patterns, args.K_freq_idf, args.K_freq_lit
+    return args.in_dir, args.out_dir, args.working_dir, args.stats_dir, args.bug_seeding_patterns, args.K_freq_idf, \
+           args.K_freq_lit, args.similarity_cache, args.max_seconds_per_file, args.max_memory_per_process, \
+           args.max_tasks_per_process, args.output_format, args.num_of_writer_threads, \
+           args.beautify, args.max_bugs_per_file, args.max_bugs
 
 
 def add_arguments_to_parser(parser: ArgumentParser) -> ArgumentParser:
@@ -62,4 +65,72 @@ def add_arguments_to_parser(parser: ArgumentParser) -> ArgumentParser:
         help='K most frequent Literal'
     )
 
+    parser.add_argument(
+        '--similarity_cache',
+        type=str,
+        default='',
+        help='A file where the similarities between tokens are kept across runs. Not kept if empty'
+    )
+
+    parser.add_argument(
+        '--max_seconds_per_file',
+        type=int,
+        default=0,
+        help='Files taking longer (seconds) to analyse and seed are stopped and quarantined. 0 for no limit'
+    )
+
+    parser.add_argument(
+        '--max_memory_per_process',
+        type=int,
+        default=0,
+        help='The RSS (MB) a process may reach while seeding bugs to a file. Files exceeding it are stopped and '
+             'quarantined. 0 for no limit'
+    )
+
+    parser.add_argument(
+        '--max_tasks_per_process',
+        type=int,
+        default=20,
+        help='The processes of the Pool are replaced by new ones after these many batches of files. 0 to never '
+             'replace them'
+    )
+
+    parser.add_argument(
+        '--output_format',
+        type=str,
+        default='files',
+        choices=['files', 'tar', 'zip'],
+        help='Write every file having a seeded bug on its own or pack them into archives in the output directory'
+    )
+
+    parser.add_argument(
+        '--num_of_writer_threads',
+        type=int,
+        default=4,
+        help='The threads of each process beautifying and writing the files having seeded bugs'
+    )
+
+    parser.add_argument(
+        '--beautify',
+        action='store_true',
+        help='Beautify the complete code of every file having a seeded bug. By default, only the code of the '
+             'location where the bug has been seeded changes'
+    )
+
+    parser.add_argument(
+        '--max_bugs_per_file',
+        type=int,
+        default=0,
+        help='Seed at most these many bugs to a file. The (location, pattern) pairs of a file are tried in a random '
+             'order until the limit is reached. 0 for no limit'
+    )
+
+    parser.add_argument(
+        '--max_bugs',
+        type=int,
+        default=0,
+        help='Stop once these many bugs have been seeded to all files together, including the files being seeded '
+             'in parallel. The files are seeded in a random order. 0 for no limit'
+    )
+
     return parser
@@ -0,0 +1,38 @@
+"""
+
+Created on 18-October-2026
+
+The number of bugs that all processes of a run together may seed (see --max_bugs). The count is shared by the
+processes of the Pool, every process reserves a bug before seeding it to a further location. Hence, the files
+seeded in parallel stop as soon as the quota is reached rather than once their results arrive at the parent.
+"""
+from multiprocessing import Value
+
+
+class BugQuota:
+    def __init__(self, max_bugs: int, num_seeded_before: int = 0):
+        """
+        Create it before the Pool and hand it to the processes through the initializer
+        :param max_bugs: The number of bugs that may be seeded
+        :param num_seeded_before: The number of bugs seeded by earlier runs
+        """
+        self.max_bugs = max_bugs
+        self._num_seeded = Value('q', num_seeded_before)
+
+    @property
+    def num_seeded(self) -> int:
+        return self._num_seeded.value
+
+    def is_reached(self) -> bool:
+        return self._num_seeded.value >= self.max_bugs
+
+    def reserve(self) -> bool:
+        """
+        Count a bug about to be seeded
+        :return: False if the quota has already been reached, the bug must not be seeded then
+        """
+        with self._num_seeded.get_lock():
+            if self._num_seeded.value >= self.max_bugs:
+                return False
+            self._num_seeded.value += 1
+            return True
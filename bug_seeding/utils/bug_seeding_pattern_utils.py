@@ -6,10 +6,12 @@ Created on 02-April-2020
 Given all change patterns do stuffs with them
 
 """
-from typing import List, Tuple
+import itertools
+from typing import List, Tuple, Dict
+from collections import defaultdict
+from utils.seeding_cache import get_fingerprint
+from utils.run_manifest import get_file_hash
 import utils.fileutils as fs
-import re
-import pandas as pd
 
 
 def get_only_idf_lit_containing_patterns(all_changes):
@@ -46,44 +48,245 @@ def get_only_idf_lit_containing_patterns(all_changes):
     for t in all_changes:
         # If the change pattern contains at-least one Identifier/Literal, we use that.
         # Else the change pattern is discarded
-        if 'Idf_' in ' '.join(t['fix']) or 'Idf_' in ' '.join(t['buggy']) or 'Lit_' in ' '.join(
-                t['fix']) or 'Lit_' in ' '.join(t['buggy']):
+        if any('Idf_' in token or 'Lit_' in token for token in itertools.chain(t['fix'], t['buggy'])):
             filtered_change_patterns.append(t)
 
     return filtered_change_patterns
 
 
-def find_wrong_operand_in_binary_op_patterns(bug_seeding_patterns: List) -> List:
+# The keys added to a pattern by this module. They are not part of the content of the pattern
+DERIVED_PATTERN_KEYS = ('fingerprint', 'labels', 'fix_idf_lit_positions', 'buggy_idf_lit_positions')
+
+
+def create_pattern_index(bug_seeding_patterns: List) -> Dict[Tuple, List]:
+    """
+    Index the bug seeding patterns by the abstract token sequence of their 'fix' (correct) part.
+
+    A pattern can only be applied to a target location if the abstracted tokens of the location are exactly
+    the same as the 'fix' part of the pattern. Instead of checking every pattern against every location,
+    we create the index once and look up the matching patterns of each location.
+        Eg. ('Idf_1', '+', 'Lit_1') -> [pattern_1, pattern_7, ...]
+
+    The order of the patterns for a given key is the same as in bug_seeding_patterns.
+    :param bug_seeding_patterns: The list of bug seeding patterns
+    :return: A mapping between the abstract token sequence and the patterns having that sequence as 'fix'
+    """
+    pattern_index = defaultdict(list)
+    for pattern in bug_seeding_patterns:
+        pattern_index[tuple(pattern['fix'])].append(pattern)
+    return dict(pattern_index)
+
+
+def get_pattern_fingerprint(pattern: Dict) -> str:
+    """
+    A hash of the content of a bug seeding pattern. The same pattern has the same fingerprint in every run
+    """
+    return get_fingerprint({key: value for key, value in pattern.items() if key not in DERIVED_PATTERN_KEYS})
+
+
+def add_pattern_fingerprints(bug_seeding_patterns: List) -> List[str]:
+    """
+    Add its fingerprint to every pattern as 'fingerprint', unless the pattern already has one (eg. it has been read
+    from the compiled patterns)
+    :return: The fingerprints of the patterns
+    """
+    for pattern in bug_seeding_patterns:
+        if 'fingerprint' not in pattern:
+            pattern['fingerprint'] = get_pattern_fingerprint(pattern)
+    return [pattern['fingerprint'] for pattern in bug_seeding_patterns]
+
+
+def get_idf_lit_positions(abstract_tokens: List[str]) -> List[int]:
+    """
+    The positions of the Identifiers and Literals in a sequence of abstract tokens
+        Eg. ['Idf_1', '+', 'Lit_1'] -> [0, 2]
+    """
+    return [i for i, token in enumerate(abstract_tokens) if _is_idf_or_lit(token)]
+
+
+def add_idf_lit_positions(bug_seeding_patterns: List) -> List:
+    """
+    Add the positions of the Identifiers and Literals of the 'fix' and 'buggy' part to every pattern as
+    'fix_idf_lit_positions' and 'buggy_idf_lit_positions'
+    """
+    for pattern in bug_seeding_patterns:
+        pattern['fix_idf_lit_positions'] = get_idf_lit_positions(pattern['fix'])
+        pattern['buggy_idf_lit_positions'] = get_idf_lit_positions(pattern['buggy'])
+    return bug_seeding_patterns
+
+
+def filter_pattern_index(pattern_index: Dict[Tuple, List], pattern_fingerprints: set) -> Dict[Tuple, List]:
+    """
+    Keep only the patterns having one of the given fingerprints (see add_pattern_fingerprints)
+    """
+    filtered_index = {}
+    for fix, patterns in pattern_index.items():
+        selected_patterns = [pattern for pattern in patterns if pattern['fingerprint'] in pattern_fingerprints]
+        if len(selected_patterns) > 0:
+            filtered_index[fix] = selected_patterns
+    return filtered_index
+
+
+# The categories of bugs a pattern may seed. Same as the bug detectors of DeepBugs
+BUG_CATEGORIES = ('wrong_binary_operand', 'wrong_binary_operator', 'swapped_binary_operands', 'wrong_assignment',
+                  'swapped_arguments', 'missing_argument')
+# Increment after changing classify_pattern, the cached labels of the pattern files are then computed again
+BUG_CATEGORIES_VERSION = 1
+
+JS_BINARY_OPERATORS = frozenset(['==', '!=', '===', '!==', '<', '<=', '>', '>=', '<<', '>>', '>>>', '+', '-', '*', '/',
+                                 '%', '|', '^', '&', 'in', 'instanceof'])
+JS_ASSIGNMENT_OPERATORS = frozenset(['=', '+=', '-=', '*=', '/=', '%=', '<<=', '>>=', '>>>=', '|=', '^=', '&=',
+                                     '**='])
+ASSIGNMENT_NODE_TYPES = frozenset(['AssignmentExpression', 'VariableDeclarator', 'VariableDeclaration'])
+
+
+def _is_idf_or_lit(token: str) -> bool:
+    return token.startswith('Idf_') or token.startswith('Lit_')
+
+
+def _index_tokens(tokens: List[str]) -> Dict:
+    """
+    Go once over the abstract tokens of one part of a pattern and find
+        * 'binary_operations': the (left operand, operator, right operand) of every binary operator between two
+                               Identifiers/Literals eg. ('Idf_1', '+', 'Lit_1')
+        * 'assignment': the position of the first assignment operator outside of any parentheses/brackets
+        * 'callee' and 'arguments': the tokens before the parentheses closing at the end and the tokens of every
+                                    argument within them eg. ['Idf_1', '.', 'Idf_2'] and [('Idf_3',), ('Lit_1',)]
+    """
+    binary_operations = []
+    assignment = None
+    open_brackets = []  # The position of every bracket not yet closed and the positions of its commas
+    callee, arguments = None, None
+    last = len(tokens) - 1
+    for i, token in enumerate(tokens):
+        if token in JS_BINARY_OPERATORS:
+            if 0 < i < last and _is_idf_or_lit(tokens[i - 1]) and _is_idf_or_lit(tokens[i + 1]):
+                binary_operations.append((tokens[i - 1], token, tokens[i + 1]))
+        elif token in JS_ASSIGNMENT_OPERATORS:
+            if assignment is None and len(open_brackets) == 0:
+                assignment = i
+        elif token in ('(', '[', '{'):
+            open_brackets.append((i, []))
+        elif token == ',':
+            if len(open_brackets) > 0:
+                open_brackets[-1][1].append(i)
+        elif token in (')', ']', '}'):
+            if len(open_brackets) == 0:
+                continue
+            start, commas = open_brackets.pop()
+            if token == ')' and i == last and len(open_brackets) == 0 and start > 0:
+                callee = tokens[:start]
+                bounds = [start] + commas + [i]
+                arguments = [tuple(tokens[bounds[j] + 1:bounds[j + 1]]) for j in range(len(bounds) - 1)]
+                if arguments == [()]:
+                    arguments = []
+    return {'binary_operations': binary_operations, 'assignment': assignment, 'callee': callee,
+            'arguments': arguments}
+
+
+def classify_pattern(pattern: Dict) -> List[str]:
+    """
+    Find the categories of bugs (see BUG_CATEGORIES) a pattern seeds by comparing its 'fix' and 'buggy' abstract
+    tokens. A pattern may belong to several categories or to none
+        Eg. fix ['Idf_1', '*', 'Idf_2'] and buggy ['Idf_1', '*', 'Idf_3'] -> ['wrong_binary_operand']
+    """
+    fix, buggy = _index_tokens(pattern['fix']), _index_tokens(pattern['buggy'])
+    fix_type, buggy_type = pattern.get('fix_tokenType'), pattern.get('buggy_tokenType')
+    labels = set()
+
+    if fix_type == 'BinaryExpression' and buggy_type == 'BinaryExpression':
+        # Index the operations of the buggy part by their operator and by their operands
+        buggy_by_operator, buggy_by_operands = defaultdict(list), defaultdict(list)
+        for left, operator, right in buggy['binary_operations']:
+            buggy_by_operator[operator].append((left, right))
+            buggy_by_operands[(left, right)].append(operator)
+        for left, operator, right in fix['binary_operations']:
+            for buggy_left, buggy_right in buggy_by_operator.get(operator, []):
+                if (left == buggy_left) != (right == buggy_right):
+                    labels.add('wrong_binary_operand')
+                if left != right and left == buggy_right and right == buggy_left:
+                    labels.add('swapped_binary_operands')
+            if any(buggy_operator != operator for buggy_operator in buggy_by_operands.get((left, right), [])):
+                labels.add('wrong_binary_operator')
+
+    if fix_type == buggy_type and fix_type in ASSIGNMENT_NODE_TYPES and fix['assignment'] is not None and \
+            buggy['assignment'] is not None:
+        # The same left hand side gets a different right hand side
+        fix_split, buggy_split = fix['assignment'] + 1, buggy['assignment'] + 1
+        if pattern['fix'][:fix_split] == pattern['buggy'][:buggy_split] and \
+                pattern['fix'][fix_split:] != pattern['buggy'][buggy_split:]:
+            labels.add('wrong_assignment')
+
+    if fix_type == 'CallExpression' and buggy_type == 'CallExpression' and fix['arguments'] is not None and \
+            buggy['arguments'] is not None and fix['callee'] == buggy['callee']:
+        fix_arguments, buggy_arguments = fix['arguments'], buggy['arguments']
+        if len(fix_arguments) == len(buggy_arguments):
+            different = [j for j in range(len(fix_arguments)) if fix_arguments[j] != buggy_arguments[j]]
+            if len(different) == 2 and fix_arguments[different[0]] == buggy_arguments[different[1]] and \
+                    fix_arguments[different[1]] == buggy_arguments[different[0]]:
+                labels.add('swapped_arguments')
+        elif len(fix_arguments) == len(buggy_arguments) + 1:
+            if any(fix_arguments[:j] + fix_arguments[j + 1:] == buggy_arguments for j in range(len(fix_arguments))):
+                labels.add('missing_argument')
+
+    return [category for category in BUG_CATEGORIES if category in labels]
+
+
+def get_pattern_labels_path(pattern_file: str) -> str:
+    return pattern_file + '.labels.json'
+
+
+def label_patterns(pattern_file: str, bug_seeding_patterns: List) -> List:
+    """
+    Add the categories of bugs (see classify_pattern) to every pattern as 'labels'. The labels are cached next to
+    the pattern file and computed again only if the file or the classification changes
+    :param pattern_file: The file the patterns have been read from
+    :param bug_seeding_patterns: All patterns of the file in the same order
+    :return: The patterns
+    """
+    labels_path = get_pattern_labels_path(pattern_file)
+    content_hash = get_file_hash(pattern_file)
+    labels = None
+    if fs.pathExists(labels_path):
+        cached = fs.read_json_file(labels_path)
+        if cached.get('hash') == content_hash and cached.get('version') == BUG_CATEGORIES_VERSION and \
+                len(cached.get('labels', [])) == len(bug_seeding_patterns):
+            labels = cached['labels']
+    if labels is None:
+        labels = [classify_pattern(pattern) for pattern in bug_seeding_patterns]
+        try:
+            fs.writeJSONFile(data={'hash': content_hash, 'version': BUG_CATEGORIES_VERSION, 'labels': labels},
+                             file_path=labels_path)
+        except OSError as e:
+            print(f"Could not cache the labels of the patterns at '{labels_path}' because {e}")
+    for pattern, pattern_labels in zip(bug_seeding_patterns, labels):
+        pattern['labels'] = pattern_labels
+    return bug_seeding_patterns
+
+
+def select_patterns_of_category(bug_seeding_patterns: List, category: str) -> List:
+    """
+    The patterns seeding bugs of the given category (one of BUG_CATEGORIES). Patterns having the same 'fix' and
+    'buggy' abstract tokens are selected only once
+    """
+    if category not in BUG_CATEGORIES:
+        raise ValueError(f"Unknown bug category '{category}', expected one of {BUG_CATEGORIES}")
     filtered_patterns = []
     dup_filter = set()
-    js_binary_operators = ["==", "!=", "===", "!==", "<", "<=", ">", ">=", "<<", ">>", ">>>", "\+", "-", "\*", "/", "%",
-                           "\|",
-                           "\^", "&", "in", "instanceof"]
-    regexps = []
-    for op in js_binary_operators:
-        regexps.append(re.compile('(Idf_[\d]|Lit_[\d])\s(' + op + ')\s(Idf_[\d]|Lit_[\d])'))
     for pattern in bug_seeding_patterns:
-        correct_part_of_pattern = ' '.join(pattern['fix'])
-        buggy_part_of_pattern = ' '.join(pattern['buggy'])
-        if pattern['fix_tokenType'] == 'BinaryExpression' and pattern['buggy_tokenType'] == 'BinaryExpression':
-            for regex_op_1 in regexps:
-                in_correct = regex_op_1.findall(correct_part_of_pattern)
-                for regex_op_2 in regexps:
-                    in_buggy = regex_op_2.findall(buggy_part_of_pattern)
-                    for correct_match in in_correct:
-                        for buggy_match in in_buggy:
-                            if correct_match[1] == buggy_match[1] and correct_match[0] != buggy_match[0] and \
-                                    correct_match[
-                                        2] == buggy_match[2]:
-                                pattern_as_str = correct_part_of_pattern + buggy_part_of_pattern
-                                if pattern_as_str not in dup_filter:
-                                    dup_filter.add(pattern_as_str)
-                                    filtered_patterns.append(pattern)
-                            if correct_match[1] == buggy_match[1] and correct_match[0] == buggy_match[0] and \
-                                    correct_match[
-                                        2] != buggy_match[2]:
-                                pattern_as_str = correct_part_of_pattern + buggy_part_of_pattern
-                                if pattern_as_str not in dup_filter:
-                                    dup_filter.add(pattern_as_str)
-                                    filtered_patterns.append(pattern)
+        labels = pattern['labels'] if 'labels' in pattern else classify_pattern(pattern)
+        if category not in labels:
+            continue
+        pattern_as_str = (tuple(pattern['fix']), tuple(pattern['buggy']))
+        if pattern_as_str not in dup_filter:
+            dup_filter.add(pattern_as_str)
+            filtered_patterns.append(pattern)
     return filtered_patterns
+
+
+def find_wrong_operand_in_binary_op_patterns(bug_seeding_patterns: List) -> List:
+    """
+    The patterns replacing one operand of a binary operation by another Identifier/Literal
+        Eg. 'length * breadth' -> 'length * height'
+    """
+    return select_patterns_of_category(bug_seeding_patterns, 'wrong_binary_operand')
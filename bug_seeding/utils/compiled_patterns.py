@@ -0,0 +1,215 @@
+"""
+
+Created on 18-October-2026
+
+A compiled copy of a bug seeding pattern file. Reading the JSON of the patterns, removing the patterns that can not
+be used, labelling (see bug_seeding_pattern_utils.classify_pattern) and fingerprinting them takes a while for large
+pattern files and every run does it again. Instead, the compiled copy is built once per pattern file in the directory
+'<pattern file>.compiled' and consists of
+    vocab.json      Every distinct string of the patterns, the id of a string is its position in the list
+    patterns.npz    The token sequences ('fix', 'buggy', 'fix_actual', 'buggy_actual') and the other string fields of
+                    the patterns as ids interned against the vocabulary, the fingerprints, the labels (one bit per
+                    category) and the positions of the Identifiers/Literals in 'fix' and 'buggy'
+    fields.json     The fields of the patterns that are not strings (eg. line numbers)
+    meta.json       The hash of the pattern file, the number of patterns used for training etc.
+The meta file is written last, hence a copy whose meta file is missing or stale is built again.
+
+Only the patterns kept by get_only_idf_lit_containing_patterns are compiled. The first 80% of them are the training
+patterns used for seeding, the rest are kept for validation.
+"""
+import gc
+import os
+from typing import List, Tuple
+import numpy as np
+import utils.fileutils as fs
+from utils.run_manifest import get_file_hash
+from utils.bug_seeding_pattern_utils import get_only_idf_lit_containing_patterns, label_patterns, \
+    add_pattern_fingerprints, add_idf_lit_positions, DERIVED_PATTERN_KEYS, BUG_CATEGORIES, BUG_CATEGORIES_VERSION
+
+# Increment after changing the layout of the compiled copy or the way the patterns are selected
+COMPILED_PATTERNS_VERSION = 1
+
+TOKEN_ID = np.uint32
+INT = np.int64
+
+TOKEN_SEQUENCES = ('fix', 'buggy', 'fix_actual', 'buggy_actual')
+IDF_LIT_POSITIONS = ('fix_idf_lit_positions', 'buggy_idf_lit_positions')
+
+
+def get_compiled_patterns_dir(pattern_file: str) -> str:
+    return pattern_file + '.compiled'
+
+
+def split_patterns(bug_seeding_patterns: List) -> Tuple[List, List]:
+    """
+    :return: The training patterns used for seeding and the validation patterns
+    """
+    num_of_training_patterns = len(bug_seeding_patterns) * 80 // 100
+    return bug_seeding_patterns[:num_of_training_patterns], bug_seeding_patterns[num_of_training_patterns:]
+
+
+def _offsets(groups: List[List]) -> np.ndarray:
+    return np.cumsum([0] + [len(group) for group in groups], dtype=INT)
+
+
+def prepare_patterns(pattern_file: str) -> List:
+    """
+    Read the patterns that can be used for seeding from the pattern file, along with their labels, fingerprints and
+    the positions of their Identifiers/Literals
+    """
+    bug_seeding_patterns = label_patterns(pattern_file=pattern_file,
+                                          bug_seeding_patterns=fs.read_json_file(pattern_file))
+    bug_seeding_patterns = get_only_idf_lit_containing_patterns(bug_seeding_patterns)
+    add_pattern_fingerprints(bug_seeding_patterns=bug_seeding_patterns)
+    add_idf_lit_positions(bug_seeding_patterns=bug_seeding_patterns)
+    return bug_seeding_patterns
+
+
+def compile_patterns(pattern_file: str, compiled_dir: str = None) -> str:
+    """
+    Build the compiled copy of the pattern file
+    :param pattern_file: The JSON file of the patterns
+    :param compiled_dir: Where the compiled copy is written. Next to the pattern file if not given
+    :return: The directory of the compiled copy
+    """
+    compiled_dir = compiled_dir or get_compiled_patterns_dir(pattern_file)
+    fs.create_dir_list_if_not_present([compiled_dir])
+    meta_path = os.path.join(compiled_dir, 'meta.json')
+    if fs.pathExists(meta_path):
+        os.remove(meta_path)
+
+    content_hash = get_file_hash(pattern_file)
+    bug_seeding_patterns = prepare_patterns(pattern_file)
+
+    vocabulary, token_to_id = [], {}
+
+    def intern(token: str) -> int:
+        if token not in token_to_id:
+            token_to_id[token] = len(vocabulary)
+            vocabulary.append(token)
+        return token_to_id[token]
+
+    sequences = [pattern[name] for pattern in bug_seeding_patterns for name in TOKEN_SEQUENCES]
+    positions = [pattern[name] for pattern in bug_seeding_patterns for name in IDF_LIT_POSITIONS]
+    arrays = {
+        'token_ids': np.array([intern(token) for tokens in sequences for token in tokens], dtype=TOKEN_ID),
+        'sequence_offsets': _offsets(sequences),
+        'positions': np.array([position for group in positions for position in group], dtype=INT),
+        'position_offsets': _offsets(positions),
+        'fingerprints': np.array([pattern['fingerprint'] for pattern in bug_seeding_patterns], dtype='S40'),
+        'labels': np.array([sum(1 << BUG_CATEGORIES.index(category) for category in pattern['labels'])
+                            for pattern in bug_seeding_patterns], dtype=np.uint32)
+    }
+
+    # Every other field is either a column of ids (if all its values are strings) or a column of JSON values. Only
+    # the patterns having the field are listed in its column
+    string_fields, other_fields = [], {}
+    field_names = sorted({name for pattern in bug_seeding_patterns for name in pattern.keys()} -
+                         set(TOKEN_SEQUENCES) - set(DERIVED_PATTERN_KEYS))
+    for name in field_names:
+        having_field = [i for i, pattern in enumerate(bug_seeding_patterns) if name in pattern]
+        values = [bug_seeding_patterns[i][name] for i in having_field]
+        if all(isinstance(value, str) for value in values):
+            string_fields.append(name)
+            arrays[f'field_patterns/{name}'] = np.array(having_field, dtype=INT)
+            arrays[f'field_ids/{name}'] = np.array([intern(value) for value in values], dtype=TOKEN_ID)
+        else:
+            other_fields[name] = [having_field, values]
+
+    np.savez(os.path.join(compiled_dir, 'patterns.npz'), **arrays)
+    fs.writeJSONFile(data=vocabulary, file_path=os.path.join(compiled_dir, 'vocab.json'))
+    fs.writeJSONFile(data=other_fields, file_path=os.path.join(compiled_dir, 'fields.json'))
+    fs.writeJSONFile(data={
+        'hash': content_hash,
+        'version': COMPILED_PATTERNS_VERSION,
+        'bug_categories_version': BUG_CATEGORIES_VERSION,
+        'num_of_patterns': len(bug_seeding_patterns),
+        'num_of_training_patterns': len(split_patterns(bug_seeding_patterns)[0]),
+        'string_fields': string_fields
+    }, file_path=meta_path)
+    return compiled_dir
+
+
+def is_compiled(pattern_file: str, compiled_dir: str = None) -> bool:
+    """
+    Whether the compiled copy exists and is up to date with the pattern file
+    """
+    meta_path = os.path.join(compiled_dir or get_compiled_patterns_dir(pattern_file), 'meta.json')
+    if not fs.pathExists(meta_path):
+        return False
+    meta = fs.read_json_file(meta_path)
+    return meta.get('version') == COMPILED_PATTERNS_VERSION and \
+        meta.get('bug_categories_version') == BUG_CATEGORIES_VERSION and \
+        meta.get('hash') == get_file_hash(pattern_file)
+
+
+def read_compiled_patterns(compiled_dir: str) -> Tuple[List, List]:
+    """
+    Read the patterns of a compiled copy. Equal strings of the patterns are the same object
+    :return: The training and the validation patterns
+    """
+    # Otherwise the garbage collector goes through all lists and patterns created so far again and again
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _read_compiled_patterns(compiled_dir)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _read_compiled_patterns(compiled_dir: str) -> Tuple[List, List]:
+    meta = fs.read_json_file(os.path.join(compiled_dir, 'meta.json'))
+    vocabulary = fs.read_json_file(os.path.join(compiled_dir, 'vocab.json'))
+    with np.load(os.path.join(compiled_dir, 'patterns.npz')) as data:
+        arrays = {name: data[name] for name in data.files}
+
+    def slices(values: List, offsets: np.ndarray) -> List[List]:
+        offsets = offsets.tolist()
+        return [values[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+
+    # Every column holds the values of one key for all patterns
+    columns = {}
+    sequences = slices([vocabulary[token_id] for token_id in arrays['token_ids'].tolist()], arrays['sequence_offsets'])
+    for j, name in enumerate(TOKEN_SEQUENCES):
+        columns[name] = sequences[j::len(TOKEN_SEQUENCES)]
+    positions = slices(arrays['positions'].tolist(), arrays['position_offsets'])
+    for j, name in enumerate(IDF_LIT_POSITIONS):
+        columns[name] = positions[j::len(IDF_LIT_POSITIONS)]
+    columns['fingerprint'] = [fingerprint.decode('ascii') for fingerprint in arrays['fingerprints'].tolist()]
+    labels_of_mask = {mask: [category for j, category in enumerate(BUG_CATEGORIES) if mask & (1 << j)]
+                      for mask in set(arrays['labels'].tolist())}
+    columns['labels'] = [list(labels_of_mask[mask]) for mask in arrays['labels'].tolist()]
+
+    names = list(columns.keys())
+    bug_seeding_patterns = [dict(zip(names, values)) for values in zip(*columns.values())]
+    assert len(bug_seeding_patterns) == meta['num_of_patterns']
+
+    for name in meta['string_fields']:
+        for i, token_id in zip(arrays[f'field_patterns/{name}'].tolist(), arrays[f'field_ids/{name}'].tolist()):
+            bug_seeding_patterns[i][name] = vocabulary[token_id]
+    for name, (having_field, values) in fs.read_json_file(os.path.join(compiled_dir, 'fields.json')).items():
+        for i, value in zip(having_field, values):
+            bug_seeding_patterns[i][name] = value
+
+    num_of_training_patterns = meta['num_of_training_patterns']
+    return bug_seeding_patterns[:num_of_training_patterns], bug_seeding_patterns[num_of_training_patterns:]
+
+
+def load_patterns(pattern_file: str, compiled_dir: str = None) -> Tuple[List, List]:
+    """
+    Read the patterns from the compiled copy of the pattern file, the copy is built first if needed
+    :param pattern_file: The JSON file of the patterns
+    :param compiled_dir: The directory of the compiled copy. Next to the pattern file if not given
+    :return: The training and the validation patterns
+    """
+    compiled_dir = compiled_dir or get_compiled_patterns_dir(pattern_file)
+    if not is_compiled(pattern_file=pattern_file, compiled_dir=compiled_dir):
+        print(f"Compiling the bug seeding patterns of '{pattern_file}' to '{compiled_dir}'")
+        try:
+            compile_patterns(pattern_file=pattern_file, compiled_dir=compiled_dir)
+        except OSError as e:
+            print(f"Could not compile the bug seeding patterns because {e}")
+        if not is_compiled(pattern_file=pattern_file, compiled_dir=compiled_dir):
+            return split_patterns(prepare_patterns(pattern_file))
+    return read_compiled_patterns(compiled_dir=compiled_dir)
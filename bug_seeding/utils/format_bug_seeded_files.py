@@ -6,38 +6,17 @@ Created on 02-August-2020
 Run this script after bug seeding has finished
 
 """
-import os
-import subprocess
-from threading import Timer
+from utils.node_worker import get_node_worker
 from tqdm import tqdm
 from multiprocessing import Pool, cpu_count
 from pathlib import Path
 
 
 def format_a_js_file(target_js_file_path: str) -> str:
-    def kill_process(p):
-        return p.kill()
-
-    err_in_execution = False
-    path_to_process = os.path.join(os.path.normpath(
-        os.getcwd() + os.sep), 'static_analysis_js', 'utils', 'format_a_js_file.js')
     time_out_before_killing = 5000  # seconds
-    try:
-        p = subprocess.Popen([
-            'node', path_to_process,
-            '-inFile', target_js_file_path,
-        ], stdout=subprocess.PIPE)
-        time_out = Timer(time_out_before_killing, kill_process, [p])
-        try:
-            time_out.start()
-            stdout, stderr = p.communicate()
-            if stderr:
-                err_in_execution = stderr.decode("utf-8")
-        finally:
-            time_out.cancel()
-    except subprocess.TimeoutExpired:
-        pass
-    return err_in_execution
+    response = get_node_worker().run(task='formatFile', args={'inFile': str(target_js_file_path)},
+                                     timeout=time_out_before_killing)
+    return response['error'] or False
 
 
 def format_files_in_dir(indir):
@@ -0,0 +1,139 @@
+"""
+
+Created on 18-October-2026
+
+Keep a Node.js process running and send it requests rather than spawning a new process for every file.
+The Node.js side is 'nodeWorker.js' that reads one JSON request per line on stdin and writes one JSON
+response per line on stdout.
+"""
+import atexit
+import json
+import os
+import selectors
+import subprocess
+import time
+from typing import Dict
+
+PATH_TO_NODE_WORKER = os.path.join(os.path.normpath(
+    os.getcwd() + os.sep), 'bug_seeding', 'obtain_bug_seeding_patterns', 'extract_bug_seeding_patterns_from_repos',
+    'nodeWorker.js')
+
+
+class NodeWorker:
+    def __init__(self, path_to_worker: str, max_jobs_per_process: int = 1000):
+        """
+        :param path_to_worker: The JS file of the worker
+        :param max_jobs_per_process: The Node.js process is recycled after these many requests
+        """
+        self.path_to_worker = path_to_worker
+        self.max_jobs_per_process = max_jobs_per_process
+        self.process = None
+        self.jobs_done_by_process = 0
+        self._next_request_id = 0
+        self._buffer = b''
+
+    def _start(self) -> None:
+        self.process = subprocess.Popen(['node', self.path_to_worker], stdin=subprocess.PIPE,
+                                        stdout=subprocess.PIPE)
+        self.jobs_done_by_process = 0
+        self._buffer = b''
+
+    def close(self) -> None:
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+        self.process = None
+
+    def _kill(self) -> None:
+        self.process.kill()
+        self.process.wait()
+        self.process = None
+
+    def _read_line(self, timeout: float) -> bytes:
+        """
+        Read a line from the stdout of the process
+        :raises TimeoutError: If the process did not answer within the timeout
+        :raises EOFError: If the process has exited
+        """
+        deadline = time.monotonic() + timeout
+        fd = self.process.stdout.fileno()
+        with selectors.DefaultSelector() as selector:
+            selector.register(fd, selectors.EVENT_READ)
+            while b'\n' not in self._buffer:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or len(selector.select(remaining)) == 0:
+                    raise TimeoutError
+                chunk = os.read(fd, 65536)
+                if len(chunk) == 0:
+                    raise EOFError
+                self._buffer += chunk
+        line, self._buffer = self._buffer.split(b'\n', 1)
+        return line
+
+    def run(self, task: str, args: Dict, timeout: float = 180) -> Dict:
+        """
+        Send a request to the Node.js process and wait for the response. If the process does not answer
+        within the timeout or crashes, it gets killed and a new process is started for the next request.
+        :param task: The name of the task eg. 'extractNodeData'
+        :param args: The arguments of the task
+        :param timeout: Seconds to wait for the response
+        :return: The response. The 'error' of the response is None if the task was successful, a task computing a
+                 result answers it as 'result'
+        """
+        if self.process is not None and (
+                self.process.poll() is not None or self.jobs_done_by_process >= self.max_jobs_per_process):
+            self.close()
+        if self.process is None:
+            self._start()
+
+        self._next_request_id += 1
+        request_id = self._next_request_id
+        try:
+            self.process.stdin.write((json.dumps({'id': request_id, 'task': task, 'args': args}) + '\n').encode('utf-8'))
+            self.process.stdin.flush()
+        except OSError as e:
+            self._kill()
+            return {'id': request_id, 'error': f'Could not send the request: {e}'}
+        except BaseException:
+            # Eg. the task has been interrupted (see utils.task_budget). The process must not be reused since a
+            # later request would get the response of this one
+            self._kill()
+            raise
+
+        try:
+            line = self._read_line(timeout=timeout)
+        except TimeoutError:
+            self._kill()
+            return {'id': request_id, 'error': f'Timed out after {timeout} seconds'}
+        except EOFError:
+            self._kill()
+            return {'id': request_id, 'error': 'The Node.js process has crashed'}
+        except BaseException:
+            self._kill()
+            raise
+        self.jobs_done_by_process += 1
+        return json.loads(line.decode('utf-8'))
+
+
+# Every (Python) process keeps its own Node.js worker. The workers are keyed by the process id as well since the
+# processes of a Pool inherit this dictionary but must not share the pipes of their parent's worker
+_node_workers = {}
+
+
+def get_node_worker(path_to_worker: str = PATH_TO_NODE_WORKER) -> NodeWorker:
+    key = (os.getpid(), path_to_worker)
+    if key not in _node_workers:
+        _node_workers[key] = NodeWorker(path_to_worker=path_to_worker)
+    return _node_workers[key]
+
+
+@atexit.register
+def close_node_workers() -> None:
+    # The processes of a Pool do not run the atexit handlers. Their Node.js workers exit once stdin gets closed
+    for (pid, _), worker in _node_workers.items():
+        if pid == os.getpid():
+            worker.close()
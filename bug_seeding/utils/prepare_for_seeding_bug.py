@@ -6,12 +6,14 @@ Created on 25-March-2020
 Call nodejs to tokenize and convert files to their AST representations, tokenize etc.
 """
 import os
-import subprocess
-from threading import Timer
+import hashlib
 import utils.fileutils as fs
+from utils.node_worker import get_node_worker
+from utils.task_scheduler import estimate_costs, create_batches, run_batch, WorkerUtilisation
 from tqdm import tqdm
 from multiprocessing import Pool, cpu_count
-from typing import List
+from typing import List, Set, Collection
+from collections import Counter
 import random
 from pathlib import Path
 
@@ -19,38 +21,16 @@ from pathlib import Path
 def prepare_a_js_file_for_seeding_bug(target_js_file_path: str, out_json_file_path: str) -> str:
     """
     Prepare a JS file for seeding bugs by converting JS file to AST nodes.
-    The functions creates a Nodejs process to extract the required data.
+    The data is extracted by the Node.js worker process kept by the current process.
     :param target_js_file_path: The input JS file that will be converted to AST node representations
     :param out_json_file_path:
-    :return:
+    :return: The error if the extraction was not successful
     """
-
-    def kill_process(p):
-        return p.kill()
-
-    err_in_execution = False
-    path_to_process = os.path.join(os.path.normpath(
-        os.getcwd() + os.sep), 'bug_seeding', 'obtain_bug_seeding_patterns', 'extract_bug_seeding_patterns_from_repos',
-        'extractNodeData.js')
     time_out_before_killing = 180  # seconds
-    try:
-        p = subprocess.Popen([
-            'node', path_to_process,
-            '-inFile', target_js_file_path,
-            '-outFile', out_json_file_path,
-        ],
-            stdout=subprocess.PIPE)
-        time_out = Timer(time_out_before_killing, kill_process, [p])
-        try:
-            time_out.start()
-            stdout, stderr = p.communicate()
-            if stderr:
-                err_in_execution = stderr.decode("utf-8")
-        finally:
-            time_out.cancel()
-    except subprocess.TimeoutExpired:
-        pass
-    return err_in_execution
+    response = get_node_worker().run(task='extractNodeData',
+                                     args={'inFile': target_js_file_path, 'outFile': out_json_file_path},
+                                     timeout=time_out_before_killing)
+    return response['error'] or False
 
 
 def remove_duplicates(file_list: List, duplicate_file_groups: List) -> List:
@@ -77,21 +57,16 @@ def remove_duplicates(file_list: List, duplicate_file_groups: List) -> List:
 
 def prepare_a_js_file_for_seeding_bug_multiprocessing(arg):
     target_js_file_path, out_json_file_path = arg
-    prepare_a_js_file_for_seeding_bug(target_js_file_path, out_json_file_path)
+    return prepare_a_js_file_for_seeding_bug(target_js_file_path, out_json_file_path)
 
 
-def prepare_dir_for_seeding_bugs(target_js_dir: str, abstracted_out_dir: str, num_of_files: int = -1) -> None:
+def get_target_js_files(target_js_dir: str, num_of_files: int = -1) -> List[str]:
     """
-    Given a directory of JS files, format the code and run static analysis to extract nodes
-    from the code.
-    :param num_of_files: Select only 'num_of_files' files from 'abstracted_out_dir' once it is ready
+    Get the JS files of a directory where bugs may be seeded. Known duplicates are removed.
     :param target_js_dir:
-
-    :param abstracted_out_dir:
+    :param num_of_files: Select only 'num_of_files' files at random
     :return:
     """
-    fs.create_dir_list_if_not_present([abstracted_out_dir])
-
     print(" Reading  files in {}".format(target_js_dir))
     all_target_js_files = sorted(Path(target_js_dir).rglob('*.js'))
     all_target_js_files = [str(pth) for pth in all_target_js_files if pth.is_file()]
@@ -100,30 +75,77 @@ def prepare_dir_for_seeding_bugs(target_js_dir: str, abstracted_out_dir: str, nu
     print(" Removing duplicates from {} files in benchmarks".format(len(all_target_js_files)))
     duplicate_file_groups = fs.read_json_file('benchmarks/js150-duplicates.json')
     all_target_js_files = remove_duplicates(file_list=all_target_js_files, duplicate_file_groups=duplicate_file_groups)
-    
+
     if num_of_files > 1:
         random.seed(100)
         random.shuffle(all_target_js_files)
         all_target_js_files = all_target_js_files[:num_of_files]
     print(" Total number of files in benchmark is {}".format(len(all_target_js_files)))
+    return all_target_js_files
+
+
+def get_colliding_file_names(js_files: List[str]) -> Set[str]:
+    """
+    The names shared by JS files of different directories
+    """
+    names = Counter(Path(js_file).name for js_file in js_files)
+    return {name for name, count in names.items() if count > 1}
+
+
+def create_out_file_path(abstracted_out_dir: str, target_js_file_path: str,
+                         colliding_file_names: Collection[str] = ()) -> str:
+    """
+    The path of the JSON file where the static analysis results of a JS file will be written. The files having seeded
+    bugs are named after it.
+        Eg. 'data/a/index.js' -> 'abstracted_out_dir/index.json'
+    Only if JS files of different directories have the same name (see get_colliding_file_names), the name of their
+    JSON file also contains the hash of the path of the JS file.
+        Eg. 'data/a/index.js' -> 'abstracted_out_dir/index_3f1c9a2b.json'
+    """
+    name = Path(target_js_file_path).stem
+    if Path(target_js_file_path).name in colliding_file_names:
+        name += '_' + hashlib.sha1(str(target_js_file_path).encode('utf-8')).hexdigest()[:8]
+    return os.path.join(abstracted_out_dir, name + '.json')
+
+
+def prepare_dir_for_seeding_bugs(target_js_dir: str, abstracted_out_dir: str, num_of_files: int = -1) -> None:
+    """
+    Given a directory of JS files, format the code and run static analysis to extract nodes
+    from the code.
+    :param num_of_files: Select only 'num_of_files' files from 'abstracted_out_dir' once it is ready
+    :param target_js_dir:
+
+    :param abstracted_out_dir:
+    :return:
+    """
+    fs.create_dir_list_if_not_present([abstracted_out_dir])
 
-    def create_out_file_path(target_js_file_path: str) -> str:
-        return os.path.join(abstracted_out_dir, os.path.basename(target_js_file_path) + 'on')
+    all_target_js_files = get_target_js_files(target_js_dir=target_js_dir, num_of_files=num_of_files)
 
-    target_js_files_and_out_paths = [(target_js_file_path, create_out_file_path(target_js_file_path))
+    colliding_file_names = get_colliding_file_names(all_target_js_files)
+    target_js_files_and_out_paths = [(target_js_file_path,
+                                      create_out_file_path(abstracted_out_dir, target_js_file_path, colliding_file_names))
                                      for target_js_file_path in all_target_js_files]
     if cpu_count() > 4:
+        # The largest files are analysed first, the small files are sent in batches
+        batches = create_batches(tasks=target_js_files_and_out_paths,
+                                 costs=estimate_costs(sizes=[os.path.getsize(target_js_file_path) for
+                                                             target_js_file_path, _ in target_js_files_and_out_paths]),
+                                 num_of_processes=cpu_count())
+        utilisation = WorkerUtilisation()
         with Pool(processes=cpu_count()) as p:
             with tqdm(total=len(all_target_js_files)) as pbar:
                 pbar.set_description_str(
                     desc="Preparing js files ", refresh=False)
-                for i, execution_errors in tqdm(
-                        enumerate(p.imap_unordered(prepare_a_js_file_for_seeding_bug_multiprocessing,
-                                                   target_js_files_and_out_paths, chunksize=10))):
+                for pid, busy_time, execution_errors in p.imap_unordered(
+                        run_batch, [(prepare_a_js_file_for_seeding_bug_multiprocessing, batch) for batch in batches],
+                        chunksize=1):
                     # print(execution_errors)
-                    pbar.update()
+                    utilisation.add(pid=pid, busy_time=busy_time, num_of_tasks=len(execution_errors))
+                    pbar.update(len(execution_errors))
                 p.close()
                 p.join()
+        print(utilisation)
     else:
         for target_file, out_file in tqdm(target_js_files_and_out_paths,
                                           desc='Preparing JS files *** Sequentially ***'):
@@ -0,0 +1,41 @@
+"""
+
+Created on 18-October-2026
+
+Go through the candidates of a stream in a uniformly random order without keeping all of them in memory. Every
+candidate gets a random key and a reservoir keeps the candidates having the smallest keys (reservoir sampling
+using random keys). The first k candidates yielded are a uniform sample of size k of all candidates, hence
+stopping early (eg. once enough bugs have been seeded) keeps the distribution of the candidates (eg. of the
+types of patterns) representative.
+"""
+import heapq
+import random
+from typing import Callable, Iterable, Iterator, Any
+
+
+def sample_in_random_order(get_candidates: Callable[[], Iterable], reservoir_size: int, seed: Any) -> Iterator:
+    """
+    Yield all candidates in a random order. The stream is read once for every 'reservoir_size' candidates yielded,
+    the keys are drawn from a generator having the given seed, hence every candidate has the same key in every pass
+    :param get_candidates: Returns a new stream of the same candidates every time it is called
+    :param reservoir_size: The number of candidates kept in memory
+    :param seed: The seed of the random keys
+    """
+    reservoir_size = max(1, reservoir_size)
+    largest_key_yielded = -1.0
+    while True:
+        rng = random.Random(seed)
+        reservoir = []  # A max-heap of (-key, position in the stream, candidate)
+        for i, candidate in enumerate(get_candidates()):
+            key = rng.random()
+            if key <= largest_key_yielded:
+                continue
+            if len(reservoir) < reservoir_size:
+                heapq.heappush(reservoir, (-key, i, candidate))
+            elif key < -reservoir[0][0]:
+                heapq.heapreplace(reservoir, (-key, i, candidate))
+        for neg_key, _, candidate in sorted(reservoir, key=lambda entry: (-entry[0], entry[1])):
+            yield candidate
+            largest_key_yielded = -neg_key
+        if len(reservoir) < reservoir_size:
+            return
@@ -0,0 +1,61 @@
+"""
+
+Created on 18-October-2026
+
+An append-only manifest of a bug seeding run. Every line is a JSON record saying that a stage (eg. 'analysed',
+'seeded') has finished for a file having a certain content. When a run is restarted, the files whose stages
+have already finished for the same content are skipped.
+"""
+import hashlib
+import json
+import os
+from typing import Dict
+import utils.fileutils as fs
+
+
+def get_file_hash(file_path: str) -> str:
+    with open(file_path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+class RunManifest:
+    def __init__(self, manifest_path: str):
+        self.manifest_path = manifest_path
+        # (file, stage) -> the latest record
+        self.completed_stages = {}
+        if fs.pathExists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # The last line may be incomplete if the process got killed while writing
+                        continue
+                    self.completed_stages[(record['file'], record['stage'])] = record
+
+    def is_done(self, file_path: str, stage: str, content_hash: str) -> bool:
+        record = self.completed_stages.get((file_path, stage))
+        return record is not None and record['hash'] == content_hash
+
+    def get_record(self, file_path: str, stage: str) -> Dict:
+        return self.completed_stages.get((file_path, stage), {})
+
+    def record(self, file_path: str, stage: str, content_hash: str, **details) -> None:
+        record = dict(file=file_path, stage=stage, hash=content_hash, **details)
+        self.completed_stages[(file_path, stage)] = record
+        append_to_manifest(self.manifest_path, record)
+
+
+def append_to_manifest(manifest_path: str, record: Dict) -> None:
+    """
+    Append a single record. Each record is written using one write call on a file opened in append mode, hence
+    many processes may append to the same manifest. If the last line is incomplete (eg. the process writing it got
+    killed), the record starts on a new line. Otherwise, it would be dropped along with the incomplete line.
+    """
+    line = (json.dumps(record, separators=(',', ':')) + '\n').encode('utf-8')
+    with open(manifest_path, 'ab+') as f:
+        if f.seek(0, os.SEEK_END) > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                line = b'\n' + line
+        f.write(line)
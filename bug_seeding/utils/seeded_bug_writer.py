@@ -0,0 +1,183 @@
+"""
+
+Created on 18-October-2026
+
+Write the files having seeded bugs and their metadata. The outputs are queued and beautified/written by a pool of
+threads while the seeding goes on. Every output is named after the analysed file, the location and the variant,
+hence it is never necessary to check whether a file exists already.
+
+Rather than one JS and one JSON file per seeded bug, the outputs may be packed into sharded archives ('tar' or
+'zip') in the output directory. Every process appends to its own shards named 'seeded_<pid>_<random>_<n>.<format>'.
+A 'tar' shard is readable up to its last complete member even if the process got killed, a 'zip' shard only
+once it has been closed.
+"""
+import io
+import json
+import os
+import tarfile
+import threading
+import time
+import uuid
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.util import Finalize
+from typing import Dict, List, Tuple
+import jsbeautifier
+from tqdm import tqdm
+
+OUTPUT_FORMATS = ('files', 'tar', 'zip')
+
+
+def beautify_js_code(code: str) -> str:
+    # Remember, this does not check for Syntax Errors in the generated JS code. This needs to be done separately
+    return jsbeautifier.beautify(code, {
+        "indent_empty_lines": False,
+        "break_chained_methods": False,
+        "space_after_anon_function": False,
+        "space_in_paren": False
+    })
+
+
+def get_seeded_file_name(analysed_file_name: str, location_number: int, variant_number: int) -> str:
+    """
+    Eg. 'x.json', 3, 0 -> 'x_SEMSEED_MUTATED_3.js' and 'x.json', 3, 1 -> 'x_SEMSEED_MUTATED_3_1.js'
+    :param analysed_file_name: The name of the JSON file of the static analysis
+    :param location_number: The number of the location of the file where a bug could be seeded
+    :param variant_number: The number of the mutated sequence at this location
+    """
+    suffix = f'_SEMSEED_MUTATED_{location_number}' if variant_number == 0 else \
+        f'_SEMSEED_MUTATED_{location_number}_{variant_number}'
+    return analysed_file_name.replace('.json', suffix + '.js')
+
+
+class SeededBugWriter:
+    def __init__(self, out_dir: str, output_format: str = 'files', num_of_threads: int = 4,
+                 max_files_per_archive: int = 100000):
+        """
+        :param out_dir: The directory where the files (or the archives) are written
+        :param output_format: One of OUTPUT_FORMATS
+        :param num_of_threads: The threads beautifying and writing the outputs
+        :param max_files_per_archive: A new shard is started once an archive contains these many files
+        """
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format '{output_format}', expected one of {OUTPUT_FORMATS}")
+        self.out_dir = out_dir
+        self.output_format = output_format
+        self.max_files_per_archive = max_files_per_archive
+        self.num_of_threads = max(1, num_of_threads)
+        self._executor = ThreadPoolExecutor(max_workers=self.num_of_threads)
+        self._pending = deque()
+        self._archive_lock = threading.Lock()
+        self._archive = None
+        self._archive_prefix = f'seeded_{os.getpid()}_{uuid.uuid4().hex[:8]}'
+        self._num_of_archives = 0
+        self._num_of_files_in_archive = 0
+        self.num_of_files_written = 0
+
+    def write(self, file_name: str, code: str, metadata: Dict, beautify: bool = True) -> None:
+        """
+        Queue a file having a seeded bug. The metadata is written next to it as '<file_name>on'
+        :param file_name: The name of the JS file, see get_seeded_file_name
+        :param code: The code of the file
+        :param metadata: Copied, hence the caller may go on changing it
+        :param beautify: Beautify the code before writing it
+        """
+        # Do not let the queue grow without bounds if seeding is faster than writing
+        while len(self._pending) >= 4 * self.num_of_threads:
+            self._pending.popleft().result()
+        self._pending.append(self._executor.submit(self._write, file_name, code, dict(metadata), beautify))
+
+    def _write(self, file_name: str, code: str, metadata: Dict, beautify: bool) -> None:
+        files = []
+        try:
+            if beautify:
+                code = beautify_js_code(code)
+            files.append((file_name, code.encode('utf-8')))
+        except Exception as e:
+            tqdm.write(f'ERROR: Could not write {file_name} because {e}')
+            metadata['error'] = str(e)
+        files.append((file_name + 'on', json.dumps(metadata, separators=(',', ':')).encode('utf-8')))
+        # A file that can not be written (eg. the disk is full) must not stop the seeding of the other files
+        try:
+            self._put(files)
+        except OSError as e:
+            tqdm.write(f'ERROR: Could not write {file_name} because {e}')
+
+    def _put(self, files: List[Tuple[str, bytes]]) -> None:
+        """
+        Write the files, in case of an archive both the JS file and its metadata end up in the same shard
+        """
+        if self.output_format == 'files':
+            for file_name, data in files:
+                with open(os.path.join(self.out_dir, file_name), 'wb') as f:
+                    f.write(data)
+            with self._archive_lock:
+                self.num_of_files_written += len(files)
+            return
+        with self._archive_lock:
+            if self._archive is None or self._num_of_files_in_archive >= self.max_files_per_archive:
+                self._start_new_archive()
+            for file_name, data in files:
+                if self.output_format == 'tar':
+                    info = tarfile.TarInfo(name=file_name)
+                    info.size = len(data)
+                    info.mtime = int(time.time())
+                    info.mode = 0o644
+                    self._archive.addfile(info, io.BytesIO(data))
+                else:
+                    self._archive.writestr(file_name, data)
+            self._num_of_files_in_archive += len(files)
+            self.num_of_files_written += len(files)
+
+    def _start_new_archive(self) -> None:
+        self._close_archive()
+        path = os.path.join(self.out_dir, f'{self._archive_prefix}_{self._num_of_archives}.{self.output_format}')
+        if self.output_format == 'tar':
+            self._archive = tarfile.open(path, mode='w')
+        else:
+            self._archive = zipfile.ZipFile(path, mode='w', compression=zipfile.ZIP_DEFLATED)
+        self._num_of_archives += 1
+        self._num_of_files_in_archive = 0
+
+    def _close_archive(self) -> None:
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+
+    def flush(self) -> None:
+        """
+        Wait until all queued outputs have been written
+        """
+        while len(self._pending) > 0:
+            self._pending.popleft().result()
+        with self._archive_lock:
+            if self.output_format == 'tar' and self._archive is not None:
+                self._archive.fileobj.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self._executor.shutdown(wait=True)
+        with self._archive_lock:
+            self._close_archive()
+
+
+# The writers are keyed by the process id since the processes of a Pool inherit this dictionary but must each
+# have their own threads and archives
+_writers = {}
+
+
+def get_seeded_bug_writer(out_dir: str, output_format: str = 'files', num_of_threads: int = 4) -> SeededBugWriter:
+    """
+    The writer of the current process. It is closed when the process exits
+    """
+    key = (os.getpid(), out_dir, output_format)
+    if key not in _writers:
+        _writers[key] = SeededBugWriter(out_dir=out_dir, output_format=output_format, num_of_threads=num_of_threads)
+        Finalize(_writers[key], _writers[key].close, exitpriority=10)
+    return _writers[key]
+
+
+def close_seeded_bug_writers() -> None:
+    for key in [key for key in _writers if key[0] == os.getpid()]:
+        _writers.pop(key).close()
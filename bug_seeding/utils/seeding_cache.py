@@ -0,0 +1,99 @@
+"""
+
+Created on 18-October-2026
+
+Remember which bug seeding patterns have already been applied to which files, so that a run only seeds the new
+(file, pattern) combinations and keeps the files having seeded bugs that earlier runs have written. The 'seeded'
+records of the run manifest say which content of a file (its hash) has been seeded using which set of patterns
+and which parameters. A file whose seeding has been stopped by the quota of the run (see --max_bugs) gets a
+'partial' record, which is ignored. Hence, a later run applies the patterns of the stopped run to the file again and
+overwrites the files having seeded bugs that it has written. Every set of patterns is written once to
+'<pattern_sets_dir>/<fingerprint>.json' as the sorted list of the fingerprints of its patterns.
+"""
+import hashlib
+import json
+import os
+from collections import defaultdict
+from typing import Dict, List, Any
+import utils.fileutils as fs
+
+
+def get_fingerprint(obj: Any) -> str:
+    return hashlib.sha1(json.dumps(obj, sort_keys=True, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+
+def get_pattern_set_path(pattern_sets_dir: str, fingerprint: str) -> str:
+    return os.path.join(pattern_sets_dir, fingerprint + '.json')
+
+
+def read_pattern_set(pattern_sets_dir: str, fingerprint: str) -> set:
+    """
+    :return: The fingerprints of the patterns of the set
+    """
+    return set(fs.read_json_file(get_pattern_set_path(pattern_sets_dir, fingerprint)))
+
+
+class SeedingCache:
+    def __init__(self, manifest_path: str, pattern_sets_dir: str):
+        """
+        :param manifest_path: The manifest of the runs
+        :param pattern_sets_dir: The directory containing the sets of patterns
+        """
+        self.manifest_path = manifest_path
+        self.pattern_sets_dir = pattern_sets_dir
+        fs.create_dir_list_if_not_present([pattern_sets_dir])
+        self._pattern_sets = {}
+        # (file, hash, parameters) -> the 'seeded' records, one for every run that has seeded the file
+        self.records = defaultdict(list)
+        if fs.pathExists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    # Records of earlier versions do not say which patterns have been used and partial records
+                    # do not say which locations have been seeded
+                    if record['stage'] == 'seeded' and 'pattern_set' in record and not record.get('partial'):
+                        self.records[(record['file'], record['hash'], record['parameters'])].append(record)
+
+    def add_pattern_set(self, pattern_fingerprints: List[str]) -> str:
+        """
+        :return: The fingerprint of the set of patterns
+        """
+        pattern_set = sorted(set(pattern_fingerprints))
+        fingerprint = get_fingerprint(pattern_set)
+        path = get_pattern_set_path(self.pattern_sets_dir, fingerprint)
+        if not fs.pathExists(path):
+            fs.writeJSONFile(data=pattern_set, file_path=path)
+        self._pattern_sets[fingerprint] = set(pattern_set)
+        return fingerprint
+
+    def get_pattern_set(self, fingerprint: str) -> set:
+        if fingerprint not in self._pattern_sets:
+            self._pattern_sets[fingerprint] = read_pattern_set(self.pattern_sets_dir, fingerprint)
+        return self._pattern_sets[fingerprint]
+
+    def get_seeded_patterns(self, file_path: str, content_hash: str, parameters: str) -> set:
+        """
+        The fingerprints of all patterns that have already been applied to the content of the file
+        """
+        seeded_patterns = set()
+        for record in self.records.get((file_path, content_hash, parameters), []):
+            seeded_patterns |= self.get_pattern_set(record['pattern_set'])
+        return seeded_patterns
+
+    def get_num_seeded(self, file_path: str, content_hash: str, parameters: str) -> int:
+        """
+        The number of locations of the file where earlier runs have seeded bugs. The locations seeded by the
+        next run are numbered after them
+        """
+        return sum(record['num_seeded'] for record in self.records.get((file_path, content_hash, parameters), []))
+
+    def get_patterns_to_seed(self, file_path: str, content_hash: str, parameters: str,
+                             pattern_fingerprints: List[str]) -> List[str]:
+        """
+        :return: The fingerprints of the patterns that have not yet been applied to the content of the file
+        """
+        seeded_patterns = self.get_seeded_patterns(file_path, content_hash, parameters)
+        return [fingerprint for fingerprint in pattern_fingerprints if fingerprint not in seeded_patterns]
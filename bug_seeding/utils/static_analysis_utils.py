@@ -6,7 +6,69 @@ Created on 25-March-2020
 This file contains helper functions to parse the static analysis results
 extracted using nodejs and esprima
 """
-from typing import List, Dict
+from typing import List, Dict, Tuple, Union
+import numpy as np
+
+
+def parse_range(rng: str) -> Tuple[int, int]:
+    """
+    Eg. '12-17' -> (12, 17)
+    """
+    start, end = rng.split('-')
+    return int(start), int(end)
+
+
+def get_token_ranges(analysed_file: dict) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get the ranges of all tokens in the file as integer arrays. The analysed files read from the store
+    already contain them ('tokenRanges'), otherwise the 'start-end' strings are parsed.
+    :return: The start and the end of the range of each token
+    """
+    if 'tokenRanges' in analysed_file:
+        token_ranges = analysed_file['tokenRanges']
+    else:
+        token_ranges = np.array([parse_range(rng) for rng in analysed_file['tokenRangesList']],
+                                dtype=np.int32).reshape(-1, 2)
+    return token_ranges[:, 0], token_ranges[:, 1]
+
+
+def get_code_in_range(source_code: str, start: int, end: int) -> str:
+    """
+    The ranges of the static analysis count UTF-16 code units (the indices of JS strings). They are the indices of
+    the Python string unless the code contains characters outside the Basic Multilingual Plane
+    """
+    if source_code.isascii():
+        return source_code[start:end]
+    return source_code.encode('utf-16-le')[2 * start:2 * end].decode('utf-16-le')
+
+
+def splice_source_code(source_code: str, start: int, end: int, replacement: str) -> str:
+    """
+    Replace the code in the range (start, end) by the replacement, everything else remains untouched
+    """
+    if source_code.isascii():
+        return source_code[:start] + replacement + source_code[end:]
+    code_units = source_code.encode('utf-16-le')
+    return code_units[:2 * start].decode('utf-16-le') + replacement + code_units[2 * end:].decode('utf-16-le')
+
+
+def read_source_code(js_file: str, analysed_file: dict) -> Union[str, None]:
+    """
+    Read the code of an analysed JS file, the static analysis formats the file before analysing it
+    :return: None if the file can not be read or has changed since it has been analysed ie. the Identifiers are
+             not found at their ranges anymore
+    """
+    try:
+        # The newlines are not translated, otherwise the ranges would not match for '\r\n'
+        with open(js_file, 'r', encoding='utf-8', newline='') as f:
+            source_code = f.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+    for rng, identifier in analysed_file.get('range_to_identifier', {}).items():
+        start, end = parse_range(rng)
+        if get_code_in_range(source_code, start, end) != identifier:
+            return None
+    return source_code
 
 
 def get_all_tokens_in_file(range_to_token_mapping: Dict) -> List:
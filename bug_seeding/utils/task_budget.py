@@ -0,0 +1,114 @@
+"""
+
+Created on 18-October-2026
+
+Limit the wall time and the memory a single task (eg. seeding bugs to one file) may use. A timer checks the
+limits periodically and raises TaskBudgetExceeded in the middle of the task once a limit has been exceeded.
+The timer uses SIGALRM, hence the limits are only enforced in the main thread of a process on Unix. The
+processes of a Pool run their tasks in the main thread. While the task persists its results (eg. appends to a
+store or a manifest), the checks are deferred using checks_deferred(), hence no file is left half-written.
+"""
+import os
+import resource
+import signal
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# While more than 0, the results of the task are being persisted and the checks are deferred, see checks_deferred
+_deferral_depth = 0
+# The budget whose check has been deferred
+_deferred_budget = None
+
+
+class TaskBudgetExceeded(BaseException):
+    # Not an Exception, hence it is not swallowed by the 'except Exception' of the task itself
+    pass
+
+
+def get_current_rss_mb() -> float:
+    """
+    The resident set size of the process. Falls back to the peak RSS if the current one is not available
+    """
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return peak_rss / (1024 * 1024) if sys.platform == 'darwin' else peak_rss / 1024
+
+
+class TaskBudget:
+    def __init__(self, max_seconds: float = 0, max_rss_mb: float = 0, check_interval: float = 1.0):
+        """
+        Use as a context manager around the task
+        :param max_seconds: The wall time the task may take, 0 for no limit
+        :param max_rss_mb: The RSS (MB) the process may reach while running the task, 0 for no limit
+        :param check_interval: Seconds between two checks of the limits
+        """
+        self.max_seconds = max_seconds
+        self.max_rss_mb = max_rss_mb
+        self.check_interval = check_interval
+        self.start = None
+        self._active = False
+        self._enforced = False
+        self._previous_handler = None
+
+    def _can_be_enforced(self) -> bool:
+        return (self.max_seconds > 0 or self.max_rss_mb > 0) and hasattr(signal, 'setitimer') and \
+               threading.current_thread() is threading.main_thread()
+
+    def _check(self, signum, frame) -> None:
+        global _deferred_budget
+        if not self._active:
+            return
+        if _deferral_depth > 0:
+            _deferred_budget = self
+            return
+        elapsed = time.monotonic() - self.start
+        if 0 < self.max_seconds < elapsed:
+            raise TaskBudgetExceeded(f'Took more than {self.max_seconds} seconds')
+        if self.max_rss_mb > 0:
+            rss = get_current_rss_mb()
+            if rss > self.max_rss_mb:
+                raise TaskBudgetExceeded(f'The RSS of the process reached {rss:.0f} MB after {elapsed:.0f} seconds, '
+                                         f'the limit is {self.max_rss_mb} MB')
+
+    def __enter__(self):
+        self.start = time.monotonic()
+        if self._can_be_enforced():
+            self._active = True
+            self._enforced = True
+            self._previous_handler = signal.signal(signal.SIGALRM, self._check)
+            interval = self.check_interval if self.max_seconds <= 0 else min(self.check_interval, self.max_seconds)
+            signal.setitimer(signal.ITIMER_REAL, interval, interval)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._enforced:
+            self._active = False
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, self._previous_handler or signal.SIG_DFL)
+            self._enforced = False
+        return False
+
+
+@contextmanager
+def checks_deferred():
+    """
+    Defer the checks of the limits while the block runs. A limit exceeded meanwhile raises TaskBudgetExceeded once
+    the block has finished rather than in the middle of it. Blocking SIGALRM instead would not do, the signal
+    would be delivered to another thread of the process (eg. one writing the seeded files) and its handler would
+    still run in the main thread
+    """
+    global _deferral_depth, _deferred_budget
+    _deferral_depth += 1
+    try:
+        yield
+    finally:
+        _deferral_depth -= 1
+        if _deferral_depth == 0 and _deferred_budget is not None:
+            budget, _deferred_budget = _deferred_budget, None
+            budget._check(signal.SIGALRM, None)
@@ -0,0 +1,110 @@
+"""
+
+Created on 18-October-2026
+
+Schedule the files of a run on the processes of a Pool. The cost of a file varies a lot (eg. with its number
+of nodes), hence the files are dispatched largest first (LPT). Otherwise a few huge files at the end keep a
+single process busy while all others are idle. Tiny files are batched together so that they do not cost one
+round trip between the processes each.
+"""
+import os
+import time
+from collections import defaultdict
+from typing import List, Tuple, Callable, Dict, Any
+
+
+def estimate_costs(sizes: List[int], known_costs: Dict[int, float] = None) -> List[float]:
+    """
+    Estimate the cost of each task. The known costs (eg. the number of nodes of already analysed files) are
+    used as they are. The other tasks are estimated from their size (eg. bytes of the JS file) using the
+    cost per byte observed for the known ones.
+    :param sizes: The size of each task
+    :param known_costs: Task index -> cost
+    :return: The estimated cost of each task
+    """
+    known_costs = known_costs or {}
+    known_size = sum(sizes[i] for i in known_costs)
+    cost_per_size_unit = sum(known_costs.values()) / known_size if known_size > 0 else 1.0
+    return [known_costs[i] if i in known_costs else size * cost_per_size_unit for i, size in enumerate(sizes)]
+
+
+def create_batches(tasks: List, costs: List[float], num_of_processes: int, batches_per_process: int = 16) -> List[List]:
+    """
+    Group the tasks into batches that are ordered by their cost, the most expensive first. A task costing more
+    than the target cost of a batch (total cost / (num_of_processes * batches_per_process)) is a batch on its
+    own, the cheaper tasks are packed together until a batch reaches the target cost.
+    :param tasks:
+    :param costs: The estimated cost of each task
+    :param num_of_processes:
+    :param batches_per_process: More batches balance the load better but cost more round trips
+    :return:
+    """
+    if len(tasks) == 0:
+        return []
+    target_batch_cost = sum(costs) / max(1, num_of_processes * batches_per_process)
+
+    batches, batch_costs = [], []
+    current_batch, current_cost = [], 0.0
+    for i in sorted(range(len(tasks)), key=lambda i: costs[i], reverse=True):
+        current_batch.append(tasks[i])
+        current_cost += costs[i]
+        if current_cost >= target_batch_cost:
+            batches.append(current_batch)
+            batch_costs.append(current_cost)
+            current_batch, current_cost = [], 0.0
+    if len(current_batch) > 0:
+        batches.append(current_batch)
+        batch_costs.append(current_cost)
+    # The tasks are sorted by their cost, hence the batches mostly are as well. Only the batches of tiny tasks
+    # may cost more than a single large task before them
+    order = sorted(range(len(batches)), key=lambda b: batch_costs[b], reverse=True)
+    return [batches[b] for b in order]
+
+
+def run_batch(args: Tuple[Callable, List]) -> Tuple[int, float, List]:
+    """
+    Run a batch of tasks in a process of the Pool
+    :param args: The function (it must be picklable eg. defined at the module level) and the batch of tasks
+    :return: The process id, the time spent on the batch and the result of each task
+    """
+    function, batch = args
+    start = time.perf_counter()
+    results = [function(task) for task in batch]
+    return os.getpid(), time.perf_counter() - start, results
+
+
+class WorkerUtilisation:
+    """
+    The time each process of the Pool has spent on tasks compared to the wall time of the Pool
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.busy_time = defaultdict(float)
+        self.num_of_tasks = defaultdict(int)
+
+    def add(self, pid: int, busy_time: float, num_of_tasks: int) -> None:
+        self.busy_time[pid] += busy_time
+        self.num_of_tasks[pid] += num_of_tasks
+
+    def get_report(self) -> Dict[str, Any]:
+        wall_time = time.perf_counter() - self.start
+        workers = {
+            str(pid): {'tasks': self.num_of_tasks[pid], 'busy_s': round(busy_time, 2),
+                       'utilisation': round(busy_time / wall_time, 3) if wall_time > 0 else 0.0}
+            for pid, busy_time in sorted(self.busy_time.items())}
+        return {
+            'wall_time_s': round(wall_time, 2),
+            'mean_utilisation': round(sum(w['utilisation'] for w in workers.values()) / len(workers),
+                                      3) if workers else 0.0,
+            'workers': workers
+        }
+
+    def __str__(self) -> str:
+        report = self.get_report()
+        lines = ["Pool wall time {}s, mean utilisation of the processes {:.1%}".format(
+            report['wall_time_s'], report['mean_utilisation'])]
+        for pid, worker in report['workers'].items():
+            lines.append("\tprocess {:>8}: {:>6} tasks, busy {:>10}s ({:.1%})".format(
+                pid, worker['tasks'], worker['busy_s'], worker['utilisation']))
+        return '\n'.join(lines)